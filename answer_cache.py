@@ -0,0 +1,180 @@
+import collections
+import hashlib
+import itertools
+import math
+import re
+import threading
+import time
+
+SENTENCE_PUNCT_RE = re.compile(r"[.,;:!?\"'()\[\]]+")
+
+
+def normalize_prompt(text):
+    """Case-fold and collapse whitespace; symbols stay, so "C++" and "C#" or "1+2" and "1-2" differ."""
+    return " ".join((text or "").casefold().split())
+
+
+def loose_prompt(normalized):
+    """
+    `normalized` without sentence punctuation, for the similarity tier only.
+    Symbols inside terms ("c++", "c#", "1+2") are kept.
+    """
+    return " ".join(SENTENCE_PUNCT_RE.sub(" ", normalized).split())
+
+
+# Words that can differ between two phrasings of the same question. Negations,
+# question words and anything carrying a topic or a number are not in here.
+STOPWORDS = frozenset(
+    "a an the is are was were be been s do does did of to in on for with about by me i you "
+    "please can could would tell explain define describe".split())
+MAX_CANDIDATES = 32    # most recent entries with the same content words compared per lookup
+
+
+def content_signature(normalized):
+    """
+    The prompt's content words and numbers in order, with a trailing plural
+    's' dropped. A similarity hit needs an identical signature, so
+    "supervised" vs "unsupervised", "L1" vs "L2", an added "not" or swapped
+    operands ("celsius to fahrenheit") never match.
+    """
+    words = []
+    for word in normalized.split():
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return tuple(words)
+
+
+def ngram_vector(normalized, n=3):
+    padded = f" {normalized} "
+    return collections.Counter(padded[i:i + n] for i in range(len(padded) - n + 1))
+
+
+class _Entry:
+    __slots__ = ("key", "answer", "expires_at", "signature", "vector", "norm")
+
+    def __init__(self, key, answer, expires_at, signature, vector):
+        self.key = key
+        self.answer = answer
+        self.expires_at = expires_at
+        self.signature = signature
+        self.vector = vector
+        self.norm = math.sqrt(sum(c * c for c in vector.values())) or 1.0
+
+
+class AnswerCache:
+    """
+    Cache of chat answers keyed on the normalized prompt.
+
+    An exact tier matches prompts that are identical up to case and
+    whitespace. The optional similarity tier (off by default) ignores
+    sentence punctuation and serves near-duplicates ("explain attention in
+    transformers" vs "... please") when both prompts have the same content
+    words and numbers in the same order and their character trigram vectors
+    have a cosine similarity of at least `threshold`. Only the most recent
+    MAX_CANDIDATES entries with that content signature are compared, so a
+    lookup stays cheap under the lock. Entries expire after `ttl` seconds and the least recently used is evicted once
+    `max_entries` is reached. `context` (system prompt, model) is hashed
+    into every key so changing it never serves stale answers.
+    """
+
+    def __init__(self, max_entries=5000, ttl=86400, similarity=False, threshold=0.9):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()   # key -> _Entry, in LRU order
+        self._signatures = {}                       # (context, content signature) -> {key: None}, oldest first
+        self._counters = collections.Counter()
+
+    @staticmethod
+    def _context_id(context):
+        return hashlib.sha1(repr(context).encode()).hexdigest()[:16]
+
+    def _drop(self, entry):
+        del self._entries[entry.key]
+        bucket_key = (entry.key[0], entry.signature)
+        bucket = self._signatures.get(bucket_key)
+        if bucket is not None:
+            bucket.pop(entry.key, None)
+            if not bucket:
+                del self._signatures[bucket_key]
+
+    def _nearest(self, context, loose):
+        signature = content_signature(loose)
+        bucket = self._signatures.get((context, signature)) if signature else None
+        if not bucket:
+            return None, 0.0
+        vector = ngram_vector(loose)
+        query_norm = math.sqrt(sum(c * c for c in vector.values())) or 1.0
+        best, best_score = None, 0.0
+        for key in itertools.islice(reversed(bucket), MAX_CANDIDATES):
+            entry = self._entries[key]
+            dot = sum(count * entry.vector.get(gram, 0) for gram, count in vector.items())
+            score = dot / (query_norm * entry.norm)
+            if score > best_score:
+                best, best_score = key, score
+        return best, best_score
+
+    def get(self, prompt, context=()):
+        """Cached answer for `prompt`, or None."""
+        normalized = normalize_prompt(prompt)
+        if not normalized:
+            return None
+        context = self._context_id(context)
+        key = (context, normalized)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            tier = "exact_hits"
+            if entry is None and self.similarity:
+                nearest, score = self._nearest(context, loose_prompt(normalized))
+                if nearest is not None and score >= self.threshold:
+                    entry = self._entries[nearest]
+                    tier = "similar_hits"
+            if entry is not None and entry.expires_at <= now:
+                self._drop(entry)
+                self._counters["expired"] += 1
+                entry = None
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(entry.key)
+            self._counters[tier] += 1
+            return entry.answer
+
+    def set(self, prompt, answer, context=()):
+        normalized = normalize_prompt(prompt)
+        if not normalized:
+            return
+        context = self._context_id(context)
+        key = (context, normalized)
+        with self._lock:
+            if key in self._entries:
+                self._drop(self._entries[key])
+            loose = loose_prompt(normalized)
+            entry = _Entry(key, answer, time.time() + self.ttl, content_signature(loose), ngram_vector(loose))
+            self._entries[key] = entry
+            self._signatures.setdefault((context, entry.signature), {})[key] = None
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries.values())))
+                self._counters["evictions"] += 1
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            entries = len(self._entries)
+        hits = counters.get("exact_hits", 0) + counters.get("similar_hits", 0)
+        lookups = hits + counters.get("misses", 0)
+        return {
+            "entries": entries,
+            "exact_hits": counters.get("exact_hits", 0),
+            "similar_hits": counters.get("similar_hits", 0),
+            "misses": counters.get("misses", 0),
+            "evictions": counters.get("evictions", 0),
+            "expired": counters.get("expired", 0),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
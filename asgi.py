@@ -0,0 +1,289 @@
+"""
+ASGI entry point with async versions of the upstream-bound routes.
+
+    uvicorn asgi:app --workers 2
+
+/github_repos, /research_papers and /chat/api await their GitHub, arXiv,
+Papers With Code and OpenAI calls on the event loop (httpx / AsyncOpenAI),
+so a single worker holds hundreds of in-flight upstream calls instead of
+one per thread. They share the response cache, prefetch snapshots and paper
+store with the sync views; the page render runs in a thread, inside a
+normal Flask request context (sessions, flashes, current_user), and so do
+their SQLite lookups, which would otherwise stall the event loop. Every other
+path is served by the Flask app through asgiref's WSGI adapter.
+
+`gunicorn app:app` keeps working unchanged for the sync-only deployment.
+"""
+import asyncio
+import io
+import itertools
+import sys
+from urllib.parse import parse_qsl
+
+import httpx
+from asgiref.wsgi import WsgiToAsgi
+from flask import jsonify
+from werkzeug.datastructures import MultiDict
+
+import metrics
+from app import app as flask_app
+from blueprints import chat, papers, repos
+from config import Config
+from extensions import response_cache, prefetcher, paper_store, page_cache
+from fanout import fan_out_async
+from http_client import get_async_http_client
+
+_openai = None
+
+
+def async_openai():
+    """AsyncOpenAI clients over the async HTTP client's pools, used round-robin (see AsyncHttpClient)."""
+    global _openai
+    if _openai is None:
+        api_key = chat.openai_api_key()
+        if not api_key:
+            raise RuntimeError("OpenAI API key is missing! Set the environment variable OPENAI_API_KEY.")
+        from openai import AsyncOpenAI
+        _openai = itertools.cycle([AsyncOpenAI(api_key=api_key, http_client=client)
+                                   for client in get_async_http_client().clients])
+    return next(_openai)
+
+
+# ---- async fetchers (same signatures as the sync ones, so cache entries are shared) ----
+
+@response_cache.cached_async('github', cache_if=lambda result: result[0], case_insensitive=('search_query',))
+async def get_github_ai_repos(search_query="AI", order="desc", per_page=15, page=1):
+    url, params = repos.github_search_request(search_query, order, per_page, page)
+    try:
+        response = await get_async_http_client().get(url, params=params)
+    except httpx.HTTPError as e:
+        print("Error fetching GitHub repos:", e)
+        return [], 0
+    return repos.parse_github_response(response)
+
+
+@response_cache.cached_async('arxiv', cache_if=lambda result: result[0], case_insensitive=('query',))
+async def get_arxiv_papers(query="artificial intelligence", max_results=5, start=0):
+    try:
+        response = await get_async_http_client().get(papers.arxiv_query_url(query, max_results, start))
+    except httpx.HTTPError as e:
+        print("Error fetching arXiv papers:", e)
+        return [], 0
+    return papers.parse_arxiv_response(response)
+
+
+@response_cache.cached_async('pwc', cache_if=lambda result: result[0], case_insensitive=('query',))
+async def get_paperswithcode_papers(query="artificial intelligence", page_size=5):
+    url, params = papers.pwc_search_request(query, page_size)
+    try:
+        response = await get_async_http_client().get(url, params=params)
+    except httpx.HTTPError as e:
+        print("Error fetching Papers With Code:", e)
+        return [], 0
+    return papers.parse_pwc_response(response)
+
+
+async def prefetched(source, fetch, **params):
+    value = await asyncio.to_thread(prefetcher.lookup, source, **params)
+    return value if value is not None else await fetch(**params)
+
+
+async def stored_page(source, query, start, size, fetch):
+    """Async papers.stored_page(): the paper store's fresh copy, else `await fetch()` recorded into it."""
+    page = await asyncio.to_thread(paper_store.cached_page, source, query, start, size, Config.PAPER_STORE_TTL)
+    if page is not None:
+        return page
+    found, total = await fetch()
+    if not found:
+        return found, total
+    return await asyncio.to_thread(paper_store.record, source, query, start, size, found, total)
+
+
+def research_paper_calls(params):
+    search_query, max_results, start = params["search_query"], params["max_results"], params["start"]
+    calls = {}
+    if params["source"] in ["arxiv", "all"]:
+        calls["arxiv"] = (lambda: stored_page('arxiv', search_query, start, max_results,
+                                              lambda: prefetched('arxiv', get_arxiv_papers, query=search_query,
+                                                                 max_results=max_results, start=start)),
+                          Config.FANOUT_TIMEOUTS["arxiv"])
+    if params["source"] in ["pwc", "all"]:
+        calls["pwc"] = (lambda: stored_page('pwc', search_query, 0, max_results,
+                                            lambda: get_paperswithcode_papers(query=search_query,
+                                                                              page_size=max_results)),
+                        Config.FANOUT_TIMEOUTS["pwc"])
+    return calls
+
+
+# ---- ASGI plumbing ----
+
+def wsgi_environ(scope, body):
+    """WSGI environ for `scope`, so the page render can run in a regular Flask request context."""
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", ""),
+        "PATH_INFO": scope["path"],
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": "HTTP/" + scope.get("http_version", "1.1"),
+        "REMOTE_ADDR": (scope.get("client") or ("", 0))[0],
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            environ[name] = value
+        else:
+            key = "HTTP_" + name
+            environ[key] = environ[key] + "," + value if key in environ else value
+    environ["CONTENT_LENGTH"] = str(len(body))  # the body is already read in full, chunked or not
+    return environ
+
+
+def dispatch(environ, view):
+    """Run `view` like Flask's full_dispatch_request would, returning the finished Response."""
+    with flask_app.request_context(environ):
+        try:
+            try:
+                rv = flask_app.preprocess_request()
+                if rv is None:
+                    rv = view()
+            except Exception as e:
+                rv = flask_app.handle_user_exception(e)
+            return flask_app.finalize_request(rv)
+        except Exception as e:
+            return flask_app.make_response(flask_app.handle_exception(e))
+
+
+async def render(environ, view):
+    return await asyncio.to_thread(dispatch, environ, view)
+
+
+def preflight(environ, parse):
+    """
+    Run the before_request hooks and `parse` the request ahead of an upstream
+    call. Returns (parsed value, None), or (None, response) when a hook or
+    `parse` answered the request (an auth redirect, a 400).
+    """
+    with flask_app.request_context(environ):
+        try:
+            try:
+                rv = flask_app.preprocess_request()
+                if rv is None:
+                    return parse(), None
+            except Exception as e:
+                rv = flask_app.handle_user_exception(e)
+            return None, flask_app.finalize_request(rv)
+        except Exception as e:
+            return None, flask_app.make_response(flask_app.handle_exception(e))
+
+
+def lookup_page(environ, group):
+    """The page cache's response for this request, checked before any upstream call."""
+    with flask_app.request_context(environ):
+        return page_cache.lookup(group)
+
+
+async def github_repos(environ, args):
+    cached = await asyncio.to_thread(lookup_page, environ, 'github_repos')
+    if cached is not None:
+        return cached
+    params = repos.github_repos_params(args)
+    repo_list, total_count = await prefetched('github', get_github_ai_repos, **params)
+    return await render(environ, lambda: page_cache.store('github_repos',
+                                                          repos.render_github_repos(params, repo_list, total_count)))
+
+
+async def research_papers(environ, args):
+    params = papers.research_papers_params(args)
+    if params["source"] in ["gs", "google"]:
+        # scholarly is a blocking client; leave Google Scholar to the sync view
+        return await render(environ, papers.research_papers)
+    cached = await asyncio.to_thread(lookup_page, environ, 'research_papers')
+    if cached is not None:
+        return cached
+    results = await fan_out_async(research_paper_calls(params), deadline=Config.FANOUT_DEADLINE)
+    return await render(environ, lambda: page_cache.store('research_papers',
+                                                          papers.render_research_papers(params, results)))
+
+
+async def chat_api(environ, args):
+    user_message, response = await asyncio.to_thread(preflight, environ, chat.request_message)
+    if response is not None:
+        return response
+    bot_reply = chat.cached_answer(user_message)
+    if bot_reply is None:
+        try:
+            with metrics.timed_upstream('openai'):
+                completion = await async_openai().chat.completions.create(
+                    model=chat.CHAT_MODEL,
+                    store=True,
+                    messages=chat.chat_messages(user_message)
+                )
+            bot_reply = completion.choices[0].message.content
+            chat.remember_answer(user_message, bot_reply)
+        except Exception as e:
+            bot_reply = "Sorry, an error occurred: " + str(e)
+    return await render(environ, lambda: jsonify({'reply': bot_reply}))
+
+
+ASYNC_ROUTES = {
+    ("GET", "/github_repos"): github_repos,
+    ("GET", "/research_papers"): research_papers,
+    ("POST", "/chat/api"): chat_api,
+}
+
+wsgi_app = WsgiToAsgi(flask_app)
+
+
+async def read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+async def send_response(send, response):
+    headers = [(name.lower().encode("latin-1"), value.encode("latin-1"))
+               for name, value in response.headers.to_wsgi_list()]
+    await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": response.get_data()})
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await get_async_http_client().aclose()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    handler = ASYNC_ROUTES.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+    if handler is None:
+        return await wsgi_app(scope, receive, send)
+    opened = metrics.begin_request()  # the Flask hooks in the render thread see this scope and leave it open
+    response = None
+    try:
+        environ = wsgi_environ(scope, await read_body(receive))
+        args = MultiDict(parse_qsl(environ["QUERY_STRING"], keep_blank_values=True))
+        response = await handler(environ, args)
+        await send_response(send, response)
+    finally:
+        metrics.end_request(opened, scope["path"], scope["method"], response.status_code if response else 500)
@@ -0,0 +1,195 @@
+"""
+Concurrency vs latency for the upstream-bound routes, sync vs async.
+
+Serves the stub GitHub / arXiv / Papers With Code payloads and a fake OpenAI
+completion from an asyncio server in a child process (each answering after
+--delay seconds; the thread-per-connection stubs top out near 60 req/s and
+would be the bottleneck), then runs the app in each mode as a real server
+process:
+
+  sync   gunicorn -w 1 -k gthread --threads 8 app:app
+  async  uvicorn asgi:app --workers 1
+
+and drives /github_repos, /research_papers?source=all and /chat/api at
+increasing concurrency. Every request uses a unique query, so caches never
+answer and each one really waits on its upstreams.
+
+Usage: python benchmarks/bench_async_load.py [--delay 0.2] [--concurrency 8 32 128 256] [--threads 8]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_upstreams import RENDERERS  # noqa: E402
+
+_counter = itertools.count()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def chat_completion(path, body):
+    question = (json.loads(body or b"{}").get("messages") or [{}])[-1].get("content", "")
+    return json.dumps({
+        "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": "fake",
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": f"[{question}] stub answer"}}],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 2, "total_tokens": 3},
+    }).encode(), "application/json"
+
+
+async def stub_connection(reader, writer, render, delay):
+    """Minimal keep-alive HTTP/1.1 loop: every request is answered with render() after `delay`."""
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, _ = lines[0].split(" ", 2)
+            headers = dict(line.lower().split(": ", 1) for line in lines[1:] if ": " in line)
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            await asyncio.sleep(delay)
+            url = urlsplit(target)
+            if method == "POST":
+                payload, content_type = render(url.path, body)
+            else:
+                payload, content_type = render(url.path, dict(parse_qsl(url.query)))
+            writer.write(f"HTTP/1.1 200 OK\r\nContent-Type: {content_type}\r\n"
+                         f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def serve_upstreams(delay, conn):
+    """Child process: the stub upstreams and fake OpenAI, off the load generator's CPU budget."""
+    async def serve():
+        urls = {}
+        renderers = dict(RENDERERS, openai=chat_completion)
+        for name, render in renderers.items():
+            server = await asyncio.start_server(
+                lambda r, w, render=render: stub_connection(r, w, render, delay), "127.0.0.1", 0, backlog=1024)
+            urls[name] = "http://127.0.0.1:%d" % server.sockets[0].getsockname()[1]
+        conn.send({"GITHUB_API_URL": urls["github"],
+                   "ARXIV_API_URL": urls["arxiv"] + "/api/query",
+                   "PWC_API_URL": urls["pwc"] + "/api/v1",
+                   "OPENAI_BASE_URL": urls["openai"] + "/v1"})
+        await asyncio.get_running_loop().run_in_executor(None, conn.recv)
+
+    asyncio.run(serve())
+
+
+def start_server(mode, port, threads, env):
+    if mode == "sync":
+        command = [sys.executable, "-m", "gunicorn", "-w", "1", "-k", "gthread", "--threads", str(threads),
+                   "-b", f"127.0.0.1:{port}", "--log-level", "warning", "app:app"]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "asgi:app", "--port", str(port), "--workers", "1",
+                   "--log-level", "warning", "--no-access-log"]
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{mode} server did not start")
+
+
+async def one_request(client, kind):
+    n = next(_counter)
+    start = time.perf_counter()
+    if kind == "repos":
+        response = await client.get("/github_repos", params={"search": f"load {n}"})
+    elif kind == "papers":
+        response = await client.get("/research_papers", params={"source": "all", "search": f"load {n}"})
+    else:
+        response = await client.post("/chat/api", json={"message": f"load question {n}"})
+    return time.perf_counter() - start, response.status_code == 200
+
+
+async def run_level(base_url, concurrency, total):
+    # several small httpx pools: one pool with hundreds of connections caps near 60 req/s
+    limits = httpx.Limits(max_connections=16, max_keepalive_connections=16)
+    clients = [httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits)
+               for _ in range(-(-concurrency // 16))]
+    pool = itertools.cycle(clients)
+    semaphore = asyncio.Semaphore(concurrency)
+    kinds = itertools.cycle(["repos", "papers", "chat"])
+
+    async def bounded(kind):
+        async with semaphore:
+            try:
+                return await one_request(next(pool), kind)
+            except httpx.HTTPError:
+                return None, False
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(bounded(next(kinds)) for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    for client in clients:
+        await client.aclose()
+    latencies = sorted(latency for latency, ok in results if ok)
+    errors = sum(1 for _, ok in results if not ok)
+    return latencies, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delay", type=float, default=0.2, help="upstream response time in seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32, 128, 256])
+    parser.add_argument("--rounds", type=int, default=3, help="requests per client slot at each level")
+    parser.add_argument("--threads", type=int, default=8, help="gunicorn threads in sync mode")
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"])
+    args = parser.parse_args()
+
+    parent_conn, child_conn = multiprocessing.Pipe()
+    upstreams = multiprocessing.Process(target=serve_upstreams, args=(args.delay, child_conn), daemon=True)
+    upstreams.start()
+    env = dict(os.environ, OPENAI_API_KEY="benchmark-dummy-key", PREFETCH_MODE="off", CHAT_CACHE_ENABLED="false",
+               PAPER_STORE_PATH=os.path.join(tempfile.mkdtemp(), "papers.db"))
+    env.update(parent_conn.recv())
+
+    print(f"upstream delay {args.delay * 1000:.0f} ms; sync = 1 worker x {args.threads} threads, async = 1 worker")
+    print(f"{'mode':6} {'conc':>5} {'reqs':>5} {'req/s':>7} {'p50 ms':>8} {'p99 ms':>8} {'errors':>6}")
+    for mode in args.modes:
+        port = free_port()
+        server = start_server(mode, port, args.threads, env)
+        try:
+            for concurrency in args.concurrency:
+                total = concurrency * args.rounds
+                latencies, errors, elapsed = asyncio.run(run_level(f"http://127.0.0.1:{port}", concurrency, total))
+                p50 = statistics.median(latencies) * 1000 if latencies else float("nan")
+                p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000 if latencies else float("nan")
+                print(f"{mode:6} {concurrency:5d} {total:5d} {len(latencies) / elapsed:7.1f} "
+                      f"{p50:8.0f} {p99:8.0f} {errors:6d}")
+        finally:
+            server.terminate()
+            server.wait()
+    parent_conn.send("stop")
+    upstreams.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Time-to-first-byte and total time for /chat/api (JSON) vs /chat/api/stream (SSE).
+
+Runs the app on a local threaded server against benchmarks/fake_openai.py,
+so no OpenAI key or network access is needed.
+
+Usage: python benchmarks/bench_chat_stream.py [--tokens 40] [--token-delay 0.02] [--runs 5]
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_openai import FakeOpenAI  # noqa: E402
+
+
+def measure(port, path):
+    """Returns (seconds to first body byte, seconds to end of response)."""
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    start = time.perf_counter()
+    conn.request("POST", path, body=json.dumps({"message": "what is a transformer"}),
+                 headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    response.read1(1) if hasattr(response, "read1") else response.read(1)
+    first = time.perf_counter() - start
+    response.read()
+    total = time.perf_counter() - start
+    conn.close()
+    return first, total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    fake = FakeOpenAI(tokens=args.tokens, token_delay=args.token_delay).start()
+    os.environ["OPENAI_BASE_URL"] = fake.url + "/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark-dummy-key")
+    # Every run asks the same question: without this the answer cache serves all but the first
+    os.environ["CHAT_CACHE_ENABLED"] = "0"
+
+    from werkzeug.serving import make_server
+    import app as hub
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, hub.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+
+    print(f"{args.tokens} tokens at {args.token_delay * 1000:.0f} ms/token, {args.runs} runs")
+    print(f"{'endpoint':20} {'ttfb ms':>10} {'total ms':>10}")
+    for path in ("/chat/api", "/chat/api/stream"):
+        samples = [measure(port, path) for _ in range(args.runs)]
+        ttfb = statistics.median(s[0] for s in samples) * 1000
+        total = statistics.median(s[1] for s in samples) * 1000
+        print(f"{path:20} {ttfb:10.1f} {total:10.1f}")
+
+    server.shutdown()
+    fake.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Course search benchmark over a synthetic catalog (default: 100x courses.csv).
+
+Builds the index, times a mix of full-word and type-ahead queries (with the
+result cache cleared before every query, then with it warm), checks the
+top results against brute-force BM25 scoring, and times an incremental resync
+after editing 1% of the rows. Exits non-zero when the uncached p99 is above
+--max-p99-ms (1 ms by default).
+
+Usage: python benchmarks/bench_course_search.py [--scale 100] [--queries 2000] [--max-p99-ms 1]
+"""
+import argparse
+import csv
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from course_catalog import CourseCatalog  # noqa: E402
+from course_search import CourseSearchIndex, tokenize  # noqa: E402
+
+QUERIES = [
+    "deep learning", "neural networks", "machine learning python", "data analyst",
+    "generative ai", "reinforcement", "computer vision", "natural language processing",
+    "tensorflow", "cloud", "intro", "statis", "prompt engin", "ai for everyone",
+]
+
+
+def synthetic_rows(scale, seed=7):
+    with open(Config.COURSES_CSV_PATH, newline='', encoding='utf-8') as csvfile:
+        base = list(csv.DictReader(csvfile))
+    vocab = sorted({t for row in base for t in tokenize(row["Title"] + " " + row["Description"])})
+    rng = random.Random(seed)
+    rows = []
+    for i in range(len(base) * scale):
+        row = dict(base[i % len(base)])
+        extra = " ".join(rng.choice(vocab) for _ in range(rng.randint(2, 8)))
+        row["Title"] = f"{row['Title']} {rng.choice(vocab).title()} {i}"
+        row["Description"] = f"{row['Description']} {extra}"
+        row["URL"] = f"{row['URL']}?v={i}"
+        rows.append(row)
+    return rows
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=["Title", "Description", "URL", "Tag"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def brute_force(index, query, limit):
+    terms = set(tokenize(query))
+    terms.update(index._terms_with_prefix(tokenize(query)[-1]))
+    totals = {}
+    for term in terms:
+        impact = index._impact(term)
+        if impact is None:
+            continue
+        for doc_id, score in impact[1].items():
+            totals[doc_id] = totals.get(doc_id, 0.0) + score
+    return sorted(((s, d) for d, s in totals.items()), key=lambda x: (-x[0], x[1]))[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--max-p99-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.scale)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "courses.csv")
+        write_csv(path, rows)
+        catalog = CourseCatalog(path)
+
+        start = time.perf_counter()
+        index = CourseSearchIndex()
+        index.sync(catalog.all(), catalog.version)
+        print(f"rows: {len(index)}  build: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        # Warm the per-term impact lists, then check ranking against brute force.
+        for q in QUERIES:
+            got = [(round(s, 9), d) for s, d in index._threshold_top_k(index._lists(tokenize(q), True), args.limit)]
+            want = [(round(s, 9), d) for s, d in brute_force(index, q, args.limit)]
+            assert [s for s, _ in got] == [s for s, _ in want], f"ranking mismatch for {q!r}"
+
+        p99 = {}
+        for label, clear_results in (("uncached", True), ("result cache", False)):
+            timings = []
+            for i in range(args.queries):
+                q = QUERIES[i % len(QUERIES)]
+                if clear_results:
+                    index._results.clear()
+                start = time.perf_counter()
+                index.search(q, limit=args.limit)
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            p99[label] = timings[int(len(timings) * 0.99)]
+            print(f"{label:13} queries: {len(timings)}  mean: {statistics.mean(timings):.3f} ms  "
+                  f"p50: {timings[len(timings) // 2]:.3f} ms  p99: {p99[label]:.3f} ms")
+
+        # Incremental rebuild: touch 1% of rows and resync.
+        rng = random.Random(1)
+        for row in rng.sample(rows, max(1, len(rows) // 100)):
+            row["Description"] += " freshly updated"
+        write_csv(path, rows)
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 1))
+        start = time.perf_counter()
+        index.sync(catalog.all(), catalog.version)
+        print(f"incremental resync (1% changed): {(time.perf_counter() - start) * 1000:.1f} ms "
+              f"(includes CSV reload)")
+
+    if p99["uncached"] > args.max_p99_ms:
+        print(f"FAIL: uncached p99 {p99['uncached']:.3f} ms is above {args.max_p99_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Compiled (memory-mapped, columnar) course catalog vs csv.DictReader on a
+synthetic catalog (default 1M rows).
+
+Each reader runs in its own process, which reports:
+  load       time until the first row can be served
+  anon MB    private memory added (RssAnon): what every gunicorn worker pays
+  file MB    file-backed pages touched (RssFile): shared between workers
+  get us     one random row by index, reading Title and URL
+  tag page   first 50 rows of one tag, reading every column
+  scan s     reading the Title of every row
+
+"dictreader" parses the whole file into dicts (what CourseCatalog does
+without a compiled file); "dictreader scan" is the per-request CSV scan
+that start_course did before the in-memory catalog.
+
+Usage: python benchmarks/bench_course_store.py [--rows 1000000] [--lookups 10000]
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TAGS = ("Coursera", "Udacity", "edX", "fast.ai", "Kaggle", "DeepLearning.AI", "Google", "Microsoft")
+WORDS = ("deep learning neural networks machine vision language models reinforcement data science python "
+         "statistics transformers generative ai cloud robotics nlp mlops probability optimization").split()
+COLUMNS = ["Title", "Description", "URL", "Tag"]
+
+
+def write_csv(path, rows):
+    rng = random.Random(7)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for i in range(rows):
+            writer.writerow([" ".join(rng.choices(WORDS, k=4)).title() + f" {i}",
+                             " ".join(rng.choices(WORDS, k=15)),
+                             f"https://courses.example.com/{i}", TAGS[i % len(TAGS)]])
+
+
+def memory():
+    """(RssAnon, RssFile) in MB from /proc, or zeros where unavailable."""
+    values = {"RssAnon": 0, "RssFile": 0}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                key = line.split(":")[0]
+                if key in values:
+                    values[key] = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return values["RssAnon"], values["RssFile"]
+
+
+def run_reader(mode, csv_path, catalog_path, rows_in_csv, lookups):
+    rng = random.Random(11)
+    anon0, file0 = memory()
+    start = time.perf_counter()
+    if mode == "compiled":
+        from course_store import CompiledCatalog
+        catalog = CompiledCatalog(catalog_path)
+        rows = catalog.all_rows()
+        rows[0]["Title"]
+        load = time.perf_counter() - start
+        count = len(rows)
+        tag_rows = catalog.tag_rows("kaggle")
+    elif mode == "dictreader":
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        load = time.perf_counter() - start
+        count = len(rows)
+        tag_rows = [row for row in rows if row["Tag"].lower() == "kaggle"]
+    else:
+        load, count, rows, tag_rows = 0.0, None, None, None
+
+    result = {"load": load}
+    if mode == "dictreader scan":
+        # Re-read the CSV up to the wanted row on every request
+        samples = 20
+        total = 0.0
+        for _ in range(samples):
+            wanted = rng.randrange(rows_in_csv)
+            start = time.perf_counter()
+            with open(csv_path, newline="", encoding="utf-8") as f:
+                for i, row in enumerate(csv.DictReader(f)):
+                    if i == wanted:
+                        row["Title"], row["URL"]
+                        break
+            total += time.perf_counter() - start
+        result.update(get_us=total / samples * 1e6, tag_page_us=None, scan=None)
+    else:
+        indexes = [rng.randrange(count) for _ in range(lookups)]
+        start = time.perf_counter()
+        for i in indexes:
+            row = rows[i]
+            row["Title"], row["URL"]
+        result["get_us"] = (time.perf_counter() - start) / lookups * 1e6
+        start = time.perf_counter()
+        for _ in range(100):
+            for row in tag_rows[:50]:
+                [row[column] for column in COLUMNS]
+        result["tag_page_us"] = (time.perf_counter() - start) / 100 * 1e6
+        start = time.perf_counter()
+        for row in rows:
+            row["Title"]
+        result["scan"] = time.perf_counter() - start
+    anon1, file1 = memory()
+    result.update(anon_mb=anon1 - anon0, file_mb=file1 - file0)
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--lookups", type=int, default=10000)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--csv", help=argparse.SUPPRESS)
+    parser.add_argument("--catalog", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_reader(args.child, args.csv, args.catalog, args.rows, args.lookups)
+        return
+
+    import course_store
+
+    workdir = tempfile.mkdtemp(prefix="bench_course_store_")
+    csv_path = os.path.join(workdir, "courses.csv")
+    catalog_path = os.path.join(workdir, "courses.catalog")
+    write_csv(csv_path, args.rows)
+    start = time.perf_counter()
+    course_store.build(csv_path, catalog_path)
+    print(f"{args.rows} rows: CSV {os.path.getsize(csv_path) / 1e6:.0f} MB, "
+          f"catalog {os.path.getsize(catalog_path) / 1e6:.0f} MB, built in {time.perf_counter() - start:.1f}s\n")
+
+    print(f"{'reader':16} {'load s':>8} {'anon MB':>8} {'file MB':>8} {'get us':>9} {'tag page us':>12} {'scan s':>7}")
+    for mode in ("dictreader", "dictreader scan", "compiled"):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode, "--csv", csv_path,
+                                 "--catalog", catalog_path, "--rows", str(args.rows),
+                                 "--lookups", str(args.lookups)],
+                                capture_output=True, text=True, check=True).stdout
+        r = json.loads(output.strip().splitlines()[-1])
+        tag_page = f"{r['tag_page_us']:12.1f}" if r["tag_page_us"] is not None else f"{'-':>12}"
+        scan = f"{r['scan']:7.2f}" if r["scan"] is not None else f"{'-':>7}"
+        print(f"{mode:16} {r['load']:8.3f} {r['anon_mb']:8.1f} {r['file_mb']:8.1f} {r['get_us']:9.1f} {tag_page} {scan}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Compares requests/sec for /courses and /start_course before and after the
+in-memory course catalog.
+
+Usage: python benchmarks/bench_courses.py [--requests 500]
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-dummy-key")
+
+from app import app, Config  # noqa: E402
+from course_catalog import get_catalog  # noqa: E402
+
+
+def legacy_courses(tag_filter="all"):
+    """The pre-catalog /courses data path: re-parse the whole CSV."""
+    courses_list = []
+    all_tags_set = set()
+    with open(Config.COURSES_CSV_PATH, newline='', encoding='utf-8') as csvfile:
+        for idx, row in enumerate(csv.DictReader(csvfile)):
+            row['index'] = idx
+            courses_list.append(row)
+            tag = row.get("Tag", "").strip()
+            if tag:
+                all_tags_set.add(tag)
+    sorted(all_tags_set, key=str.lower)
+    if tag_filter != "all":
+        courses_list = [c for c in courses_list if c.get("Tag", "").lower() == tag_filter]
+    return courses_list
+
+
+def legacy_start_course(course_index):
+    """The pre-catalog /start_course lookup: linear scan to one row."""
+    with open(Config.COURSES_CSV_PATH, newline='', encoding='utf-8') as csvfile:
+        for idx, row in enumerate(csv.DictReader(csvfile)):
+            if idx == course_index:
+                return row
+    return None
+
+
+def rate(fn, n):
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    n = args.requests
+
+    catalog = get_catalog(Config.COURSES_CSV_PATH)
+    size = len(catalog.all())
+    client = app.test_client()
+
+    print(f"catalog rows: {size}, requests per case: {n}")
+    print(f"{'case':40} {'req/s':>12}")
+    cases = [
+        ("courses data path (legacy csv)", lambda i: legacy_courses("udacity")),
+        ("courses data path (catalog)", lambda i: catalog.by_tag("udacity")),
+        ("start_course lookup (legacy csv)", lambda i: legacy_start_course(i % size)),
+        ("start_course lookup (catalog)", lambda i: catalog.get(i % size)),
+        ("GET /courses?tag=udacity (catalog)", lambda i: client.get("/courses?tag=udacity")),
+    ]
+    for name, fn in cases:
+        print(f"{name:40} {rate(fn, n):12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Multi-process write/read contention on SQLite: default journaling vs the
+tuned connection settings from database.py (WAL, synchronous=NORMAL,
+busy_timeout, mmap_size).
+
+Writer processes insert-and-commit saved items (like the save routes);
+reader processes run the saved_content tab query. Reports operations per
+second and "database is locked" errors for each mode.
+
+Usage: python benchmarks/bench_db_contention.py [--writers 4] [--readers 4] [--seconds 5]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlalchemy as sa  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+import database  # noqa: E402
+
+SCHEMA = [
+    "CREATE TABLE saved_items (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, item_type VARCHAR(50),"
+    " title VARCHAR(300), url VARCHAR(300), date_saved DATETIME, course_status VARCHAR(20))",
+    "CREATE INDEX ix_saved_items_user_type_date ON saved_items (user_id, item_type, date_saved)",
+]
+
+
+def make_engine(path, tuned):
+    uri = "sqlite:///" + path
+    if not tuned:
+        # What the app used before: default options, rollback journal, synchronous=FULL
+        return sa.create_engine(uri)
+    engine = sa.create_engine(uri, **database.engine_options(uri))
+    database.configure_engine(engine, database.sqlite_pragmas())
+    with engine.connect() as conn:
+        database.enable_wal(conn)  # what the sqlite_wal_journal migration does to app.db
+    return engine
+
+
+def worker(path, tuned, role, seconds, worker_id, results):
+    engine = make_engine(path, tuned)
+    ops = errors = 0
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        try:
+            with engine.begin() as conn:
+                if role == "writer":
+                    conn.execute(sa.text(
+                        "INSERT INTO saved_items (user_id, item_type, title, url, date_saved)"
+                        " VALUES (:u, 'repo', :t, :t, CURRENT_TIMESTAMP)"), {"u": worker_id % 50, "t": f"w{worker_id}-{ops}"})
+                else:
+                    conn.execute(sa.text(
+                        "SELECT * FROM saved_items WHERE user_id = :u AND item_type = 'repo'"
+                        " ORDER BY date_saved DESC, id DESC LIMIT 31"), {"u": ops % 50}).fetchall()
+            ops += 1
+        except OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            errors += 1
+    engine.dispose()
+    results.put((role, ops, errors))
+
+
+def run(tuned, writers, readers, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "contention.db")
+        engine = make_engine(path, tuned)
+        with engine.begin() as conn:
+            for statement in SCHEMA:
+                conn.execute(sa.text(statement))
+        engine.dispose()
+
+        results = multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=worker, args=(path, tuned, role, seconds, i, results))
+                 for i, role in enumerate(["writer"] * writers + ["reader"] * readers)]
+        for p in procs:
+            p.start()
+        totals = {"writer": [0, 0], "reader": [0, 0]}
+        for _ in procs:
+            role, ops, errors = results.get()
+            totals[role][0] += ops
+            totals[role][1] += errors
+        for p in procs:
+            p.join()
+    return {role: (ops / seconds, errors) for role, (ops, errors) in totals.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.writers} writer / {args.readers} reader processes, {args.seconds:.0f} s per mode")
+    print(f"{'mode':10} {'writes/s':>10} {'reads/s':>10} {'locked errors':>14}")
+    for label, tuned in (("default", False), ("tuned", True)):
+        result = run(tuned, args.writers, args.readers, args.seconds)
+        errors = result["writer"][1] + result["reader"][1]
+        print(f"{label:10} {result['writer'][0]:10.0f} {result['reader'][0]:10.0f} {errors:14d}")
+
+
+if __name__ == '__main__':
+    main()
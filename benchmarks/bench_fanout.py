@@ -0,0 +1,82 @@
+"""
+Test harness for the research_papers?source=all fan-out.
+
+Starts local arXiv / Papers With Code stubs with injected delays and checks:
+  * both upstreams are queried in parallel (latency ~ max, not sum),
+  * a source slower than its timeout is dropped and the rest still render,
+  * a failing source is reported while the other's results are shown.
+
+Usage: python benchmarks/bench_fanout.py [--delay 0.5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-dummy-key")
+os.environ["PAPER_STORE_TTL"] = "0"         # every request goes upstream, never to stored pages
+os.environ["PREFETCH_MODE"] = "off"
+os.environ["PAGE_CACHE_ENABLED"] = "0"      # each check must render the page, not replay the first one
+
+from stub_upstreams import StubUpstreams  # noqa: E402
+
+stubs = StubUpstreams().start()
+stubs.apply_env()
+
+import app as hub  # noqa: E402
+from blueprints import papers  # noqa: E402
+
+
+def timed_get(client, url):
+    hub.response_cache.backend.clear()
+    start = time.perf_counter()
+    response = client.get(url)
+    return response, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delay", type=float, default=0.5)
+    args = parser.parse_args()
+    client = hub.app.test_client()
+    url = "/research_papers?source=all&search=transformers"
+    failures = 0
+
+    def check(label, condition, detail):
+        nonlocal failures
+        failures += not condition
+        print(f"[{'ok' if condition else 'FAIL'}] {label}: {detail}")
+
+    # 1) Sequential baseline vs concurrent fan-out with equal delays.
+    stubs.configure("arxiv", delay=args.delay)
+    stubs.configure("pwc", delay=args.delay)
+    hub.response_cache.backend.clear()
+    start = time.perf_counter()
+    papers.get_arxiv_papers(query="transformers", max_results=10, start=0)
+    papers.get_paperswithcode_papers(query="transformers", page_size=10)
+    sequential = time.perf_counter() - start
+    response, concurrent = timed_get(client, url)
+    check("parallel fan-out", concurrent < sequential * 0.75 and response.data.count(b"card-title") == 20,
+          f"sequential {sequential * 1000:.0f} ms, fan-out {concurrent * 1000:.0f} ms")
+
+    # 2) One source slower than its timeout: partial results within the timeout.
+    hub.Config.FANOUT_TIMEOUTS["pwc"] = args.delay * 2
+    stubs.configure("arxiv", delay=0)
+    stubs.configure("pwc", delay=args.delay * 4)
+    response, elapsed = timed_get(client, url)
+    check("slow source times out", b"timed out" in response.data and response.data.count(b"card-title") == 10
+          and elapsed < args.delay * 3, f"{elapsed * 1000:.0f} ms, arXiv results only")
+
+    # 3) One source failing outright.
+    stubs.configure("pwc", status=500)
+    response, elapsed = timed_get(client, url)
+    check("failing source", response.data.count(b"card-title") == 10, f"{elapsed * 1000:.0f} ms, arXiv results only")
+
+    stubs.stop()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Course page extraction throughput and memory per HTML backend
+(html_extract.py) over the saved pages in fixtures/.
+
+Each backend runs in its own child process so the reported max RSS growth
+covers C-side trees (lxml, Lexbor) that tracemalloc cannot see; tracemalloc
+peak is printed too for the Python-object share. Rows extracted are checked
+to be identical across backends.
+
+Usage: python benchmarks/bench_html_backends.py [--repeat 200] [--backends lxml soup ...]
+"""
+import argparse
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import html_extract  # noqa: E402
+from course_ingest import SOURCES  # noqa: E402
+
+
+def load_pages():
+    pages = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "fixtures", "*_page*.html"))):
+        name = os.path.basename(path).split("_page")[0]
+        if name in SOURCES:
+            with open(path, encoding="utf-8") as f:
+                pages.append((SOURCES[name], f.read()))
+    return pages
+
+
+def child(backend, repeat):
+    """Runs in the subprocess: time `repeat` passes over every fixture page."""
+    pages = load_pages()
+    for source, _ in pages:
+        source.html_backend = backend
+    html_extract.get_backend(backend)
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rows = [source.parse(html) for source, html in pages]
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for source, html in pages:
+            source.parse(html)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for source, html in pages:
+        source.parse(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(json.dumps({
+        "backend": backend,
+        "pages_per_s": repeat * len(pages) / elapsed,
+        "ms_per_page": elapsed * 1000 / (repeat * len(pages)),
+        "tracemalloc_peak_kib": peak / 1024,
+        "rss_growth_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss,
+        "rows": rows,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--backends", nargs="+", default=["html.parser", "soup", "lxml", "selectolax"])
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.repeat)
+        return
+
+    print(f"{len(load_pages())} fixture pages, {args.repeat} passes each")
+    print(f"{'backend':12} {'pages/s':>9} {'ms/page':>8} {'py peak KiB':>12} {'RSS +KiB':>9}  rows")
+    reference = None
+    for backend in args.backends:
+        out = subprocess.run([sys.executable, __file__, "--child", backend, "--repeat", str(args.repeat)],
+                             capture_output=True, text=True, check=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        if reference is None:
+            reference = result["rows"]
+        same = "same" if result["rows"] == reference else "DIFFERENT"
+        print(f"{backend:12} {result['pages_per_s']:9.0f} {result['ms_per_page']:8.2f} "
+              f"{result['tracemalloc_peak_kib']:12.0f} {result['rss_growth_kib']:9d}  "
+              f"{sum(len(r) for r in result['rows'])} ({same})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Measures how long `import app` takes in a fresh interpreter (what every
+gunicorn / uvicorn worker pays on boot) using `python -X importtime`, and
+lists the packages that account for most of it.
+
+Pass --compare <git ref> to run the same measurement against an older
+checkout (extracted with `git archive` into a temp directory), e.g. the
+commit before the application factory:
+
+Usage: python benchmarks/bench_importtime.py [--runs 5] [--top 10] [--compare HEAD~1]
+"""
+import argparse
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_profile(workdir):
+    """(total µs, {top-level package: self µs summed over its modules}) of `import app` in `workdir`."""
+    env = dict(os.environ, OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "benchmark-dummy-key"),
+               PREFETCH_MODE="off", PYTHONDONTWRITEBYTECODE="")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"], cwd=workdir, env=env,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import app failed in {workdir}:\n{result.stderr[-2000:]}")
+    total, modules = 0, {}
+    for match in LINE.finditer(result.stderr):
+        own, cumulative, name = int(match.group(1)), int(match.group(2)), match.group(4)
+        package = name.split(".")[0]
+        modules[package] = modules.get(package, 0) + own
+        if len(match.group(3)) == 1:  # top-level import (nested ones are indented further)
+            total += cumulative
+    return total, modules
+
+
+def measure(workdir, runs):
+    profiles = [import_profile(workdir) for _ in range(runs)]
+    best = min(profiles, key=lambda p: p[0])
+    return statistics.median(p[0] for p in profiles), best[1]
+
+
+def export_ref(ref):
+    """Extract `ref` into a temp directory; the shared app.db / courses.csv are copied in as-is."""
+    target = tempfile.mkdtemp(prefix="bench_importtime_")
+    archive = os.path.join(target, "src.tar")
+    subprocess.run(["git", "archive", "--output", archive, ref], cwd=ROOT, check=True)
+    with tarfile.open(archive) as tar:
+        tar.extractall(target)
+    os.remove(archive)
+    for name in ("app.db", "courses.csv"):
+        if os.path.exists(os.path.join(ROOT, name)):
+            shutil.copy(os.path.join(ROOT, name), target)
+    return target
+
+
+def report(label, total, modules, top):
+    print(f"{label}: import app {total / 1000:.0f} ms (median)")
+    for name, micros in sorted(modules.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--compare", help="git ref to measure as the baseline")
+    args = parser.parse_args()
+
+    # The checked-in app.db is restored afterwards in case an older tree writes to it on import
+    db_path = os.path.join(ROOT, "app.db")
+    backup = db_path + ".bench-backup"
+    shutil.copy(db_path, backup)
+    try:
+        total, modules = measure(ROOT, args.runs)
+        report("working tree", total, modules, args.top)
+        if args.compare:
+            baseline_dir = export_ref(args.compare)
+            try:
+                before, before_modules = measure(baseline_dir, args.runs)
+            finally:
+                shutil.rmtree(baseline_dir, ignore_errors=True)
+            print()
+            report(args.compare, before, before_modules, args.top)
+            print(f"\n{before / 1000:.0f} ms -> {total / 1000:.0f} ms ({before / total:.1f}x faster)")
+    finally:
+        shutil.move(backup, db_path)
+
+
+if __name__ == '__main__':
+    main()
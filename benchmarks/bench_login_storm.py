@@ -0,0 +1,203 @@
+"""
+Login storm: a burst of concurrent POST /login against a real threaded
+server while other threads keep browsing, run with the bounded
+password-hashing pool (default queue, and a short queue that sheds load
+with 503s) and with hashing effectively unbounded (one worker per request
+thread). Reports login throughput and 503s, and the latency the other
+pages see during the storm.
+
+Then measures authenticated page views (/saved_content) with the session
+user cache on and off, counting the users lookups per request.
+
+Each configuration runs in a child process so the PASSWORD_HASH_* and
+USER_CACHE_* settings are read from the environment as in production.
+
+Usage: python benchmarks/bench_login_storm.py [--logins 200] [--concurrency 64] [--browsers 4]
+                                              [--views 500] [--method scrypt:32768:8:1]
+"""
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "bench-password"
+USERS = 50
+
+CONFIGS = [
+    ("bounded pool", {"PASSWORD_HASH_WORKERS": "2", "PASSWORD_HASH_MAX_PENDING": "32"}),
+    ("short queue", {"PASSWORD_HASH_WORKERS": "2", "PASSWORD_HASH_MAX_PENDING": "4"}),
+    ("unbounded", {"PASSWORD_HASH_WORKERS": "256", "PASSWORD_HASH_MAX_PENDING": "100000"}),
+]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000 if values else 0.0
+
+
+def request(port, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+
+def seed(hub, method):
+    from werkzeug.security import generate_password_hash
+    with hub.app.app_context():
+        hub.db.create_all()
+        hub.migrations.upgrade(hub.db.engine)
+        password_hash = generate_password_hash(PASSWORD, method)
+        hub.db.session.execute(hub.User.__table__.insert(), [
+            {"username": f"user{i}", "password_hash": password_hash, "role": "user"} for i in range(USERS)])
+        hub.db.session.commit()
+
+
+def run_storm(args):
+    """Child process: serve the app and hit it with the login storm."""
+    import app as hub
+    from werkzeug.serving import make_server
+    from extensions import hash_pool
+
+    seed(hub, args.method)
+    server = make_server("127.0.0.1", 0, hub.app, threaded=True)
+    port = server.server_port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    stop = threading.Event()
+    page_latencies = []
+
+    def browse():
+        while not stop.is_set():
+            start = time.perf_counter()
+            request(port, "GET", "/")
+            page_latencies.append(time.perf_counter() - start)
+
+    baseline = []
+    for _ in range(50):
+        start = time.perf_counter()
+        request(port, "GET", "/")
+        baseline.append(time.perf_counter() - start)
+
+    statuses = []
+    lock = threading.Lock()
+    remaining = iter(range(args.logins))
+
+    def login():
+        while True:
+            with lock:
+                i = next(remaining, None)
+            if i is None:
+                return
+            body = urllib.parse.urlencode({"username": f"user{i % USERS}", "password": PASSWORD})
+            status = request(port, "POST", "/login", body,
+                             {"Content-Type": "application/x-www-form-urlencoded"})
+            with lock:
+                statuses.append(status)
+
+    browsers = [threading.Thread(target=browse) for _ in range(args.browsers)]
+    for thread in browsers:
+        thread.start()
+    start = time.perf_counter()
+    logins = [threading.Thread(target=login) for _ in range(args.concurrency)]
+    for thread in logins:
+        thread.start()
+    for thread in logins:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for thread in browsers:
+        thread.join()
+    server.shutdown()
+
+    print(json.dumps({
+        "ok": statuses.count(302), "busy": statuses.count(503), "elapsed": elapsed,
+        "page_p50_idle": percentile(baseline, 0.5),
+        "page_p50": percentile(page_latencies, 0.5), "page_p99": percentile(page_latencies, 0.99),
+        "rejected": hash_pool.stats()["rejected"],
+    }))
+
+
+def run_views(args):
+    """Child process: authenticated page views through the test client."""
+    import app as hub
+    from sqlalchemy import event
+    from extensions import user_cache
+
+    seed(hub, "pbkdf2:sha256:1000")
+    client = hub.app.test_client()
+    client.post("/login", data={"username": "user0", "password": PASSWORD})
+    lookups = [0]
+    with hub.app.app_context():
+        event.listen(hub.db.engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *rest: lookups.__setitem__(0, lookups[0] + ("FROM users" in statement)))
+    client.get("/saved_content")
+    lookups[0] = 0
+    start = time.perf_counter()
+    for _ in range(args.views):
+        client.get("/saved_content")
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"rps": args.views / elapsed, "user_queries": lookups[0] / args.views,
+                      "hits": user_cache.stats()["hits"]}))
+
+
+def child(mode, args, env):
+    workdir = tempfile.mkdtemp(prefix="bench_login_storm_")
+    env = dict(os.environ, **env)
+    env.update({
+        "DATABASE_URL": "sqlite:///" + os.path.join(workdir, "app.db"),
+        "PREFETCH_MODE": "off",
+        "PAGE_CACHE_ENABLED": "0",
+        "PASSWORD_HASH_METHOD": args.method,
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "benchmark-dummy-key"),
+    })
+    command = [sys.executable, os.path.abspath(__file__), "--child", mode, "--logins", str(args.logins),
+               "--concurrency", str(args.concurrency), "--browsers", str(args.browsers),
+               "--views", str(args.views), "--method", args.method]
+    output = subprocess.run(command, env=env, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--browsers", type=int, default=4)
+    parser.add_argument("--views", type=int, default=500)
+    parser.add_argument("--method", default="scrypt:32768:8:1")
+    parser.add_argument("--child", choices=["storm", "views"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, ROOT)
+        (run_storm if args.child == "storm" else run_views)(args)
+        return
+
+    print(f"{args.logins} logins from {args.concurrency} threads ({args.method}), {args.browsers} threads browsing /")
+    print(f"{'hashing':14} {'ok':>5} {'503':>5} {'login/s':>8} {'/ p50 idle':>11} {'/ p50':>9} {'/ p99':>9}")
+    for name, env in CONFIGS:
+        r = child("storm", args, env)
+        print(f"{name:14} {r['ok']:5d} {r['busy']:5d} {(r['ok'] + r['busy']) / r['elapsed']:8.1f} "
+              f"{r['page_p50_idle']:9.1f}ms {r['page_p50']:7.1f}ms {r['page_p99']:7.1f}ms")
+
+    print(f"\n{args.views} authenticated /saved_content views")
+    print(f"{'user cache':14} {'req/s':>8} {'users queries/req':>18}")
+    for name, enabled in (("on", "1"), ("off", "0")):
+        r = child("views", args, {"USER_CACHE_ENABLED": enabled})
+        print(f"{name:14} {r['rps']:8.1f} {r['user_queries']:18.2f}")
+
+
+if __name__ == '__main__':
+    main()
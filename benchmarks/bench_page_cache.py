@@ -0,0 +1,73 @@
+"""
+Requests/sec for the public listing pages rendered on every request, served
+from the page cache, and revalidated with If-None-Match (304).
+
+Seeds a throwaway database with approved peer articles; /courses uses the
+configured courses.csv.
+
+Usage: python benchmarks/bench_page_cache.py [--requests 300] [--articles 500]
+"""
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+workdir = tempfile.mkdtemp(prefix="bench_page_cache_")
+os.environ.update({
+    "DATABASE_URL": "sqlite:///" + os.path.join(workdir, "app.db"),
+    "PREFETCH_MODE": "off",
+    "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "benchmark-dummy-key"),
+})
+
+import app as hub  # noqa: E402
+from extensions import page_cache  # noqa: E402
+
+URLS = ["/peer_articles", "/courses?tag=all", "/courses?tag=udacity"]
+
+
+def seed(articles):
+    with hub.app.app_context():
+        hub.db.create_all()
+        hub.migrations.upgrade(hub.db.engine)
+        hub.create_default_admin()
+        base = datetime.datetime(2024, 1, 1)
+        hub.db.session.execute(hub.PeerArticle.__table__.insert(), [
+            {"user_id": 1, "name": f"Writer {i}", "title": f"Article {i} on neural networks",
+             "description": "word " * 80, "keywords": "ai, ml", "url": f"https://example.com/{i}",
+             "date_submitted": base + datetime.timedelta(minutes=i), "status": "approved"}
+            for i in range(articles)])
+        hub.db.session.commit()
+
+
+def rate(client, url, n, headers=None, clear=False):
+    start = time.perf_counter()
+    for _ in range(n):
+        if clear:
+            page_cache.backend.clear()
+        client.get(url, headers=headers)
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--articles", type=int, default=500)
+    args = parser.parse_args()
+    seed(args.articles)
+    client = hub.app.test_client()
+
+    print(f"{'page':24} {'render req/s':>14} {'cached req/s':>14} {'304 req/s':>12}")
+    for url in URLS:
+        rendered = rate(client, url, args.requests, clear=True)
+        etag = client.get(url).headers["ETag"]
+        cached = rate(client, url, args.requests)
+        revalidated = rate(client, url, args.requests, headers={"If-None-Match": etag})
+        print(f"{url:24} {rendered:14.1f} {cached:14.1f} {revalidated:12.1f}")
+    print(page_cache.stats()["groups"])
+
+
+if __name__ == '__main__':
+    main()
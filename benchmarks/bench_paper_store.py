@@ -0,0 +1,92 @@
+"""
+Paper store (paper_store.py) at scale: bulk-loads synthetic papers with
+abstracts, then times the lookups the research_papers route makes -
+canonical key resolution, a recorded result page, and FTS5 searches for a
+rare and a common term - plus cross-source merge checks.
+
+Usage: python benchmarks/bench_paper_store.py [--papers 200000] [--path /tmp/papers.db]
+       (--papers 1000000 for the million-abstract case; the load takes a few minutes)
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from paper_store import PaperStore  # noqa: E402
+
+TOPIC_WORDS = ("learning neural network transformer attention graph diffusion model reinforcement policy "
+               "vision language retrieval agent benchmark optimization gradient sparse robust causal "
+               "generative contrastive federated quantization distillation embedding multimodal").split()
+# Topic words plus a long tail of filler terms, drawn with Zipf-like weights like real abstracts
+WORDS = TOPIC_WORDS + [f"term{i}" for i in range(20000)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(WORDS))]
+
+
+def synthetic_paper(i, rng):
+    title = " ".join(rng.choices(WORDS, WEIGHTS, k=6)).title() + f" {i}"
+    summary = " ".join(rng.choices(WORDS, WEIGHTS, k=120))
+    return {"title": title, "summary": summary, "authors": f"Author {i % 5000}, Author {(i * 7) % 5000}",
+            "published": "2024-01-01", "link": f"http://arxiv.org/abs/24{i // 100000:02d}.{i % 100000:05d}v1",
+            "journal_ref": "N/A"}
+
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--papers", type=int, default=200000)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--path", default=os.path.join(tempfile.mkdtemp(), "papers.db"))
+    args = parser.parse_args()
+    rng = random.Random(7)
+    store = PaperStore(args.path)
+
+    start = time.perf_counter()
+    for offset in range(store.count(), args.papers, args.batch):
+        batch = [synthetic_paper(i, rng) for i in range(offset, min(offset + args.batch, args.papers))]
+        store.add(batch, "arxiv")
+    load = time.perf_counter() - start
+    print(f"{store.count()} papers in {args.path} (loaded in {load:.1f}s, "
+          f"{os.path.getsize(args.path) / 2 ** 20:.0f} MiB)")
+
+    page = [synthetic_paper(i, rng) for i in range(10)]
+    store.record("arxiv", "transformer attention", 0, 10, page, 500)
+
+    stored_title = store.search("term1", limit=1)[0][0]["title"]
+    cases = [
+        ("canonical key (title)", lambda: store.canonical_key(stored_title.lower() + ".")),
+        ("canonical key (arXiv link)", lambda: store.canonical_key("x", "http://arxiv.org/abs/2401.00042v2")),
+        ("recorded result page", lambda: store.cached_page("arxiv", "Transformer  attention", 0, 10, 3600)),
+        ("FTS rare term (author)", lambda: store.search("Author 4242", limit=10)),
+        ("FTS two common terms", lambda: store.search("transformer diffusion", limit=10)),
+        ("FTS prefix", lambda: store.search("quantiz", limit=10)),
+    ]
+    print(f"{'lookup':28} {'median ms':>10} {'p99 ms':>8}")
+    for label, fn in cases:
+        median, p99 = timed(fn, args.repeat)
+        print(f"{label:28} {median:10.2f} {p99:8.2f}")
+
+    arxiv = page[3]["link"].rsplit("/", 1)[1]
+    merged = store.add([{"title": page[3]["title"].upper() + "!", "link": "https://paperswithcode.com/paper/x",
+                         "arxiv_id": arxiv, "summary": "longer " * 200}], "pwc")[0]
+    print(f"cross-source merge (same arXiv ID): {merged['key']} sources={merged['sources']}")
+    separate = store.add([{"title": page[4]["title"], "link": "https://paperswithcode.com/paper/y"}], "pwc")[0]
+    print(f"same title, no shared ID: {separate['key']} sources={separate['sources']}, total papers {store.count()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Latency of the default /github_repos and /research_papers views with and
+without background prefetch, against local upstream stubs with an injected
+delay. The response cache is cleared before every request, so "live" is
+what a user sees whenever that cache has expired.
+
+Checks that, once snapshots exist, requests never wait on the upstream,
+including while a (slow) refresh is in flight, and prints the prefetch
+staleness / refresh-latency metrics from /admin/cache_stats.
+
+Usage: python benchmarks/bench_prefetch.py [--delay 0.4] [--requests 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-dummy-key")
+os.environ["PREFETCH_MODE"] = "process"      # the benchmark drives refreshes itself
+os.environ["PREFETCH_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "prefetch.db")
+
+from stub_upstreams import StubUpstreams  # noqa: E402
+
+stubs = StubUpstreams().start()
+stubs.apply_env()
+
+import app as hub  # noqa: E402
+
+URLS = ["/github_repos", "/research_papers"]
+
+
+def measure(client, n):
+    timings = []
+    for i in range(n):
+        hub.response_cache.backend.clear()
+        start = time.perf_counter()
+        response = client.get(URLS[i % len(URLS)])
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200
+    return statistics.median(timings), max(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delay", type=float, default=0.4)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+    client = hub.app.test_client()
+    for name in ("github", "arxiv"):
+        stubs.configure(name, delay=args.delay)
+
+    median, worst = measure(client, args.requests)
+    print(f"live fetch          median {median:7.1f} ms   max {worst:7.1f} ms")
+
+    start = time.perf_counter()
+    refreshed = hub.prefetcher.run_once()
+    print(f"initial prefetch    {refreshed} pages in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    hits_before = stubs.hits("github") + stubs.hits("arxiv")
+    median, worst = measure(client, args.requests)
+    upstream = stubs.hits("github") + stubs.hits("arxiv") - hits_before
+    print(f"prefetched          median {median:7.1f} ms   max {worst:7.1f} ms   upstream calls {upstream}")
+
+    # Stale snapshots + a refresh five times slower than usual, running concurrently
+    for name in ("github", "arxiv"):
+        stubs.configure(name, delay=args.delay * 5)
+    hub.prefetcher.interval = 0
+    refresher = threading.Thread(target=hub.prefetcher.run_once)
+    refresher.start()
+    time.sleep(0.05)
+    median, worst = measure(client, args.requests)
+    print(f"during refresh      median {median:7.1f} ms   max {worst:7.1f} ms   (refresh still running: {refresher.is_alive()})")
+    refresher.join()
+
+    stats = hub.prefetcher.stats()
+    print(f"prefetch hits {stats['hits']}, misses {stats['misses']}")
+    for key, job in stats["jobs"].items():
+        print(f"  {key[:70]:70} age {job['age_seconds']:5.1f}s  last refresh {job['last_refresh_ms']:7.1f} ms")
+    stubs.stop()
+
+
+if __name__ == '__main__':
+    main()
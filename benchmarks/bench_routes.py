@@ -0,0 +1,256 @@
+"""
+Reproducible benchmark of every user-facing route.
+
+Seeds a fresh SQLite database (never the checked-in app.db) with users,
+saved items and peer articles, writes a synthetic courses.csv, points
+GitHub / arXiv / Papers With Code / OpenAI at local fake servers, then
+drives each route with a seeded request mix through the Flask test client
+and reports throughput and latency percentiles:
+
+  /courses  /saved_content  /research_papers  /github_repos  /peer_articles  /chat/api
+  /peer_articles/search
+
+Results are written as JSON (--output) with the run's settings and git
+commit; pass --compare old.json to print the change per route.
+
+Usage: python benchmarks/bench_routes.py [--requests 300] [--threads 1] [--saved-items 50000]
+                                         [--articles 5000] [--courses 20000] [--delay 0.05]
+                                         [--output bench_routes.json] [--compare previous.json]
+"""
+import argparse
+import csv
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_openai import FakeOpenAI  # noqa: E402
+from stub_upstreams import StubUpstreams  # noqa: E402
+
+TAGS = ("Coursera", "Udacity", "edX", "fast.ai", "Kaggle", "DeepLearning.AI", "Google", "Microsoft")
+WORDS = ("deep learning neural networks machine vision language models reinforcement data science python "
+         "statistics transformers generative ai cloud robotics nlp mlops probability optimization").split()
+QUERIES = ["transformers", "diffusion models", "graph neural networks", "reinforcement learning",
+           "speech recognition", "federated learning", "contrastive learning", "vision language",
+           "causal inference", "model compression", "retrieval augmented", "multimodal agents"]
+QUESTIONS = ["What is backpropagation?", "Explain attention in transformers.", "What is overfitting?",
+             "How does dropout work?", "What is a learning rate schedule?", "Define precision and recall."]
+PASSWORD = "bench-password"
+
+
+def write_courses(path, count, rng):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Title", "Description", "URL", "Tag"])
+        for i in range(count):
+            title = " ".join(rng.choices(WORDS, k=4)).title() + f" {i}"
+            description = " ".join(rng.choices(WORDS, k=25))
+            writer.writerow([title, description, f"https://courses.example.com/{i}", TAGS[i % len(TAGS)]])
+
+
+def seed(hub, users, saved_items, articles, courses_path, rng):
+    """Bulk-insert users, saved items (repos/papers/courses) and peer articles."""
+    from werkzeug.security import generate_password_hash
+    with open(courses_path, newline="", encoding="utf-8") as f:
+        course_titles = [row["Title"] for row in csv.DictReader(f)]
+    password_hash = generate_password_hash(PASSWORD)
+    base = datetime.datetime(2024, 1, 1)
+    with hub.app.app_context():
+        hub.db.create_all()
+        hub.migrations.upgrade(hub.db.engine)
+        with hub.db.engine.begin() as conn:
+            conn.execute(hub.User.__table__.insert(), [
+                {"username": f"bench{u}", "password_hash": password_hash,
+                 "role": "admin" if u == 1 else "user"} for u in range(1, users + 1)])
+            user_ids = [row[0] for row in conn.execute(
+                hub.db.text("SELECT id FROM users WHERE username LIKE 'bench%' ORDER BY id"))]
+            rows = []
+            for i in range(saved_items):
+                kind = ("repo", "paper", "course")[i % 3]
+                title = course_titles[i % len(course_titles)] if kind == "course" else f"Saved {kind} {i}"
+                url = f"https://example.com/{kind}/{i}"
+                rows.append({
+                    "user_id": user_ids[i % users], "item_type": kind, "title": title, "url": url,
+                    "date_saved": base + datetime.timedelta(seconds=i * 13),
+                    "authors": "Author A, Author B" if kind == "paper" else None,
+                    "course_status": rng.choice(("ongoing", "completed")) if kind == "course" else None,
+                    "item_key": url if kind == "repo" else title})
+            conn.execute(hub.SavedItem.__table__.insert(), rows)
+            conn.execute(hub.PeerArticle.__table__.insert(), [
+                {"user_id": user_ids[i % users], "name": f"Writer {i}", "email": f"writer{i}@example.com",
+                 "title": " ".join(rng.choices(WORDS, k=6)).title(),
+                 "description": " ".join(rng.choices(WORDS, k=120)), "keywords": ", ".join(rng.choices(WORDS, k=3)),
+                 "url": f"https://articles.example.com/{i}",
+                 "date_submitted": base + datetime.timedelta(minutes=i * 7),
+                 "status": rng.choice(("approved", "approved", "waiting", "rejected"))} for i in range(articles)])
+
+
+def request_mix(rng, n):
+    """Seeded (method, url, json) sequences per route, so every run issues the same requests."""
+    tags = ["all"] + [t.lower() for t in TAGS]
+    return {
+        "/courses": [("GET", f"/courses?tag={rng.choice(tags)}", None) if i % 2 else
+                     ("GET", f"/courses?q={rng.choice(WORDS)}+{rng.choice(WORDS)}", None) for i in range(n)],
+        "/saved_content": [("GET", f"/saved_content?tab={rng.choice(['repos', 'papers', 'courses'])}"
+                                   f"&sort={rng.choice(['recent', 'old'])}", None) for _ in range(n)],
+        "/research_papers": [("GET", f"/research_papers?source={rng.choice(['all', 'arxiv', 'pwc'])}"
+                                     f"&search={rng.choice(QUERIES)}&page={rng.randint(1, 3)}", None)
+                             for _ in range(n)],
+        "/github_repos": [("GET", f"/github_repos?search={rng.choice(QUERIES)}&page={rng.randint(1, 5)}", None)
+                          for _ in range(n)],
+        "/peer_articles": [("GET", "/peer_articles", None) for _ in range(n)],
+        # half repeat a common question (answer cache), half are new and go to the fake OpenAI
+        "/chat/api": [("POST", "/chat/api", {"message": rng.choice(QUESTIONS) if i % 2 else
+                                             "Tell me about " + " ".join(rng.choices(WORDS, k=6)) + f" ({i})"})
+                      for i in range(n)],
+        "/peer_articles/search": [("GET", f"/peer_articles/search?q={rng.choice(WORDS)}+{rng.choice(WORDS)[:3]}", None)
+                                  for _ in range(n)],
+    }
+
+
+def logged_in_client(hub, user_id):
+    client = hub.app.test_client()
+    response = client.post("/login", data={"username": f"bench{user_id}", "password": PASSWORD})
+    if response.status_code != 302:
+        raise RuntimeError(f"login failed for bench{user_id}")
+    return client
+
+
+def run_route(hub, requests, threads, users):
+    """Run `requests` across `threads` logged-in clients; returns per-request latencies and errors."""
+    latencies, errors = [], []
+    lock = threading.Lock()
+    chunks = [requests[i::threads] for i in range(threads)]
+
+    def worker(client, chunk):
+        local, failed = [], 0
+        for method, url, body in chunk:
+            start = time.perf_counter()
+            response = client.open(url, method=method, json=body)
+            response.get_data()
+            local.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors.append(failed)
+
+    clients = [logged_in_client(hub, i % users + 1) for i in range(threads)]
+    workers = [threading.Thread(target=worker, args=(client, chunk)) for client, chunk in zip(clients, chunks)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return latencies, sum(errors), time.perf_counter() - start
+
+
+def summarize(latencies, errors, elapsed):
+    ordered = sorted(latencies)
+
+    def percentile(p):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000, 2)
+
+    return {"requests": len(ordered), "errors": errors, "rps": round(len(ordered) / elapsed, 1),
+            "mean_ms": round(statistics.fmean(ordered) * 1000, 2), "p50_ms": percentile(0.50),
+            "p90_ms": percentile(0.90), "p99_ms": percentile(0.99), "max_ms": round(ordered[-1] * 1000, 2)}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300, help="requests per route")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per route first")
+    parser.add_argument("--threads", type=int, default=1, help="concurrent test clients per route")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--saved-items", type=int, default=50000)
+    parser.add_argument("--articles", type=int, default=5000)
+    parser.add_argument("--courses", type=int, default=20000)
+    parser.add_argument("--delay", type=float, default=0.05, help="fake upstream response time (seconds)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--routes", nargs="+", help="only these routes, e.g. /courses /chat/api")
+    parser.add_argument("--output", default="bench_routes.json")
+    parser.add_argument("--compare", help="earlier --output file to diff against")
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    workdir = tempfile.mkdtemp(prefix="bench_routes_")
+    courses_path = os.path.join(workdir, "courses.csv")
+    write_courses(courses_path, args.courses, rng)
+    stubs = StubUpstreams().start()
+    for name in ("github", "arxiv", "pwc"):
+        stubs.configure(name, delay=args.delay)
+    stubs.apply_env()
+    fake = FakeOpenAI(tokens=20, token_delay=args.delay / 20).start()
+    os.environ.update({
+        "DATABASE_URL": "sqlite:///" + os.path.join(workdir, "app.db"),
+        "COURSES_CSV_PATH": courses_path,
+        "PAPER_STORE_PATH": os.path.join(workdir, "papers.db"),
+        "PREFETCH_DB_PATH": os.path.join(workdir, "prefetch.db"),
+        "PREFETCH_MODE": "off",
+        "OPENAI_API_KEY": "benchmark-dummy-key",
+        "OPENAI_BASE_URL": fake.url + "/v1",
+    })
+
+    import app as hub
+
+    start = time.perf_counter()
+    seed(hub, args.users, args.saved_items, args.articles, courses_path, rng)
+    print(f"seeded {args.users} users, {args.saved_items} saved items, {args.articles} articles, "
+          f"{args.courses} courses in {time.perf_counter() - start:.1f}s ({workdir})")
+
+    mixes = request_mix(rng, args.requests + args.warmup)
+    routes = args.routes or list(mixes)
+    results = {}
+    print(f"{'route':22} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>6}")
+    for route in routes:
+        run_route(hub, mixes[route][:args.warmup], 1, args.users)
+        latencies, errors, elapsed = run_route(hub, mixes[route][args.warmup:], args.threads, args.users)
+        results[route] = summary = summarize(latencies, errors, elapsed)
+        print(f"{route:22} {summary['rps']:8.1f} {summary['p50_ms']:8.2f} {summary['p90_ms']:8.2f} "
+              f"{summary['p99_ms']:8.2f} {summary['max_ms']:8.2f} {summary['errors']:6d}")
+
+    report = {
+        "meta": {"timestamp": datetime.datetime.now().isoformat(timespec="seconds"), "git_commit": git_commit(),
+                 "python": platform.python_version(), "platform": platform.platform(),
+                 "settings": {k: v for k, v in vars(args).items() if k not in ("output", "compare")}},
+        "routes": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)["routes"]
+        print(f"\nvs {args.compare}:")
+        print(f"{'route':18} {'req/s':>16} {'p50 ms':>18} {'p99 ms':>18}")
+        for route, now in results.items():
+            before = previous.get(route)
+            if not before:
+                continue
+            print(f"{route:18} {before['rps']:7.1f} -> {now['rps']:6.1f} {before['p50_ms']:8.2f} -> "
+                  f"{now['p50_ms']:7.2f} {before['p99_ms']:8.2f} -> {now['p99_ms']:7.2f}")
+    stubs.stop()
+    fake.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Saving many items one form POST at a time vs one /saved_content/bulk
+request, and streaming export/import of whole libraries of growing size.
+Peak traced memory stays flat as the library grows because both directions
+work in SAVED_IO_BATCH_SIZE batches.
+
+Usage: python benchmarks/bench_saved_bulk.py [--items 500] [--library 10000 100000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+workdir = tempfile.mkdtemp(prefix="bench_saved_bulk_")
+os.environ.update({
+    "DATABASE_URL": "sqlite:///" + os.path.join(workdir, "app.db"),
+    "PAPER_STORE_PATH": os.path.join(workdir, "papers.db"),
+    "PREFETCH_MODE": "off",
+    "PASSWORD_HASH_METHOD": "pbkdf2:sha256:1000",
+    "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "benchmark-dummy-key"),
+})
+
+import app as hub  # noqa: E402
+
+PASSWORD = "bench-password"
+
+
+def seed():
+    with hub.app.app_context():
+        hub.db.create_all()
+        hub.migrations.upgrade(hub.db.engine)
+        for name in ("single", "bulk", "exporter", "importer"):
+            user = hub.User(username=name)
+            user.set_password(PASSWORD)
+            hub.db.session.add(user)
+        hub.db.session.commit()
+
+
+def login(name):
+    client = hub.app.test_client()
+    client.post("/login", data={"username": name, "password": PASSWORD})
+    return client
+
+
+def repo(i, prefix):
+    return {"item_type": "repo", "title": f"{prefix} repo {i}", "url": f"https://github.com/{prefix}/{i}"}
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--library", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+    seed()
+
+    single = login("single")
+    start = time.perf_counter()
+    for i in range(args.items):
+        item = repo(i, "single")
+        single.post("/save_repo", data={"repo_name": item["title"], "repo_url": item["url"]})
+    one_by_one = time.perf_counter() - start
+
+    bulk = login("bulk")
+    items = [repo(i, "bulk") for i in range(args.items)]
+    start = time.perf_counter()
+    for batch in range(0, len(items), hub.Config.SAVED_BULK_MAX_ITEMS):
+        bulk.post("/saved_content/bulk", json={"save": items[batch:batch + hub.Config.SAVED_BULK_MAX_ITEMS]})
+    batched = time.perf_counter() - start
+    print(f"saving {args.items} repos: one POST each {one_by_one:.2f}s, bulk {batched:.3f}s "
+          f"({one_by_one / batched:.0f}x)")
+
+    exporter, importer = login("exporter"), login("importer")
+    print(f"\n{'library':>8} {'export s':>9} {'export MB':>10} {'import s':>9} {'import MB':>10} {'saved':>8}")
+    saved = 0
+    for size in args.library:
+        while saved < size:
+            count = min(hub.Config.SAVED_BULK_MAX_ITEMS, size - saved)
+            exporter.post("/saved_content/bulk", json={"save": [repo(i, "lib") for i in range(saved, saved + count)]})
+            saved += count
+
+        path = os.path.join(workdir, f"export_{size}.ndjson")
+
+        def export():
+            response = exporter.get("/saved_content/export", buffered=False)
+            with open(path, "w", encoding="utf-8") as f:
+                for chunk in response.response:
+                    f.write(chunk if isinstance(chunk, str) else chunk.decode())
+            response.close()
+
+        _, export_s, export_mb = measure(export)
+
+        def import_():
+            with open(path, "rb") as f:
+                return importer.post("/saved_content/import", input_stream=f, content_type="application/x-ndjson",
+                                     headers={"Content-Length": str(os.path.getsize(path))}).get_json()
+
+        result, import_s, import_mb = measure(import_)
+        print(f"{size:8d} {export_s:9.2f} {export_mb:10.1f} {import_s:9.2f} {import_mb:10.1f} {result['saved']:8d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Seeds an SQLite database with the pre-index schema (default: 1M saved_items,
+100k peer_articles), times the hot lookups, runs migrations.upgrade() on it,
+and times them again plus the atomic upsert used by the save routes.
+
+Usage: python benchmarks/bench_saved_items_indexes.py [--rows 1000000] [--lookups 2000]
+"""
+import argparse
+import datetime
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlalchemy as sa  # noqa: E402
+
+import migrations  # noqa: E402
+
+LEGACY_SCHEMA = """
+CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR(64) NOT NULL UNIQUE,
+                    password_hash VARCHAR(128) NOT NULL, role VARCHAR(16));
+CREATE TABLE saved_items (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, item_type VARCHAR(50),
+                          title VARCHAR(300), url VARCHAR(300), date_saved DATETIME, published VARCHAR(100),
+                          authors VARCHAR(300), journal_ref VARCHAR(300), course_status VARCHAR(20));
+CREATE TABLE peer_articles (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, name VARCHAR(100),
+                            contact VARCHAR(100), email VARCHAR(100), title VARCHAR(300), description TEXT,
+                            keywords VARCHAR(300), url VARCHAR(300), date_submitted DATETIME,
+                            status VARCHAR(20), admin_note TEXT);
+"""
+
+TYPES = ("repo", "paper", "course")
+
+
+def seed(path, rows, users, articles):
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    base = datetime.datetime(2023, 1, 1)
+    conn.executemany("INSERT INTO users (id, username, password_hash, role) VALUES (?, ?, 'x', 'user')",
+                     ((u, f"user{u}") for u in range(1, users + 1)))
+    conn.executemany(
+        "INSERT INTO saved_items (user_id, item_type, title, url, date_saved, course_status) VALUES (?, ?, ?, ?, ?, ?)",
+        ((i % users + 1, TYPES[i % 3], f"Item title {i}", f"https://example.com/{i}",
+          (base + datetime.timedelta(seconds=i * 7)).isoformat(sep=" "), "ongoing" if i % 3 == 2 else None)
+         for i in range(rows)))
+    conn.executemany(
+        "INSERT INTO peer_articles (user_id, title, description, date_submitted, status) VALUES (?, ?, ?, ?, ?)",
+        ((i % users + 1, f"Article {i}", "body " * 20, (base + datetime.timedelta(minutes=i)).isoformat(sep=" "),
+          ("waiting", "approved", "rejected")[i % 3]) for i in range(articles)))
+    conn.commit()
+    conn.close()
+
+
+def time_queries(path, rows, users, lookups, key_column):
+    conn = sqlite3.connect(path)
+    rng = random.Random(3)
+    targets = [rng.randrange(rows) for _ in range(lookups)]
+    results = {}
+
+    start = time.perf_counter()
+    for i in targets:
+        conn.execute(f"SELECT id FROM saved_items WHERE user_id = ? AND item_type = ? AND {key_column} = ? LIMIT 1",
+                     (i % users + 1, TYPES[i % 3], f"https://example.com/{i}" if i % 3 == 0 else f"Item title {i}")
+                     ).fetchone()
+    results["save existence check"] = (time.perf_counter() - start) / lookups
+
+    n = max(1, lookups // 10)
+    start = time.perf_counter()
+    for u in range(n):
+        conn.execute("SELECT * FROM saved_items WHERE user_id = ? AND item_type = 'course' "
+                     "ORDER BY date_saved DESC, id DESC LIMIT 31", (u % users + 1,)).fetchall()
+    results["saved_content tab page"] = (time.perf_counter() - start) / n
+
+    start = time.perf_counter()
+    for _ in range(n):
+        conn.execute("SELECT * FROM peer_articles WHERE status = 'approved' "
+                     "ORDER BY date_submitted DESC LIMIT 50").fetchall()
+    results["peer_articles listing"] = (time.perf_counter() - start) / n
+    conn.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--articles", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        start = time.perf_counter()
+        seed(path, args.rows, args.users, args.articles)
+        print(f"seeded {args.rows} saved_items / {args.articles} peer_articles in {time.perf_counter() - start:.1f} s")
+
+        before = time_queries(path, args.rows, args.users, args.lookups, "CASE WHEN item_type = 'repo' THEN url ELSE title END")
+
+        engine = sa.create_engine("sqlite:///" + path)
+        start = time.perf_counter()
+        applied = migrations.upgrade(engine)
+        print(f"migrations {applied} took {time.perf_counter() - start:.1f} s")
+
+        after = time_queries(path, args.rows, args.users, args.lookups, "item_key")
+
+        print(f"{'query':28} {'before ms':>12} {'after ms':>12}")
+        for name in before:
+            print(f"{name:28} {before[name] * 1000:12.3f} {after[name] * 1000:12.3f}")
+
+        conn = sqlite3.connect(path)
+        start = time.perf_counter()
+        for i in range(args.lookups):
+            conn.execute(
+                "INSERT INTO saved_items (user_id, item_type, title, url, item_key, date_saved) VALUES (?, 'repo', ?, ?, ?, ?) "
+                "ON CONFLICT (user_id, item_type, item_key) DO NOTHING",
+                (i % args.users + 1, "t", f"https://example.com/{i * 3}", f"https://example.com/{i * 3}",
+                 datetime.datetime.utcnow().isoformat(sep=" ")))
+            conn.commit()
+        print(f"upsert (insert-or-ignore + commit): {(time.perf_counter() - start) / args.lookups * 1000:.3f} ms")
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Udacity extraction cost per page: the legacy Selenium-path parse
+(BeautifulSoup + html.parser over the rendered page) vs the plain-HTTP path
+(lxml over the server-rendered HTML / __NEXT_DATA__ JSON), measured on the
+saved pages in fixtures/. Reports median parse time and tracemalloc peak.
+tracemalloc only sees Python allocations, so lxml's C-side tree is not in
+its number; the BeautifulSoup tree is all Python objects and is.
+
+The browser itself is not started by default; pass --with-browser to also
+time launching headless Chrome (needs selenium + webdriver_manager + Chrome).
+
+Usage: python benchmarks/bench_udacity_extract.py [--repeat 50] [--with-browser]
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from course_ingest import BrowserFetcher, UdacitySource  # noqa: E402
+
+
+def legacy_parse(html):
+    """What udacity_scrapper.py did with driver.page_source."""
+    soup = BeautifulSoup(html, "html.parser")
+    return [[course.text.strip(), "Not Available", "https://www.udacity.com" + course.get("href"), "Udacity"]
+            for course in soup.find_all("a", class_="chakra-heading css-1msstcr")]
+
+
+def measure(fn, html, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = fn(html)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(rows), statistics.median(timings) * 1000, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--with-browser", action="store_true")
+    args = parser.parse_args()
+
+    source = UdacitySource()
+    print(f"{'page':22} {'path':14} {'rows':>5} {'median ms':>10} {'peak KiB':>10}")
+    for path in sorted(glob.glob(os.path.join(ROOT, "fixtures", "udacity_page*.html"))):
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        for label, fn in (("html.parser", legacy_parse), ("lxml / json", source.parse)):
+            rows, ms, peak = measure(fn, html, args.repeat)
+            print(f"{os.path.basename(path):22} {label:14} {rows:5d} {ms:10.2f} {peak:10.0f}")
+
+    if args.with_browser:
+        browser = BrowserFetcher()
+        start = time.perf_counter()
+        browser.fetch(source, 1, "about:blank", {})
+        print(f"headless Chrome startup + blank page: {(time.perf_counter() - start) * 1000:.0f} ms")
+        browser.close()
+
+
+if __name__ == '__main__':
+    main()
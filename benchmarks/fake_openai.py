@@ -0,0 +1,88 @@
+"""
+Minimal OpenAI-compatible server for /v1/chat/completions.
+
+Replies with a fixed number of tokens, sleeping `token_delay` seconds per
+token to imitate generation. Supports both the plain JSON response and
+`stream: true` Server-Sent Events chunks. Point the app at it with
+OPENAI_BASE_URL=<url>/v1 (read by the openai client itself).
+
+    server = FakeOpenAI(tokens=40, token_delay=0.02).start()
+    os.environ["OPENAI_BASE_URL"] = server.url + "/v1"
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        fake = self.server.fake
+        with fake.lock:
+            fake.requests += 1
+        question = body.get("messages", [{}])[-1].get("content", "")
+        tokens = [f"token{i} " for i in range(fake.tokens)]
+        created = int(time.time())
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for token in tokens:
+                time.sleep(fake.token_delay)
+                chunk = {
+                    "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": created,
+                    "model": body.get("model"),
+                    "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+                }
+                self._chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+            self._chunk(b"data: [DONE]\n\n")
+            self._chunk(b"")
+            return
+        time.sleep(fake.token_delay * len(tokens))
+        payload = json.dumps({
+            "id": "chatcmpl-fake", "object": "chat.completion", "created": created, "model": body.get("model"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": f"[{question}] " + "".join(tokens)}}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": len(tokens), "total_tokens": len(tokens) + 1},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+class FakeOpenAI:
+    def __init__(self, tokens=40, token_delay=0.02):
+        self.tokens = tokens
+        self.token_delay = token_delay
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.daemon_threads = True
+        self.server.fake = self
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
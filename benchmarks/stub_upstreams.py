@@ -0,0 +1,145 @@
+"""
+Local stand-ins for the GitHub, arXiv and Papers With Code APIs.
+
+Each stub runs in a background thread on 127.0.0.1 and can be told to add
+a delay or to fail, so benchmarks can exercise timeouts and partial results
+without touching the network:
+
+    stubs = StubUpstreams().start()
+    stubs.configure('pwc', delay=2.0)        # or status=500
+    stubs.apply_env()                        # before importing app
+"""
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ATOM_ENTRY = """  <entry>
+    <id>http://arxiv.org/abs/2401.{n:05d}v1</id>
+    <title>Stub arXiv paper {n} about {q}</title>
+    <published>2024-01-01T00:00:00Z</published>
+    <summary>Abstract for stub paper {n}. {q} methods evaluated on synthetic benchmarks.</summary>
+    <author><name>Author {n}</name></author>
+    <link href="http://arxiv.org/abs/2401.{n:05d}v1" rel="alternate" type="text/html"/>
+  </entry>
+"""
+
+ATOM_FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">
+  <title>Stub arXiv</title>
+  <opensearch:totalResults>{total}</opensearch:totalResults>
+{entries}</feed>
+"""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        settings = self.server.settings
+        with self.server.lock:
+            self.server.hits += 1
+        if settings.get("delay"):
+            time.sleep(settings["delay"])
+        if settings.get("status", 200) != 200:
+            self._send(settings["status"], b'{"message": "stub failure"}', "application/json")
+            return
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        body, content_type = self.server.render(url.path, params)
+        self._send(200, body, content_type)
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _render_github(path, params):
+    per_page = int(params.get("per_page", 15))
+    page = int(params.get("page", 1))
+    items = [
+        {
+            "full_name": f"stub/repo-{(page - 1) * per_page + i}",
+            "description": f"Stub repository {i} for {params.get('q', '')}",
+            "stargazers_count": 10000 - i,
+            "html_url": f"https://github.com/stub/repo-{(page - 1) * per_page + i}",
+        }
+        for i in range(per_page)
+    ]
+    return json.dumps({"total_count": 1000, "items": items}).encode(), "application/json"
+
+
+def _render_arxiv(path, params):
+    start = int(params.get("start", 0))
+    count = int(params.get("max_results", 10))
+    query = params.get("search_query", "").replace("all:", "")
+    entries = "".join(ATOM_ENTRY.format(n=start + i, q=query) for i in range(count))
+    return ATOM_FEED.format(total=500, entries=entries).encode(), "application/atom+xml"
+
+
+def _render_pwc(path, params):
+    count = int(params.get("page_size", 10))
+    results = [
+        {
+            "title": f"Stub PwC paper {i} about {params.get('q', '')}",
+            "published": "2024-01-01",
+            "authors": [f"Author {i}"],
+            "abstract": f"Abstract for stub PwC paper {i}.",
+            "paper_url": f"https://paperswithcode.com/paper/stub-{i}",
+        }
+        for i in range(count)
+    ]
+    return json.dumps({"count": 300, "results": results}).encode(), "application/json"
+
+
+RENDERERS = {"github": _render_github, "arxiv": _render_arxiv, "pwc": _render_pwc}
+
+
+class StubUpstreams:
+    """One stub HTTP server per upstream, all on ephemeral localhost ports."""
+
+    def __init__(self, renderers=None):
+        self.servers = {}
+        for name, render in (renderers or RENDERERS).items():
+            server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+            server.daemon_threads = True
+            server.render = render
+            server.settings = {}
+            server.lock = threading.Lock()
+            server.hits = 0
+            self.servers[name] = server
+
+    def start(self):
+        for server in self.servers.values():
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        for server in self.servers.values():
+            server.shutdown()
+            server.server_close()
+
+    def url(self, name):
+        host, port = self.servers[name].server_address
+        return f"http://{host}:{port}"
+
+    def configure(self, name, **settings):
+        """Set `delay` (seconds) and/or `status` for one upstream; no args resets it."""
+        self.servers[name].settings = settings
+
+    def hits(self, name):
+        return self.servers[name].hits
+
+    def apply_env(self):
+        """Point Config's upstream URLs at the stubs; call before importing app."""
+        os.environ["GITHUB_API_URL"] = self.url("github")
+        os.environ["ARXIV_API_URL"] = self.url("arxiv") + "/api/query"
+        os.environ["PWC_API_URL"] = self.url("pwc") + "/api/v1"
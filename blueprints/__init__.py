@@ -0,0 +1,7 @@
+"""
+Route groups registered by create_app(). Endpoint names are prefixed with
+the blueprint name, e.g. url_for('papers.research_papers').
+"""
+from blueprints import articles, auth, chat, courses, library, main, papers, repos
+
+BLUEPRINTS = [main.bp, auth.bp, repos.bp, papers.bp, courses.bp, chat.bp, articles.bp, library.bp]
@@ -0,0 +1,204 @@
+import datetime
+
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
+from flask_login import login_required, current_user
+from sqlalchemy.orm import load_only, with_expression
+
+from config import Config
+from extensions import db, page_cache
+from models import PeerArticle
+from paper_store import fts_query
+
+bp = Blueprint('articles', __name__)
+
+# ---- LISTING / SEARCH HELPERS ----
+
+# Columns the article cards need; the full description is left in the database
+LISTING_COLUMNS = (PeerArticle.id, PeerArticle.user_id, PeerArticle.name, PeerArticle.title,
+                   PeerArticle.keywords, PeerArticle.url, PeerArticle.date_submitted, PeerArticle.status)
+
+def listing_options(*extra_columns):
+    """load_only() the card columns (plus `extra_columns`) and the description's first characters as `excerpt`."""
+    excerpt = db.func.substr(PeerArticle.description, 1, Config.PEER_ARTICLE_EXCERPT_CHARS + 1)
+    return load_only(*LISTING_COLUMNS, *extra_columns), with_expression(PeerArticle.excerpt, excerpt)
+
+def encode_article_cursor(article):
+    return f"{article.date_submitted.isoformat()}_{article.id}"
+
+def decode_article_cursor(cursor):
+    try:
+        date_part, id_part = cursor.rsplit('_', 1)
+        return datetime.datetime.fromisoformat(date_part), int(id_part)
+    except (AttributeError, ValueError):
+        return None
+
+def list_articles(query, cursor, *extra_columns):
+    """
+    One page of `query`, newest first, keyset-paginated on (date_submitted, id)
+    so deep pages cost the same as the first. Returns (articles, next_cursor).
+    """
+    per_page = Config.PEER_ARTICLES_PER_PAGE
+    query = query.options(*listing_options(*extra_columns))
+    if cursor:
+        query = query.filter(db.or_(PeerArticle.date_submitted < cursor[0],
+                                    db.and_(PeerArticle.date_submitted == cursor[0], PeerArticle.id < cursor[1])))
+    articles = query.order_by(PeerArticle.date_submitted.desc(), PeerArticle.id.desc()).limit(per_page + 1).all()
+    next_cursor = encode_article_cursor(articles[per_page - 1]) if len(articles) > per_page else None
+    return articles[:per_page], next_cursor
+
+def search_peer_articles(text, limit=20, offset=0, candidates=2000, max_count=10000):
+    """
+    Approved articles matching every word of `text` (the last one as a prefix).
+    On SQLite the peer_articles_fts index ranks them by BM25 (title 5x, keywords
+    2x the description), scaled by up to 2x for recent articles; only the
+    `candidates` newest matches are ranked. Other databases fall back to LIKE
+    matching, newest first. Returns (articles, total), with the total capped at
+    `max_count`.
+    """
+    match = fts_query(text)
+    if match is None:
+        return [], 0
+    if db.engine.dialect.name != 'sqlite':
+        query = PeerArticle.query.filter_by(status='approved')
+        for word in text.split():
+            pattern = f"%{word}%"
+            query = query.filter(db.or_(PeerArticle.title.ilike(pattern), PeerArticle.keywords.ilike(pattern),
+                                        PeerArticle.description.ilike(pattern)))
+        total = min(query.count(), max_count)
+        articles = (query.options(*listing_options())
+                         .order_by(PeerArticle.date_submitted.desc(), PeerArticle.id.desc())
+                         .limit(limit).offset(offset).all())
+        return articles, total
+    params = {"match": match, "recency_days": Config.PEER_ARTICLE_RECENCY_DAYS, "limit": limit,
+              "offset": offset, "candidates": max(candidates, offset + limit), "max_count": max_count}
+    # CROSS JOIN keeps SQLite driving from the FTS matches; left to itself it may scan every
+    # approved article and probe the index once per row
+    ids = db.session.execute(db.text(
+        "SELECT a.id FROM (SELECT rowid AS id, bm25(peer_articles_fts, 5.0, 1.0, 2.0) AS score"
+        "                  FROM peer_articles_fts WHERE peer_articles_fts MATCH :match"
+        "                  ORDER BY rowid DESC LIMIT :candidates) m"
+        " CROSS JOIN peer_articles a ON a.id = m.id"
+        " WHERE a.status = 'approved'"
+        " ORDER BY m.score * (1.0 + 1.0 / (1.0 + max(julianday('now') - julianday(a.date_submitted), 0)"
+        "                                       / :recency_days)), a.id DESC"
+        " LIMIT :limit OFFSET :offset"), params).scalars().all()
+    total = db.session.execute(db.text(
+        "SELECT COUNT(*) FROM (SELECT a.id FROM peer_articles_fts f CROSS JOIN peer_articles a ON a.id = f.rowid"
+        "                      WHERE peer_articles_fts MATCH :match AND a.status = 'approved' LIMIT :max_count)"),
+        params).scalar()
+    by_id = {article.id: article for article in
+             PeerArticle.query.filter(PeerArticle.id.in_(ids)).options(*listing_options()).all()} if ids else {}
+    return [by_id[article_id] for article_id in ids if article_id in by_id], total
+
+# ---- PEER ARTICLES ----
+
+# Public view for approved peer articles, newest first or searched with ?q=. The body
+# only varies by role (navbar), so it is cached per role and purged on approve/reject.
+@bp.route('/peer_articles')
+@page_cache.cached('peer_articles', per_role=True)
+def peer_articles():
+    search_query = request.args.get('q', '').strip()
+    if search_query:
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = Config.PEER_ARTICLES_PER_PAGE
+        articles, total = search_peer_articles(search_query, limit=per_page, offset=(page - 1) * per_page)
+        return render_template('peer_articles.html', articles=articles, search_query=search_query,
+                               page=page, has_next=page * per_page < total, total=total,
+                               excerpt_chars=Config.PEER_ARTICLE_EXCERPT_CHARS)
+    cursor = decode_article_cursor(request.args.get('after'))
+    articles, next_cursor = list_articles(PeerArticle.query.filter_by(status='approved'), cursor)
+    return render_template('peer_articles.html', articles=articles, search_query='',
+                           next_cursor=next_cursor, is_first_page=cursor is None,
+                           excerpt_chars=Config.PEER_ARTICLE_EXCERPT_CHARS)
+
+@bp.route('/peer_articles/search')
+def search_articles():
+    """JSON search over approved articles: ?q=, optional limit (max 50) and offset."""
+    search_query = request.args.get('q', '').strip()
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    articles, total = search_peer_articles(search_query, limit=limit, offset=offset)
+    return jsonify({
+        "query": search_query,
+        "total": total,
+        "results": [{
+            "id": article.id, "title": article.title, "keywords": article.keywords, "name": article.name,
+            "url": article.url, "date_submitted": article.date_submitted.isoformat(),
+            "excerpt": (article.excerpt or "")[:Config.PEER_ARTICLE_EXCERPT_CHARS]
+        } for article in articles]
+    })
+
+# Route for users to submit a new article
+@bp.route('/submit_article', methods=['GET', 'POST'])
+@login_required
+def submit_article():
+    if request.method == 'POST':
+        new_article = PeerArticle(
+            user_id=current_user.id,
+            name=request.form.get('name'),
+            contact=request.form.get('contact'),
+            email=request.form.get('email'),
+            title=request.form.get('title'),
+            description=request.form.get('description'),
+            keywords=request.form.get('keywords'),
+            url=request.form.get('url'),
+            status='waiting'
+        )
+        db.session.add(new_article)
+        db.session.commit()
+        flash('Article submitted successfully and is waiting for approval.', 'success')
+        return redirect(url_for('main.user_dashboard'))
+    return render_template('submit_article.html')
+
+# Admin view for pending articles
+@bp.route('/admin/articles')
+@login_required
+def admin_articles():
+    if current_user.role != 'admin':
+        flash('Access denied', 'danger')
+        return redirect(url_for('main.index'))
+    # Reviewers need the whole description and contact details
+    cursor = decode_article_cursor(request.args.get('after'))
+    pending_articles, next_cursor = list_articles(PeerArticle.query.filter_by(status='waiting'), cursor,
+                                                  PeerArticle.description, PeerArticle.contact, PeerArticle.email)
+    return render_template('admin_articles.html', articles=pending_articles,
+                           next_cursor=next_cursor, is_first_page=cursor is None)
+
+# Admin route to approve an article
+@bp.route('/admin/articles/approve/<int:article_id>', methods=['POST'])
+@login_required
+def approve_article(article_id):
+    if current_user.role != 'admin':
+        flash('Access denied', 'danger')
+        return redirect(url_for('main.index'))
+    article = PeerArticle.query.get_or_404(article_id)
+    article.status = 'approved'
+    db.session.commit()
+    page_cache.invalidate('peer_articles')
+    flash('Article approved.', 'success')
+    return redirect(url_for('articles.admin_articles'))
+
+# Admin route to reject an article
+@bp.route('/admin/articles/reject/<int:article_id>', methods=['POST'])
+@login_required
+def reject_article(article_id):
+    if current_user.role != 'admin':
+        flash('Access denied', 'danger')
+        return redirect(url_for('main.index'))
+    article = PeerArticle.query.get_or_404(article_id)
+    article.status = 'rejected'
+    article.admin_note = request.form.get('admin_note')
+    db.session.commit()
+    page_cache.invalidate('peer_articles')
+    flash('Article rejected.', 'info')
+    return redirect(url_for('articles.admin_articles'))
+
+# User view to see their submitted articles and statuses
+@bp.route('/my_articles')
+@login_required
+def my_articles():
+    cursor = decode_article_cursor(request.args.get('after'))
+    articles, next_cursor = list_articles(PeerArticle.query.filter_by(user_id=current_user.id), cursor,
+                                          PeerArticle.admin_note)
+    return render_template('my_articles.html', articles=articles, next_cursor=next_cursor,
+                           is_first_page=cursor is None, excerpt_chars=Config.PEER_ARTICLE_EXCERPT_CHARS)
@@ -0,0 +1,68 @@
+from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask_login import login_user, logout_user, login_required
+
+from extensions import db
+from models import User
+from passwords import HashPoolBusy
+
+bp = Blueprint('auth', __name__)
+
+# ---- SIGNUP & LOGIN ----
+@bp.route('/signup', methods=['GET', 'POST'])
+def signup():
+    if request.method == 'POST':
+        username = request.form.get('username')
+        password = request.form.get('password')
+
+        # Check if user already exists
+        existing_user = User.query.filter_by(username=username).first()
+        if existing_user:
+            flash('Username already taken. Please choose another.', 'danger')
+            return redirect(url_for('auth.signup'))
+        
+        # Create new user
+        new_user = User(username=username)
+        new_user.set_password(password)
+        db.session.add(new_user)
+        db.session.commit()
+
+        flash('Signup successful! Please log in.', 'success')
+        return redirect(url_for('auth.login'))
+    
+    return render_template('signup.html')
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        username = request.form.get('username')
+        password = request.form.get('password')
+        user = User.query.filter_by(username=username).first()
+        if user and user.check_password(password):
+            if user.password_needs_rehash():
+                # Upgrade the stored hash to PASSWORD_HASH_METHOD while the password is at hand
+                try:
+                    user.set_password(password)
+                    db.session.commit()
+                except HashPoolBusy:
+                    pass  # keep the old hash; the next login retries
+            login_user(user)
+            flash('Logged in successfully!', 'success')
+            return redirect(url_for('main.user_dashboard'))
+        else:
+            flash('Invalid credentials.', 'danger')
+            return redirect(url_for('auth.login'))
+    return render_template('login.html')
+
+@bp.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    flash('Logged out successfully.', 'info')
+    return redirect(url_for('main.index'))
+
+@bp.errorhandler(HashPoolBusy)
+def hashing_busy(e):
+    # The password hashing pool is saturated (login storm): shed load instead of queueing
+    flash('Too many sign-ins right now. Please try again in a few seconds.', 'warning')
+    template = 'signup.html' if request.endpoint == 'auth.signup' else 'login.html'
+    return render_template(template), 503, {'Retry-After': '5'}
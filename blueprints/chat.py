@@ -0,0 +1,126 @@
+import json
+import os
+
+from flask import Blueprint, Response, abort, make_response, render_template, request, jsonify
+
+import metrics
+from config import Config
+from extensions import answer_cache
+
+bp = Blueprint('chat', __name__)
+
+@bp.route('/chat')
+def chat():
+    return render_template('chat.html')
+
+_client = None
+
+def openai_api_key():
+    # Read on first use (after load_dotenv in create_app); a missing key only breaks the chat routes
+    return os.getenv("OPENAI_API_KEY")
+
+def openai_client():
+    """The OpenAI client, created on first use (importing openai alone takes ~0.3s)."""
+    global _client
+    if _client is None:
+        api_key = openai_api_key()
+        if not api_key:
+            raise RuntimeError("OpenAI API key is missing! Set the environment variable OPENAI_API_KEY.")
+        from openai import OpenAI
+        _client = OpenAI(api_key=api_key)
+    return _client
+
+static_system_prompt = (
+    "You are a helpful assistant with deep expertise in Artificial Intelligence, Machine Learning, "
+    "Computer Science, and Technology. When addressing technical questions, provide detailed, domain-specific "
+    "information. For casual greetings or non-technical inquiries, respond in a friendly and conversational tone."
+)
+
+CHAT_MODEL = "gpt-3.5-turbo"
+CHAT_CACHE_CONTEXT = (CHAT_MODEL, static_system_prompt)
+
+def cached_answer(user_message):
+    if not Config.CHAT_CACHE_ENABLED:
+        return None
+    return answer_cache.get(user_message, CHAT_CACHE_CONTEXT)
+
+def remember_answer(user_message, answer):
+    if Config.CHAT_CACHE_ENABLED and answer:
+        answer_cache.set(user_message, answer, CHAT_CACHE_CONTEXT)
+
+def request_message():
+    """The 'message' of a chat request's JSON body; a JSON 400 unless the body is an object with a string message."""
+    payload = request.get_json(force=True, silent=True)
+    message = payload.get('message', '') if isinstance(payload, dict) else None
+    if not isinstance(message, str):
+        abort(make_response(jsonify({'error': 'Expected a JSON object with a "message" string.'}), 400))
+    return message
+
+def chat_messages(user_message):
+    return [
+        {"role": "system", "content": static_system_prompt},
+        {"role": "user", "content": user_message}
+    ]
+
+@bp.route('/chat/api', methods=['POST'])
+def chat_api():
+    # Retrieve the user message from the JSON payload
+    user_message = request_message()
+
+    # Repeated (or near-identical) questions are answered from the cache
+    bot_reply = cached_answer(user_message)
+    if bot_reply is not None:
+        return jsonify({'reply': bot_reply})
+    
+    try:
+        # Call the OpenAI API with the static system prompt and the user's message
+        with metrics.timed_upstream('openai'):
+            completion = openai_client().chat.completions.create(
+                model=CHAT_MODEL,
+                store=True,  # Optional: if you want to store the conversation
+                messages=chat_messages(user_message)
+            )
+        # Extract the generated message from the API response
+        bot_reply = completion.choices[0].message.content
+        remember_answer(user_message, bot_reply)
+    except Exception as e:
+        bot_reply = "Sorry, an error occurred: " + str(e)
+    
+    # Return the bot's reply as a JSON response
+    return jsonify({'reply': bot_reply})
+
+@bp.route('/chat/api/stream', methods=['POST'])
+def chat_api_stream():
+    """
+    Server-Sent Events version of /chat/api: each token is sent as
+    `data: {"delta": "..."}` as soon as OpenAI produces it, then `data: [DONE]`.
+    chat.html falls back to /chat/api when the browser can't read streams.
+    """
+    user_message = request_message()
+    cached = cached_answer(user_message)
+
+    def generate():
+        if cached is not None:
+            yield "data: " + json.dumps({'delta': cached}) + "\n\n"
+            yield "data: [DONE]\n\n"
+            return
+        try:
+            parts = []
+            with metrics.timed_upstream('openai_stream'):  # until the last token arrives
+                stream = openai_client().chat.completions.create(
+                    model=CHAT_MODEL,
+                    store=True,
+                    messages=chat_messages(user_message),
+                    stream=True
+                )
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        parts.append(chunk.choices[0].delta.content)
+                        yield "data: " + json.dumps({'delta': chunk.choices[0].delta.content}) + "\n\n"
+            remember_answer(user_message, "".join(parts))
+        except Exception as e:
+            yield "data: " + json.dumps({'error': "Sorry, an error occurred: " + str(e)}) + "\n\n"
+        yield "data: [DONE]\n\n"
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
@@ -0,0 +1,145 @@
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
+from flask_login import login_required, current_user
+
+from config import Config  # to use 'COURSES_CSV_PATH'
+from course_catalog import get_catalog
+from course_search import get_search_index
+from extensions import db, page_cache
+from models import SavedItem, upsert_saved_item
+
+bp = Blueprint('courses', __name__)
+
+# ---- COURSES (CSV) ----
+
+def current_catalog():
+    # The compiled catalog is used when it is current, the CSV otherwise
+    return get_catalog(Config.COURSES_CSV_PATH, Config.COURSES_CATALOG_PATH)
+
+def catalog_signature():
+    return current_catalog().signature()
+
+def started_titles(rows):
+    """Titles among `rows` the current user has started, in one indexed query (course item_key is the title)."""
+    if not current_user.is_authenticated:
+        return set()
+    titles = {row["Title"] for row in rows}
+    if not titles:
+        return set()
+    return set(db.session.scalars(db.select(SavedItem.item_key).where(
+        SavedItem.user_id == current_user.id,
+        SavedItem.item_type == 'course',
+        SavedItem.item_key.in_(titles))))
+
+def course_listing():
+    """One page of /courses for the request's tag, q and page args, with what the cards need."""
+    catalog = current_catalog()
+    tag_filter = request.args.get("tag", "all").lower()
+    search_query = request.args.get("q", "").strip()
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = Config.COURSES_PER_PAGE
+
+    # Only the visible page is sliced out (lazily, for a compiled catalog) and rendered
+    start = (page - 1) * per_page
+    if search_query:
+        # The tag filter runs inside the ranking, which only goes as deep as this page
+        index = get_search_index(catalog)
+        tag = None if tag_filter == "all" else tag_filter
+        total = index.count(search_query, tag=tag)
+        results = index.search(search_query, limit=start + per_page, tag=tag)
+        rows = [row for row, score in results[start:]]
+    else:
+        matches = catalog.by_tag(tag_filter)
+        total = len(matches)
+        rows = matches[start:start + per_page]
+    return {
+        "courses": rows,
+        "user_course_titles": started_titles(rows),
+        "current_tag": tag_filter,
+        "search_query": search_query,
+        "page": page,
+        "per_page": per_page,
+        "total": total,
+        "next_page": page + 1 if start + per_page < total else None,
+    }
+
+# Logged-in users see which courses they started, so only anonymous pages are cached
+@bp.route('/courses')
+@page_cache.cached('courses', vary=catalog_signature)
+def courses():
+    catalog = current_catalog()
+    return render_template(
+        "courses.html",
+        all_tags=catalog.all_tags(),
+        tag_counts=catalog.tag_counts(),
+        catalog_size=len(catalog.all()),
+        **course_listing()
+    )
+
+@bp.route('/courses/page')
+@page_cache.cached('courses', vary=catalog_signature)
+def courses_page():
+    # Infinite scroll: the next page's cards as HTML, plus the rows themselves
+    listing = course_listing()
+    return jsonify({
+        "page": listing["page"],
+        "next_page": listing["next_page"],
+        "total": listing["total"],
+        "courses": [
+            {"index": row["index"], "title": row["Title"], "description": row.get("Description"),
+             "url": row.get("URL"), "tag": row.get("Tag"), "started": row["Title"] in listing["user_course_titles"]}
+            for row in listing["courses"]
+        ],
+        "html": render_template("course_cards.html", **listing),
+    })
+
+@bp.route('/courses/suggest')
+def courses_suggest():
+    # Type-ahead: the last word of ?q= is matched as a prefix
+    search_query = request.args.get("q", "").strip()
+    limit = request.args.get("limit", 10, type=int)
+    limit = min(max(limit, 1), 50)
+    results = get_search_index(current_catalog()).search(search_query, limit=limit)
+    return jsonify([
+        {"index": row["index"], "title": row.get("Title"), "tag": row.get("Tag"), "score": round(score, 4)}
+        for row, score in results
+    ])
+
+@bp.route('/start_course/<int:course_index>')
+def start_course(course_index):
+    try:
+        course = current_catalog().get(course_index)
+        if course is None:
+            flash("Course not found.", "danger")
+            return redirect(url_for('courses.courses'))
+    except Exception as e:
+        print("Error in /start_course route:", e)
+        flash("Error reading courses.", "danger")
+        return redirect(url_for('courses.courses'))
+    
+    # For non-logged-in users, you might skip saving the course or handle it differently.
+    if current_user.is_authenticated:
+        # Save the course, or set an existing one back to "ongoing"
+        upsert_saved_item(
+            update={'course_status': 'ongoing'},
+            user_id=current_user.id,
+            item_type='course',
+            title=course['Title'],
+            url=course['URL'],
+            published=course['Description'],
+            course_status='ongoing'
+        )
+    
+    # Redirect the user to the actual course URL.
+    return redirect(course['URL'])
+
+@bp.route('/mark_complete/<int:item_id>', methods=['POST'])
+@login_required
+def mark_complete(item_id):
+    item = SavedItem.query.get_or_404(item_id)
+    if item.user_id != current_user.id or item.item_type != 'course':
+        flash("Unauthorized action.", "danger")
+        return redirect(url_for('main.saved_content'))
+    item.course_status = 'completed'
+    db.session.commit()
+    flash("Course marked as complete.", 'success')
+    return redirect(url_for('main.saved_content', tab='courses'))
@@ -0,0 +1,268 @@
+"""
+Bulk and streaming access to a user's saved content, for clients curating
+many items at once instead of one form POST (and page re-render) per item.
+
+POST /saved_content/bulk takes a JSON object with up to SAVED_BULK_MAX_ITEMS
+operations and applies them in one transaction:
+
+    {"remove": [item ids],
+     "save": [{"item_type": "repo", "title": "...", "url": "..."}, ...],
+     "complete": [course item ids]}
+
+Removals run first, then saves, then completions. Saves are deduplicated as
+a set: repeats within the batch collapse, papers already saved under any
+alias are found with one query, and the rest go in as a multi-row insert
+that skips existing items.
+
+GET /saved_content/export?format=ndjson|csv streams the whole library and
+POST /saved_content/import reads one in (raw NDJSON or CSV body). Both work
+in SAVED_IO_BATCH_SIZE batches, so memory stays flat however large the
+library is. Each import batch is committed on its own to keep SQLite's write
+lock short; re-running a failed import is safe since saved items are skipped.
+"""
+import csv
+import datetime
+import io
+import json
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from flask_login import login_required, current_user
+
+from config import Config
+from extensions import db, paper_store
+from models import SavedItem, insert_saved_items
+
+bp = Blueprint('library', __name__)
+
+ITEM_TYPES = ('repo', 'paper', 'course')
+COURSE_STATUSES = ('ongoing', 'completed')
+TEXT_FIELDS = ('title', 'url', 'published', 'authors', 'journal_ref')
+EXPORT_FIELDS = ['id', 'item_type', 'title', 'url', 'published', 'authors', 'journal_ref',
+                 'course_status', 'date_saved']
+IN_CHUNK = 500  # values per IN (...) list, under SQLite's bound-parameter limit
+MAX_REPORTED_ERRORS = 20
+
+
+def chunks(values, size):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def normalize_item(record):
+    """Validate one item to save (a JSON object or CSV row); returns (row, None) or (None, error)."""
+    if not isinstance(record, dict):
+        return None, 'item must be an object'
+    item_type = record.get('item_type')
+    if item_type not in ITEM_TYPES:
+        return None, "item_type must be 'repo', 'paper' or 'course'"
+    row = {'item_type': item_type}
+    for field in TEXT_FIELDS:
+        value = record.get(field)
+        row[field] = (str(value).strip() or None) if value is not None else None
+    if not row['title']:
+        return None, 'title is required'
+    if item_type == 'repo' and not row['url']:
+        return None, 'url is required for repos'
+
+    row['course_status'] = None
+    if item_type == 'course':
+        row['course_status'] = record.get('course_status') or 'ongoing'
+        if row['course_status'] not in COURSE_STATUSES:
+            return None, "course_status must be 'ongoing' or 'completed'"
+
+    row['date_saved'] = None
+    if record.get('date_saved'):
+        try:
+            row['date_saved'] = datetime.datetime.fromisoformat(str(record['date_saved']))
+        except ValueError:
+            return None, 'date_saved must be an ISO 8601 timestamp'
+
+    if item_type == 'paper':
+        row['item_key'] = paper_store.canonical_key(row['title'], row['url'])
+    else:
+        row['item_key'] = SavedItem.key_for(item_type, row['title'], row['url'])
+    return row, None
+
+
+def item_ids(values):
+    """The ids in a remove/complete list, or None if it holds anything but integers."""
+    if not isinstance(values, list) or any(type(value) is not int for value in values):
+        return None
+    return list(set(values))
+
+
+def save_items(user_id, rows):
+    """
+    Insert normalized `rows` for `user_id` in the current transaction, skipping
+    repeats within `rows` and items the user already saved. Returns the number inserted.
+    """
+    unique = {}
+    for row in rows:
+        unique.setdefault((row['item_type'], row['item_key']), row)
+
+    # Papers count as saved under any key the paper store knows for them (or the
+    # bare title, for papers saved before the store existed), as in save_paper
+    by_alias = {}
+    for (item_type, item_key), row in unique.items():
+        if item_type == 'paper':
+            for alias in paper_store.aliases(item_key) + [row['title']]:
+                by_alias.setdefault(alias, []).append(item_key)
+    for aliases in chunks(list(by_alias), IN_CHUNK):
+        for saved_key in db.session.scalars(db.select(SavedItem.item_key).where(
+                SavedItem.user_id == user_id, SavedItem.item_type == 'paper', SavedItem.item_key.in_(aliases))):
+            for item_key in by_alias[saved_key]:
+                unique.pop(('paper', item_key), None)
+
+    now = datetime.datetime.utcnow()
+    return insert_saved_items([dict(row, user_id=user_id, date_saved=row['date_saved'] or now)
+                               for row in unique.values()])
+
+
+def remove_items(user_id, ids):
+    removed = 0
+    for chunk in chunks(ids, IN_CHUNK):
+        removed += db.session.execute(db.delete(SavedItem).where(
+            SavedItem.user_id == user_id, SavedItem.id.in_(chunk))).rowcount
+    return removed
+
+
+def complete_courses(user_id, ids):
+    completed = 0
+    for chunk in chunks(ids, IN_CHUNK):
+        completed += db.session.execute(db.update(SavedItem).where(
+            SavedItem.user_id == user_id, SavedItem.item_type == 'course', SavedItem.id.in_(chunk)
+        ).values(course_status='completed')).rowcount
+    return completed
+
+
+@bp.route('/saved_content/bulk', methods=['POST'])
+@login_required
+def bulk_update():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"error": "Expected a JSON object with save, remove and/or complete lists."}), 400
+    save = payload.get('save') or []
+    remove_ids = item_ids(payload.get('remove') or [])
+    complete_ids = item_ids(payload.get('complete') or [])
+    if not isinstance(save, list) or remove_ids is None or complete_ids is None:
+        return jsonify({"error": "save must be a list of items; remove and complete lists of item ids."}), 400
+    if len(save) + len(remove_ids) + len(complete_ids) > Config.SAVED_BULK_MAX_ITEMS:
+        return jsonify({"error": f"At most {Config.SAVED_BULK_MAX_ITEMS} operations per request."}), 413
+
+    # Validate everything first, so a bad item rejects the whole batch
+    rows, errors = [], []
+    for index, record in enumerate(save):
+        row, error = normalize_item(record)
+        if error:
+            errors.append({"index": index, "error": error})
+        else:
+            rows.append(row)
+    if errors:
+        return jsonify({"error": "Invalid items in save.", "items": errors[:MAX_REPORTED_ERRORS]}), 400
+
+    removed = remove_items(current_user.id, remove_ids)
+    saved = save_items(current_user.id, rows)
+    completed = complete_courses(current_user.id, complete_ids)
+    db.session.commit()
+    return jsonify({"saved": saved, "already_saved": len(rows) - saved,
+                    "removed": removed, "completed": completed})
+
+
+def export_batches(user_id, batch_size):
+    """The user's saved items in id order, `batch_size` rows per query (keyset on id)."""
+    columns = [getattr(SavedItem, field) for field in EXPORT_FIELDS]
+    last_id = 0
+    while True:
+        rows = db.session.execute(db.select(*columns).where(
+            SavedItem.user_id == user_id, SavedItem.id > last_id
+        ).order_by(SavedItem.id).limit(batch_size)).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def export_record(row):
+    record = row._asdict()
+    record['date_saved'] = row.date_saved.isoformat() if row.date_saved else None
+    return record
+
+
+@bp.route('/saved_content/export')
+@login_required
+def export_items():
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({"error": "format must be 'ndjson' or 'csv'."}), 400
+    batches = export_batches(current_user.id, Config.SAVED_IO_BATCH_SIZE)
+
+    def ndjson():
+        for rows in batches:
+            yield ''.join(json.dumps(export_record(row)) + '\n' for row in rows)
+
+    def csv_text():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        for rows in batches:
+            writer.writerows(export_record(row) for row in rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    body, mimetype = (ndjson(), 'application/x-ndjson') if export_format == 'ndjson' else (csv_text(), 'text/csv')
+    return Response(stream_with_context(body), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename=saved_content.{export_format}'})
+
+
+def import_records(stream, import_format):
+    """Yield (line number, record, error) for each item in an NDJSON or CSV text stream."""
+    if import_format == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record, None
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line), None
+        except ValueError:
+            yield line_number, None, 'invalid JSON'
+
+
+@bp.route('/saved_content/import', methods=['POST'])
+@login_required
+def import_items():
+    import_format = request.args.get('format') or ('csv' if request.mimetype == 'text/csv' else 'ndjson')
+    if import_format not in ('ndjson', 'csv'):
+        return jsonify({"error": "format must be 'ndjson' or 'csv'."}), 400
+    stream = io.TextIOWrapper(request.stream, encoding='utf-8-sig', newline='')
+
+    read = saved = invalid = 0
+    errors, batch = [], []
+    try:
+        for line_number, record, error in import_records(stream, import_format):
+            row = None
+            if error is None:
+                row, error = normalize_item(record)
+            if error:
+                invalid += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"line": line_number, "error": error})
+                continue
+            read += 1
+            batch.append(row)
+            if len(batch) >= Config.SAVED_IO_BATCH_SIZE:
+                saved += save_items(current_user.id, batch)
+                db.session.commit()
+                batch = []
+    except (csv.Error, UnicodeDecodeError) as e:
+        db.session.rollback()
+        return jsonify({"error": f"Could not read the file: {e}", "saved": saved}), 400
+    saved += save_items(current_user.id, batch)
+    db.session.commit()
+    return jsonify({"read": read, "saved": saved, "already_saved": read - saved,
+                    "invalid": invalid, "errors": errors})
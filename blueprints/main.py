@@ -0,0 +1,153 @@
+import datetime
+import hmac
+
+from flask import Blueprint, Response, render_template, redirect, url_for, flash, request, jsonify
+from flask_login import login_required, current_user
+
+import metrics
+from config import Config
+from extensions import db, response_cache, prefetcher, answer_cache, page_cache, user_cache, hash_pool
+from models import SavedItem
+
+bp = Blueprint('main', __name__)
+
+@bp.route('/')
+def index():
+    return render_template('index.html')
+
+# ---- USER DASHBOARD ----
+@bp.route('/user_dashboard')
+@login_required
+def user_dashboard():
+    return render_template('user_dashboard.html', username=current_user.username)
+
+# ---- SAVED CONTENT ----
+
+SAVED_TABS = {'repos': 'repo', 'papers': 'paper', 'courses': 'course'}
+
+def encode_saved_cursor(item):
+    return f"{item.date_saved.isoformat()}_{item.id}"
+
+def decode_saved_cursor(cursor):
+    try:
+        date_part, id_part = cursor.rsplit('_', 1)
+        return datetime.datetime.fromisoformat(date_part), int(id_part)
+    except (AttributeError, ValueError):
+        return None
+
+@bp.route('/saved_content')
+@login_required
+def saved_content():
+    tab = request.args.get('tab', 'repos')  # 'repos', 'papers', 'courses'
+    sort_order = request.args.get('sort', 'recent')  # 'recent' or 'old'
+    course_status_filter = request.args.get('course_status', 'all')  # 'all', 'ongoing', 'completed'
+    cursor = decode_saved_cursor(request.args.get('after'))
+    if tab not in SAVED_TABS:
+        tab = 'repos'
+    per_page = Config.SAVED_ITEMS_PER_PAGE
+
+    # 1) Only the active tab is loaded, filtered in SQL
+    query = SavedItem.query.filter_by(user_id=current_user.id, item_type=SAVED_TABS[tab])
+    if tab == 'courses' and course_status_filter != 'all':
+        query = query.filter(SavedItem.course_status == course_status_filter)
+
+    # 2) Keyset pagination on (date_saved, id), served by ix_saved_items_user_type_date
+    if sort_order == 'old':
+        if cursor:
+            query = query.filter(db.or_(SavedItem.date_saved > cursor[0],
+                                        db.and_(SavedItem.date_saved == cursor[0], SavedItem.id > cursor[1])))
+        query = query.order_by(SavedItem.date_saved.asc(), SavedItem.id.asc())
+    else:
+        if cursor:
+            query = query.filter(db.or_(SavedItem.date_saved < cursor[0],
+                                        db.and_(SavedItem.date_saved == cursor[0], SavedItem.id < cursor[1])))
+        query = query.order_by(SavedItem.date_saved.desc(), SavedItem.id.desc())
+    items = query.limit(per_page + 1).all()
+    next_cursor = encode_saved_cursor(items[per_page - 1]) if len(items) > per_page else None
+    items = items[:per_page]
+
+    # 3) Tab counts in one grouped query
+    counts = dict(db.session.query(SavedItem.item_type, db.func.count(SavedItem.id))
+                            .filter(SavedItem.user_id == current_user.id)
+                            .group_by(SavedItem.item_type).all())
+    tab_counts = {tab_name: counts.get(item_type, 0) for tab_name, item_type in SAVED_TABS.items()}
+
+    return render_template(
+        'saved_content.html',
+        papers=items if tab == 'papers' else [],
+        repos=items if tab == 'repos' else [],
+        courses=items if tab == 'courses' else [],
+        sort_order=sort_order,
+        tab=tab,
+        course_status_filter=course_status_filter,
+        tab_counts=tab_counts,
+        next_cursor=next_cursor,
+        is_first_page=cursor is None
+    )
+
+@bp.route('/unsave/<int:item_id>', methods=['POST'])
+@login_required
+def unsave_item(item_id):
+    item = SavedItem.query.get_or_404(item_id)
+    if item.user_id != current_user.id:
+        flash('You do not have permission to remove this item.', 'danger')
+        return redirect(url_for('main.saved_content'))
+    
+    # Determine which tab to show after removing
+    tab_to_show = 'repos'
+    if item.item_type == 'paper':
+        tab_to_show = 'papers'
+    elif item.item_type == 'course':
+        tab_to_show = 'courses'
+        
+    db.session.delete(item)
+    db.session.commit()
+    flash('Item removed from your saved content.', 'success')
+    return redirect(url_for('main.saved_content', tab=tab_to_show))
+
+# ---- ADMIN / MONITORING ----
+@bp.route('/admin/cache_stats')
+@login_required
+def cache_stats():
+    if current_user.role != 'admin':
+        flash('Access denied', 'danger')
+        return redirect(url_for('main.index'))
+    stats = response_cache.stats()
+    stats['chat_answers'] = answer_cache.stats()
+    stats['prefetch'] = prefetcher.stats()
+    stats['pages'] = page_cache.stats()
+    stats['users'] = user_cache.stats()
+    stats['password_hashing'] = hash_pool.stats()
+    return jsonify(stats)
+
+def metrics_allowed():
+    """A scraper with the METRICS_TOKEN bearer token, a logged-in admin, or anyone with METRICS_PUBLIC=1."""
+    if Config.METRICS_PUBLIC:
+        return True
+    if Config.METRICS_TOKEN and hmac.compare_digest(request.headers.get('Authorization', ''),
+                                                    'Bearer ' + Config.METRICS_TOKEN):
+        return True
+    return current_user.is_authenticated and current_user.role == 'admin'
+
+@bp.route('/metrics')
+def metrics_endpoint():
+    if not Config.METRICS_ENABLED:
+        return "Metrics are disabled", 404
+    if not metrics_allowed():
+        return "Unauthorized", 401
+    return Response(metrics.exposition(), mimetype='text/plain; version=0.0.4')
+
+@bp.route('/admin/profiler', methods=['GET', 'POST'])
+@login_required
+def admin_profiler():
+    """Turn the slow-request sampling profiler on/off (POST enabled=1|0, optional slow_ms)."""
+    if current_user.role != 'admin':
+        flash('Access denied', 'danger')
+        return redirect(url_for('main.index'))
+    if request.method == 'POST':
+        if request.form.get('enabled') == '1':
+            slow_ms = request.form.get('slow_ms', type=float)
+            metrics.profiler.enable(threshold=slow_ms / 1000 if slow_ms else None)
+        else:
+            metrics.profiler.disable()
+    return jsonify(metrics.profiler.stats())
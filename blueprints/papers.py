@@ -0,0 +1,263 @@
+from urllib.parse import quote_plus
+
+from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask_login import login_required, current_user
+
+from config import Config
+from extensions import response_cache, page_cache, paper_store, prefetched
+from fanout import fan_out
+from models import SavedItem, upsert_saved_item
+from paper_store import merge_results
+
+bp = Blueprint('papers', __name__)
+
+# ---- RESEARCH PAPERS ----
+PAPERS_PER_PAGE = 10
+
+def arxiv_query_url(query, max_results, start):
+    base_url = Config.ARXIV_API_URL + "?"
+    safe_q = quote_plus(query)
+    query_params = f"search_query=all:{safe_q}&start={start}&max_results={max_results}"
+    return base_url + query_params
+
+@response_cache.cached('arxiv', cache_if=lambda result: result[0], case_insensitive=('query',))
+def get_arxiv_papers(query="artificial intelligence", max_results=5, start=0):
+    import requests  # deferred with the HTTP client: only needed once a page goes upstream
+    from http_client import get_http_client
+    try:
+        response = get_http_client().get(arxiv_query_url(query, max_results, start))
+    except requests.RequestException as e:
+        print("Error fetching arXiv papers:", e)
+        return [], 0
+    return parse_arxiv_response(response)
+
+def parse_arxiv_response(response):
+    if response.status_code != 200:
+        print("Error fetching arXiv papers:", response.status_code)
+        return [], 0
+    import feedparser
+    feed = feedparser.parse(response.content)
+    papers = []
+    total_results = int(feed.feed.get('opensearch_totalresults', 0))
+    for entry in feed.entries:
+        paper = {
+            "title": entry.title,
+            "published": entry.published,
+            "authors": ", ".join(author.name for author in entry.authors),
+            "summary": entry.summary,
+            "link": entry.link,
+            "journal_ref": entry.get("arxiv_journal_ref", "N/A"),
+            "doi": entry.get("arxiv_doi")
+        }
+        papers.append(paper)
+    return papers, total_results
+
+def pwc_search_request(query, page_size):
+    url = Config.PWC_API_URL + "/papers/"
+    params = {
+        "q": query,
+        "page_size": page_size
+    }
+    return url, params
+
+@response_cache.cached('pwc', cache_if=lambda result: result[0], case_insensitive=('query',))
+def get_paperswithcode_papers(query="artificial intelligence", page_size=5):
+    import requests
+    from http_client import get_http_client
+    url, params = pwc_search_request(query, page_size)
+    try:
+        response = get_http_client().get(url, params=params)
+    except requests.RequestException as e:
+        print("Error fetching Papers With Code:", e)
+        return [], 0
+    return parse_pwc_response(response)
+
+def parse_pwc_response(response):
+    papers = []
+    total_results = 0
+    if response.status_code == 200:
+        data = response.json()
+        total_results = data.get("count", 0)
+        for result in data.get("results", []):
+            paper = {
+                "title": result.get("title", "No title"),
+                "published": result.get("published", "N/A"),
+                "authors": result.get("authors", "N/A"),
+                "summary": result.get("abstract", "No abstract"),
+                "link": result.get("paper_url", "#"),
+                "journal_ref": result.get("journal_ref", "N/A"),
+                "arxiv_id": result.get("arxiv_id")
+            }
+            papers.append(paper)
+    else:
+        print("Error fetching Papers With Code:", response.status_code)
+    return papers, total_results
+
+def get_google_scholar_papers(query="artificial intelligence", max_results=5):
+    try:
+        from scholarly import scholarly
+    except ImportError:
+        print("scholarly not installed. Please install it using pip install scholarly")
+        return [], 0
+    search_query = scholarly.search_pubs(query)
+    papers = []
+    for i in range(max_results):
+        try:
+            paper = next(search_query)
+            papers.append({
+                "title": paper.get("bib", {}).get("title", "No title"),
+                "published": paper.get("bib", {}).get("pub_year", "N/A"),
+                "authors": paper.get("bib", {}).get("author", "N/A"),
+                "summary": paper.get("bib", {}).get("abstract", "No abstract"),
+                "link": paper.get("pub_url", "#"),
+                "journal_ref": paper.get("bib", {}).get("journal", "N/A")
+            })
+        except StopIteration:
+            break
+    total_results = len(papers)
+    return papers, total_results
+
+# ---- PAPER STORE ----
+def stored_page(source, query, start, size, fetch):
+    """
+    One result page of `source`: served from the paper store while its
+    recorded copy is fresh, otherwise fetched with `fetch()` and recorded.
+    Returned papers are store records, carrying their canonical `key`.
+    """
+    page = paper_store.cached_page(source, query, start, size, Config.PAPER_STORE_TTL)
+    if page is not None:
+        return page
+    papers, total = fetch()
+    if not papers:
+        return papers, total
+    return paper_store.record(source, query, start, size, papers, total)
+
+def refresh_arxiv_page(query, max_results, start):
+    """Prefetch job: fetch an arXiv page upstream and keep the paper store's copy current too."""
+    papers, total = get_arxiv_papers.uncached(query=query, max_results=max_results, start=start)
+    if papers:
+        paper_store.record('arxiv', query, start, max_results, papers, total)
+    return papers, total
+
+def research_papers_params(args):
+    page = int(args.get("page", 1))
+    return {
+        "search_query": args.get("search", "AI"),
+        "source": args.get("source", "arxiv"),  # default to "arxiv" instead of "gs"
+        "page": page,
+        "max_results": PAPERS_PER_PAGE,
+        "start": (page - 1) * PAPERS_PER_PAGE,
+    }
+
+def research_paper_calls(params):
+    """
+    fan_out() calls for the upstream sources `params` asks for. Pages fetched
+    recently are answered by the paper store without going upstream.
+    """
+    search_query, max_results, start = params["search_query"], params["max_results"], params["start"]
+    calls = {}
+    if params["source"] in ["arxiv", "all"]:
+        calls["arxiv"] = (lambda: stored_page('arxiv', search_query, start, max_results,
+                                              lambda: prefetched('arxiv', get_arxiv_papers, query=search_query,
+                                                                 max_results=max_results, start=start)),
+                          Config.FANOUT_TIMEOUTS["arxiv"])
+    if params["source"] in ["pwc", "all"]:
+        calls["pwc"] = (lambda: stored_page('pwc', search_query, 0, max_results,
+                                            lambda: get_paperswithcode_papers(query=search_query, page_size=max_results)),
+                        Config.FANOUT_TIMEOUTS["pwc"])
+    return calls
+
+def render_research_papers(params, results):
+    """Render the papers page from the SourceResults of a (sync or async) fan-out."""
+    search_query, source, max_results, start = (params["search_query"], params["source"],
+                                                params["max_results"], params["start"])
+    papers = []
+    total_count = None
+    source_timings = []
+
+    # Searches of the local paper store only
+    if source == "local":
+        papers, total_count = paper_store.search(search_query, limit=max_results, offset=start)
+
+    fetched = []
+    for result in results:
+        source_timings.append(result.as_dict())
+        source_papers, source_total = result.value if result.ok else ([], 0)
+        if not source_papers and source == result.name:
+            # Upstream failed or came back empty: fall back to what the paper store holds
+            source_papers, source_total = paper_store.search(search_query, limit=max_results, offset=start)
+            if source_papers:
+                flash(f"No live results from {result.name}; showing stored papers.", "warning")
+        elif not result.ok:
+            flash(f"{result.name} is unavailable right now ({result.error}); showing partial results.", "warning")
+            continue
+        for paper in source_papers:
+            paper["source"] = ", ".join(paper.get("sources") or [result.name])
+        fetched.append(source_papers)
+        if source == result.name:
+            total_count = source_total
+    # The same paper from both sources is shown once
+    papers.extend(merge_results(*fetched))
+
+    # Optionally, include google scholar only if source is explicitly set:
+    if source in ["gs", "google"]:
+        gs_papers, gs_total = get_google_scholar_papers(query=search_query, max_results=max_results)
+        for paper in gs_papers:
+            paper["source"] = "google"
+        papers.extend(gs_papers)
+        total_count = gs_total
+
+    if source == "all":
+        total_count = len(papers)
+
+    return render_template("research_papers.html",
+                           papers=papers,
+                           search_query=search_query,
+                           source=source,
+                           page=params["page"],
+                           max_results=max_results,
+                           total_count=total_count,
+                           source_timings=source_timings)
+
+@bp.route('/research_papers')
+@page_cache.cached('research_papers')
+def research_papers():
+    params = research_papers_params(request.args)
+    # arXiv and Papers With Code are queried concurrently; each has its own timeout
+    results = fan_out(research_paper_calls(params), deadline=Config.FANOUT_DEADLINE)
+    return render_research_papers(params, results)
+
+
+@bp.route('/save_paper', methods=['POST'])
+@login_required
+def save_paper():
+    title = request.form.get('title')
+    url = request.form.get('url')
+    published = request.form.get('published')
+    authors = request.form.get('authors')
+    journal_ref = request.form.get('journal_ref')
+
+    # Papers are identified by the paper store's canonical key (arXiv ID, DOI or
+    # normalized title), so saving the same paper from another source is a no-op
+    item_key = paper_store.canonical_key(title, url)
+    already_saved = SavedItem.query.filter(
+        SavedItem.user_id == current_user.id,
+        SavedItem.item_type == 'paper',
+        SavedItem.item_key.in_(paper_store.aliases(item_key) + [title])
+    ).first() is not None
+    inserted = not already_saved and upsert_saved_item(
+        user_id=current_user.id,
+        item_type='paper',
+        title=title,
+        url=url,
+        published=published,
+        authors=authors,
+        journal_ref=journal_ref,
+        item_key=item_key
+    )
+    if not inserted:
+        flash('Paper already saved.', 'info')
+        return redirect(request.referrer or url_for('papers.research_papers'))
+
+    flash('Paper saved successfully!', 'success')
+    return redirect(request.referrer or url_for('papers.research_papers'))
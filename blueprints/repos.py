@@ -0,0 +1,97 @@
+from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask_login import login_required, current_user
+
+from config import Config
+from extensions import response_cache, page_cache, prefetched
+from models import upsert_saved_item
+
+bp = Blueprint('repos', __name__)
+
+# ---- GITHUB REPOS ----
+REPOS_PER_PAGE = 15
+
+# Request building and response parsing are shared with the async fetchers in asgi.py
+def github_search_request(search_query, order, per_page, page):
+    """
+    URL and params of a GitHub search for popular Python-based AI repositories.
+    Wrap search_query in quotes for exact match if it's not the default.
+    """
+    if search_query != "AI":
+        search_query = f'"{search_query}"'
+        
+    url = Config.GITHUB_API_URL + "/search/repositories"
+    params = {
+        "q": f"{search_query}+language:Python",
+        "sort": "stars",
+        "order": order,
+        "per_page": per_page,
+        "page": page
+    }
+    return url, params
+
+def parse_github_response(response):
+    if response.status_code == 200:
+        data = response.json()
+        return data.get("items", []), data.get("total_count", 0)
+    else:
+        print("Error fetching GitHub repos:", response.status_code)
+        return [], 0
+
+@response_cache.cached('github', cache_if=lambda result: result[0], case_insensitive=('search_query',))
+def get_github_ai_repos(search_query="AI", order="desc", per_page=15, page=1):
+    import requests  # deferred with the HTTP client: only needed once a page goes upstream
+    from http_client import get_http_client
+    url, params = github_search_request(search_query, order, per_page, page)
+    try:
+        response = get_http_client().get(url, params=params)
+    except requests.RequestException as e:
+        print("Error fetching GitHub repos:", e)
+        return [], 0
+    return parse_github_response(response)
+
+def github_repos_params(args):
+    return {
+        "search_query": args.get("search", "AI"),
+        "order": args.get("order", "desc"),
+        "per_page": REPOS_PER_PAGE,
+        "page": int(args.get("page", 1)),
+    }
+
+def render_github_repos(params, repos, total_count):
+    return render_template('github_repos.html',
+                           repos=repos,
+                           search_query=params["search_query"],
+                           order=params["order"],
+                           page=params["page"],
+                           per_page=params["per_page"],
+                           total_count=total_count)
+
+@bp.route('/github_repos')
+@page_cache.cached('github_repos')
+def github_repos():
+    params = github_repos_params(request.args)
+    repos, total_count = prefetched('github', get_github_ai_repos, **params)
+    return render_github_repos(params, repos, total_count)
+
+@bp.route('/save_repo', methods=['POST'])
+@login_required
+def save_repo():
+    """
+    Saves the selected GitHub repository to the user's SavedItem table.
+    """
+    repo_title = request.form.get('repo_name')  # using repo name as title
+    repo_url = request.form.get('repo_url')  # this must match your form name
+
+    # Insert unless already saved (for type 'repo', identified by url)
+    inserted = upsert_saved_item(
+        user_id=current_user.id,
+        item_type='repo',
+        title=repo_title,
+        url=repo_url
+    )
+    if not inserted:
+        flash('Repo already saved.', 'info')
+        return redirect(request.referrer or url_for('repos.github_repos'))
+
+    flash('Repo saved successfully!', 'success')
+    return redirect(request.referrer or url_for('repos.github_repos'))
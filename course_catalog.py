@@ -0,0 +1,148 @@
+import csv
+import os
+import threading
+
+from course_store import CompiledCatalog
+
+
+class CourseCatalog:
+    """
+    In-memory index over the courses CSV.
+    The file is parsed once and only re-read when its mtime or size changes,
+    so /courses and /start_course no longer re-tokenize the CSV on every hit.
+    A missing or unreadable file is remembered the same way: the catalog
+    stays empty, without retrying on every request, until the file changes.
+
+    When `compiled_path` holds a current build of the CSV (see course_store.py),
+    it is memory-mapped instead: rows are then CatalogRow views rather than
+    dicts, and nothing is parsed up front.
+    """
+
+    def __init__(self, path, compiled_path=None):
+        self.path = path
+        self.compiled_path = compiled_path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._signature = None
+        self.version = 0         # bumped on every reload so dependent indexes can resync
+        self.compiled = None     # CompiledCatalog in use, if any
+        self.rows = []           # rows by index (the 'index' key is the CSV row number)
+        self.rows_by_tag = {}    # lower-cased tag -> list of rows
+        self.tags = []           # distinct tags, sorted case-insensitively
+
+    @staticmethod
+    def _stat(path):
+        try:
+            stat = os.stat(path)
+        except (OSError, TypeError):
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _file_signature(self):
+        # A rebuilt catalog file counts as a change just like an edited CSV
+        csv_signature = self._stat(self.path)
+        if self.compiled_path is None:
+            return csv_signature
+        return (csv_signature, self._stat(self.compiled_path))
+
+    def _open_compiled(self):
+        if not self.compiled_path or not os.path.exists(self.compiled_path):
+            return None
+        try:
+            compiled = CompiledCatalog(self.compiled_path)
+        except (OSError, ValueError) as e:
+            print("Error opening compiled course catalog:", e)
+            return None
+        if not compiled.matches(self.path):
+            print(f"{self.compiled_path} was built from an older {self.path}; reading the CSV instead "
+                  "(rebuild with `python course_store.py`)")
+            return None
+        return compiled
+
+    def _load(self):
+        compiled = self._open_compiled()
+        if compiled is not None:
+            self.compiled = compiled
+            self.rows = compiled.all_rows()
+            self.rows_by_tag = {tag: compiled.tag_rows(tag) for tag in compiled.tag_counts()}
+            self.tags = compiled.tags
+            return
+
+        rows = []
+        rows_by_tag = {}
+        tags = set()
+        try:
+            with open(self.path, newline='', encoding='utf-8') as csvfile:
+                reader = csv.DictReader(csvfile)
+                for idx, row in enumerate(reader):
+                    row['index'] = idx
+                    rows.append(row)
+                    tag = (row.get("Tag") or "").strip()
+                    if tag:
+                        tags.add(tag)
+                    rows_by_tag.setdefault((row.get("Tag") or "").lower(), []).append(row)
+        except Exception as e:
+            print("Error reading courses.csv:", e)
+        self.compiled = None
+        self.rows = rows
+        self.rows_by_tag = rows_by_tag
+        self.tags = sorted(tags, key=str.lower)
+
+    def refresh(self):
+        """Reload the CSV if it changed on disk. Returns True when a reload happened."""
+        signature = self._file_signature()
+        if self._loaded and signature == self._signature:
+            return False
+        with self._lock:
+            if self._loaded and signature == self._signature:
+                return False
+            self._load()
+            self._signature = signature
+            self._loaded = True
+            self.version += 1
+            return True
+
+    def signature(self):
+        """(mtime_ns, size) of the files currently loaded; changes whenever they do."""
+        self.refresh()
+        return self._signature
+
+    def all(self):
+        self.refresh()
+        return self.rows
+
+    def by_tag(self, tag):
+        """Rows whose Tag equals `tag` (case-insensitive); 'all' returns every row."""
+        self.refresh()
+        if tag == "all":
+            return self.rows
+        return self.rows_by_tag.get(tag.lower(), [])
+
+    def all_tags(self):
+        self.refresh()
+        return self.tags
+
+    def tag_counts(self):
+        """Rows per lower-cased tag, read off the tag index."""
+        self.refresh()
+        return {tag: len(rows) for tag, rows in self.rows_by_tag.items()}
+
+    def get(self, index):
+        """Row at CSV position `index`, or None if out of range."""
+        self.refresh()
+        if 0 <= index < len(self.rows):
+            return self.rows[index]
+        return None
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(path, compiled_path=None):
+    """Process-wide catalog for `path` (preferring the build at `compiled_path`), created on first use."""
+    catalog = _catalogs.get(path)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.setdefault(path, CourseCatalog(path, compiled_path))
+    return catalog
@@ -0,0 +1,435 @@
+"""
+Course catalog ingestion pipeline.
+
+Fetches the listing pages of every course source concurrently, skips pages
+that have not changed since the last run (ETag / Last-Modified), parses them
+with per-source plugins, deduplicates by URL and atomically replaces the
+catalog CSV read by /courses. Existing rows keep their position (so the row
+indexes behind /start_course links stay put as far as possible) and new
+courses are appended. A source whose pages all came through replaces its old
+rows, so courses removed upstream leave the catalog; rows of sources that
+were not run, or that had a page fail with no earlier copy to fall back on,
+are kept. A run where any source yields nothing exits non-zero without
+touching the file.
+
+    python course_ingest.py                              # all sources -> COURSES_CSV_PATH
+    python course_ingest.py --sources coursera --pages 5 --output Courses1.csv
+    python course_ingest.py --fixtures fixtures          # parse saved HTML, no network
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit
+
+import course_store
+import html_extract
+from config import Config
+
+COLUMNS = ["Title", "Description", "URL", "Tag"]
+
+# Declarative page layouts, read by html_extract with the backend chosen in
+# SCRAPER_HTML_BACKEND. Updating a site's markup should only mean editing here.
+SITE_SELECTORS = {
+    "coursera": {
+        "courses": {
+            "card": "div.cds-ProductCard-content",
+            "fields": {
+                "title": {"css": "h3.cds-CommonCard-title"},
+                "href": {"css": "a", "attr": "href"},
+                "description": {"css": "a", "attr": "aria-label"},
+            },
+        },
+    },
+    "udacity": {
+        "next_data": {"card": "script#__NEXT_DATA__", "fields": {"json": {}}},
+        "courses": {
+            "card": "a.chakra-heading.css-1msstcr",
+            "fields": {"title": {}, "href": {"attr": "href"}},
+        },
+    },
+}
+
+SOURCES = {}
+
+
+def register_source(cls):
+    """Class decorator adding a source plugin to the pipeline."""
+    SOURCES[cls.name] = cls()
+    return cls
+
+
+class CourseSource:
+    """
+    Base class for source plugins. Subclasses set `name`, `tag` and
+    `page_url`, and implement parse(html) -> list of row dicts.
+    """
+    name = None
+    tag = None
+    page_url = None              # format string taking the page number
+    headers = {"User-Agent": "Mozilla/5.0"}
+    browser_fallback = False     # with --browser, re-render pages that parse to nothing in headless Chrome
+    html_backend = Config.SCRAPER_HTML_BACKEND
+
+    def page_urls(self, pages):
+        """(page number, url) for the first `pages` listing pages."""
+        return [(page, self.page_url.format(page)) for page in range(1, pages + 1)]
+
+    def parse(self, html):
+        raise NotImplementedError
+
+    def extract(self, html, part="courses"):
+        """Field dicts for the `part` layout of this source in SITE_SELECTORS."""
+        return html_extract.extract(html, SITE_SELECTORS[self.name][part], self.html_backend)
+
+    def row(self, title, description, url):
+        return {"Title": title, "Description": description, "URL": url, "Tag": self.tag}
+
+
+@register_source
+class CourseraSource(CourseSource):
+    name = "coursera"
+    tag = "Coursera"
+    page_url = "https://www.coursera.org/search?query=AI&page={}"
+
+    def parse(self, html):
+        rows = []
+        for course in self.extract(html):
+            title = course["title"].strip() if course["title"] is not None else "No title found"
+            course_url = f"https://www.coursera.org{course['href']}" if course["href"] is not None else "No URL"
+            description = course["description"] if course["description"] is not None else "No description available"
+            rows.append(self.row(title, description, course_url))
+        return rows
+
+
+@register_source
+class UdacitySource(CourseSource):
+    """
+    Udacity's catalog is a Next.js app: the server-rendered page already
+    carries the catalog in its __NEXT_DATA__ JSON and, usually, the
+    rendered course anchors too. Both are read from a plain HTTP response;
+    headless Chrome is only used with --browser when neither is there.
+    """
+    name = "udacity"
+    tag = "Udacity"
+    page_url = "https://www.udacity.com/catalog?page={}"
+    base_url = "https://www.udacity.com"
+    browser_fallback = True
+
+    def parse(self, html):
+        rows = self._parse_next_data(html)
+        if rows:
+            return rows
+        return [
+            self.row(anchor["title"].strip(), "Not Available", self.base_url + anchor["href"])
+            for anchor in self.extract(html) if anchor["href"]
+        ]
+
+    def _parse_next_data(self, html):
+        scripts = self.extract(html, "next_data")
+        if not scripts or not scripts[0]["json"]:
+            return []
+        try:
+            data = json.loads(scripts[0]["json"])
+        except ValueError:
+            return []
+        rows = []
+        stack = [data]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(reversed(node))
+            elif isinstance(node, dict):
+                if isinstance(node.get("title"), str) and (node.get("slug") or node.get("url")):
+                    url = node.get("url") or f"/course/{node['slug']}"
+                    if url.startswith("/"):
+                        url = self.base_url + url
+                    description = node.get("shortSummary") or node.get("summary") or "Not Available"
+                    rows.append(self.row(node["title"].strip(), description, url))
+                else:
+                    stack.extend(reversed(list(node.values())))
+        return rows
+
+
+# ---- fetching ----
+
+class PageState:
+    """Validators and parsed rows of each page from the previous run, kept in a JSON file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.pages = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.pages = json.load(f)
+
+    def get(self, url):
+        return self.pages.get(url, {})
+
+    def update(self, url, etag, last_modified, rows):
+        self.pages[url] = {"etag": etag, "last_modified": last_modified, "rows": rows}
+
+    def save(self):
+        if self.path:
+            atomic_write(self.path, lambda f: json.dump(self.pages, f))
+
+
+class HttpFetcher:
+    """
+    Fetches pages through the shared HTTP client with conditional headers.
+    Returns (status, html, etag, last_modified); status 304 means unchanged.
+    """
+
+    def fetch(self, source, page, url, previous):
+        from http_client import get_http_client
+        headers = dict(source.headers)
+        if previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
+        response = get_http_client().get(url, headers=headers)
+        return (response.status_code, response.text if response.status_code == 200 else None,
+                response.headers.get("ETag"), response.headers.get("Last-Modified"))
+
+
+class BrowserFetcher:
+    """Headless Chrome for JavaScript-rendered pages; one driver, used by one thread at a time."""
+
+    def __init__(self):
+        self.driver = None
+        self._lock = threading.Lock()
+
+    def fetch(self, source, page, url, previous):
+        with self._lock:
+            return self._render(url)
+
+    def _render(self, url):
+        if self.driver is None:
+            from selenium import webdriver
+            from selenium.webdriver.chrome.service import Service
+            from selenium.webdriver.chrome.options import Options
+            from webdriver_manager.chrome import ChromeDriverManager
+            options = Options()
+            options.add_argument("--headless")
+            options.add_argument("--disable-gpu")
+            options.add_argument("--window-size=1920,1080")
+            options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36")
+            self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+        self.driver.get(url)
+        return 200, self.driver.page_source, None, None
+
+    def close(self):
+        if self.driver is not None:
+            self.driver.quit()
+            self.driver = None
+
+
+class FixtureFetcher:
+    """Serves saved HTML from `<directory>/<source>_page<N>.html` instead of the network."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def fetch(self, source, page, url, previous):
+        path = os.path.join(self.directory, f"{source.name}_page{page}.html")
+        if not os.path.exists(path):
+            return 404, None, None, None
+        with open(path, encoding="utf-8") as f:
+            return 200, f.read(), None, None
+
+
+# ---- pipeline ----
+
+def normalize_url(url):
+    """Dedupe key: scheme/host lower-cased, query, fragment and trailing slash dropped."""
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), "", ""))
+
+
+def dedupe(rows):
+    seen = set()
+    unique = []
+    for row in rows:
+        key = normalize_url(row["URL"])
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(row)
+    return unique
+
+
+def atomic_write(path, write):
+    """Write via a temp file in the same directory and rename it over `path`."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_catalog(path):
+    """Rows of an existing catalog CSV, or [] if there is none."""
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            return [{column: row.get(column) or "" for column in COLUMNS} for row in csv.DictReader(f)]
+    except FileNotFoundError:
+        return []
+
+
+def merge_catalog(rows, existing, replaced_tags):
+    """
+    `existing` rows in their current order, each refreshed from `rows` when
+    scraped again (same URL), then the new rows. Existing rows that were not
+    scraped again are dropped if their Tag is in `replaced_tags`.
+    """
+    fresh = {normalize_url(row["URL"]): row for row in dedupe(rows)}
+    merged = []
+    placed = set()
+    for row in existing:
+        key = normalize_url(row["URL"])
+        if key in placed:
+            continue
+        if key in fresh:
+            merged.append(fresh[key])
+        elif row["Tag"] not in replaced_tags:
+            merged.append(row)
+        else:
+            continue
+        placed.add(key)
+    merged.extend(row for key, row in fresh.items() if key not in placed)
+    return merged
+
+
+def write_catalog(path, rows):
+    def write(f):
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    atomic_write(path, write)
+
+
+class IngestPipeline:
+    def __init__(self, sources, pages=20, workers=8, state_path=None, fetcher=None, browser_fetcher=None):
+        self.sources = sources
+        self.pages = pages
+        self.workers = workers
+        self.state = PageState(state_path)
+        self.fetcher = fetcher or HttpFetcher()
+        self.browser_fetcher = browser_fetcher
+        self.stats = {"fetched": 0, "unchanged": 0, "failed": 0}
+        self.rows_per_source = {}
+        self.incomplete_sources = set()   # a page failed and no earlier rows of it were known
+        self._stats_lock = threading.Lock()
+
+    def _count(self, outcome):
+        with self._stats_lock:
+            self.stats[outcome] += 1
+
+    def _failed(self, source, previous):
+        with self._stats_lock:
+            self.stats["failed"] += 1
+            if "rows" not in previous:
+                self.incomplete_sources.add(source.name)
+        return previous.get("rows", [])
+
+    def _process(self, source, page, url):
+        previous = self.state.get(url)
+        try:
+            status, html, etag, last_modified = self.fetcher.fetch(source, page, url, previous)
+        except Exception as e:
+            print(f"Failed to fetch {url}: {e}")
+            return self._failed(source, previous)
+        if status == 304:
+            # Unchanged since the last run: reuse the rows parsed then
+            self._count("unchanged")
+            return previous.get("rows", [])
+        if status != 200:
+            print(f"Failed to fetch {url} ({status}), skipping...")
+            return self._failed(source, previous)
+        rows = source.parse(html)
+        if not rows and source.browser_fallback and self.browser_fetcher is not None:
+            try:
+                _, rendered, _, _ = self.browser_fetcher.fetch(source, page, url, previous)
+                rows = source.parse(rendered)
+            except Exception as e:
+                print(f"Browser render of {url} failed: {e}")
+        self.state.update(url, etag, last_modified, rows)
+        self._count("fetched")
+        return rows
+
+    def run(self):
+        """Returns the merged, deduplicated rows of every source, in source and page order."""
+        jobs = [(source, page, url) for source in self.sources for page, url in source.page_urls(self.pages)]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {job: pool.submit(self._process, *job) for job in jobs}
+            results = {job: future.result() for job, future in futures.items()}
+        self.state.save()
+        self.rows_per_source = {source.name: 0 for source in self.sources}
+        for (source, _, _), rows in results.items():
+            self.rows_per_source[source.name] += len(rows)
+        return dedupe([row for job in jobs for row in results[job]])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape course sources into the catalog CSV.")
+    parser.add_argument("--sources", nargs="+", choices=sorted(SOURCES), default=list(SOURCES))
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--output", default=Config.COURSES_CSV_PATH)
+    parser.add_argument("--state", default=Config.INGEST_STATE_PATH,
+                        help="JSON file with per-page ETag/Last-Modified from the last run")
+    parser.add_argument("--fixtures", help="read <source>_page<N>.html files from this directory instead of fetching")
+    parser.add_argument("--browser", action="store_true",
+                        help="re-render pages that yield no courses in headless Chrome (needs selenium)")
+    parser.add_argument("--html-backend", choices=sorted(html_extract.BACKENDS), default=Config.SCRAPER_HTML_BACKEND,
+                        help="HTML parser used for extraction")
+    args = parser.parse_args(argv)
+    CourseSource.html_backend = args.html_backend
+
+    sources = [SOURCES[name] for name in args.sources]
+    browser = BrowserFetcher() if args.browser and not args.fixtures else None
+    if args.fixtures:
+        pipeline = IngestPipeline(sources, args.pages, args.workers, state_path=None,
+                                  fetcher=FixtureFetcher(args.fixtures))
+    else:
+        pipeline = IngestPipeline(sources, args.pages, args.workers, args.state, browser_fetcher=browser)
+    try:
+        rows = pipeline.run()
+    finally:
+        if browser is not None:
+            browser.close()
+    stats = (f"{pipeline.stats['fetched']} pages fetched, {pipeline.stats['unchanged']} unchanged, "
+             f"{pipeline.stats['failed']} failed")
+    # Never replace a good catalog with the result of a failed run (network down, markup changed)
+    empty_sources = [name for name, count in pipeline.rows_per_source.items() if count == 0]
+    if not rows or empty_sources:
+        print(f"No courses from {', '.join(empty_sources) or 'any source'} ({stats}); "
+              f"leaving {args.output} unchanged")
+        sys.exit(1)
+    # Sources that came through completely replace their old rows; the rest keep them
+    replaced_tags = {source.tag for source in sources if source.name not in pipeline.incomplete_sources}
+    existing = read_catalog(args.output)
+    merged = merge_catalog(rows, existing, replaced_tags)
+    write_catalog(args.output, merged)
+    kept = len(merged) - len(rows)
+    print(f"Wrote {len(merged)} courses to {args.output} ({len(rows)} scraped, {kept} kept from the previous "
+          f"catalog; {stats})")
+    # Keep an existing compiled catalog in step, or the app falls back to parsing the CSV
+    if args.output == Config.COURSES_CSV_PATH and os.path.exists(Config.COURSES_CATALOG_PATH):
+        course_store.build(args.output, Config.COURSES_CATALOG_PATH)
+        print(f"Rebuilt {Config.COURSES_CATALOG_PATH}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,353 @@
+import bisect
+import collections
+import heapq
+import itertools
+import math
+import operator
+import re
+import threading
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+TITLE_WEIGHT = 2          # a title hit counts as this many description hits
+MAX_PREFIX_TERMS = 8      # expansions kept for a type-ahead prefix (highest df first)
+PREFIX_SCAN_LIMIT = 500   # vocabulary entries examined per prefix
+BLOCK_SIZE = 32           # postings read per list before the first stop check, doubling after each
+MAX_BLOCK_SIZE = 512
+MAX_SHARED = 512          # shared documents scored when a list stops being read
+RESULT_CACHE_SIZE = 1024  # recent (query, limit, prefix) results kept until the index changes
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or "").lower())
+
+
+def _doc_key(row):
+    return (row.get("Title"), row.get("Description"), row.get("URL"), row.get("Tag"))
+
+
+class CourseSearchIndex:
+    """
+    BM25-ranked inverted index over course Title and Description.
+
+    Documents are synced from a CourseCatalog: only rows that were added or
+    removed since the last sync touch the postings. Per-term impact lists are
+    computed lazily and cached until the next change (the expansions of a
+    type-ahead prefix share one list), and queries use the threshold
+    algorithm over impact-ordered postings so the top results are found
+    without scoring every matching document. Recent results are kept
+    in a small LRU since type-ahead repeats the same prefixes.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._next_id = 0
+        self._rows = {}          # doc_id -> catalog row
+        self._doc_len = {}       # doc_id -> weighted token count
+        self._total_len = 0
+        self._keys = {}          # row content key -> list of doc_ids
+        self._postings = {}      # term -> {doc_id: weighted tf}
+        self._vocab = []         # sorted terms, rebuilt lazily for prefix lookups
+        self._vocab_dirty = False
+        self._impacts = {}       # term -> (impact-sorted [(score, doc_id)], {doc_id: score})
+        self._results = collections.OrderedDict()
+        self.catalog_version = None
+
+    def __len__(self):
+        return len(self._rows)
+
+    # ---- maintenance ----
+    def add(self, row):
+        with self._lock:
+            doc_id = self._next_id
+            self._next_id += 1
+            tf = {}
+            for term in tokenize(row.get("Title")):
+                tf[term] = tf.get(term, 0) + TITLE_WEIGHT
+            for term in tokenize(row.get("Description")):
+                tf[term] = tf.get(term, 0) + 1
+            for term, count in tf.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    self._vocab_dirty = True
+                postings[doc_id] = count
+            length = sum(tf.values())
+            self._rows[doc_id] = row
+            self._doc_len[doc_id] = length
+            self._total_len += length
+            self._keys.setdefault(_doc_key(row), []).append(doc_id)
+            self._invalidate()
+            return doc_id
+
+    def remove(self, doc_id):
+        with self._lock:
+            row = self._rows.pop(doc_id, None)
+            if row is None:
+                return
+            self._total_len -= self._doc_len.pop(doc_id)
+            key = _doc_key(row)
+            self._keys[key].remove(doc_id)
+            if not self._keys[key]:
+                del self._keys[key]
+            for term in set(tokenize(row.get("Title")) + tokenize(row.get("Description"))):
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+                    self._vocab_dirty = True
+            self._invalidate()
+
+    def _invalidate(self):
+        self._impacts.clear()
+        self._results.clear()
+
+    def sync(self, rows, version=None):
+        """
+        Bring the index in line with `rows`, adding and removing only the
+        rows whose content changed. Unchanged rows keep their postings but
+        pick up the new row object (its 'index' may have moved).
+        """
+        with self._lock:
+            wanted = {}
+            for row in rows:
+                wanted.setdefault(_doc_key(row), []).append(row)
+            for key, doc_ids in list(self._keys.items()):
+                keep = len(wanted.get(key, ()))
+                for doc_id in doc_ids[keep:]:
+                    self.remove(doc_id)
+            for key, new_rows in wanted.items():
+                doc_ids = self._keys.get(key, [])
+                for doc_id, row in zip(doc_ids, new_rows):
+                    self._rows[doc_id] = row
+                for row in new_rows[len(doc_ids):]:
+                    self.add(row)
+            self._results.clear()
+            self.catalog_version = version
+
+    # ---- querying ----
+    def _terms_with_prefix(self, prefix):
+        if self._vocab_dirty:
+            self._vocab = sorted(self._postings)
+            self._vocab_dirty = False
+        start = bisect.bisect_left(self._vocab, prefix)
+        matches = []
+        for term in self._vocab[start:start + PREFIX_SCAN_LIMIT]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        matches.sort(key=lambda t: len(self._postings[t]), reverse=True)
+        return matches[:MAX_PREFIX_TERMS]
+
+    def _impact(self, term):
+        cached = self._impacts.get(term)
+        if cached is not None:
+            return cached
+        postings = self._postings.get(term)
+        if not postings:
+            return None
+        n = len(self._rows)
+        df = len(postings)
+        idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        avgdl = self._total_len / n
+        doc_len = self._doc_len
+        scores = {}
+        for doc_id, tf in postings.items():
+            norm = K1 * (1 - B + B * doc_len[doc_id] / avgdl)
+            scores[doc_id] = idf * tf * (K1 + 1) / (tf + norm)
+        ordered = sorted(((score, doc_id) for doc_id, score in scores.items()), reverse=True)
+        cached = self._impacts[term] = (ordered, scores)
+        return cached
+
+    def _prefix_impact(self, prefix, terms):
+        """
+        One impact list for all `terms` a type-ahead prefix expands to, each
+        document scored with the sum of its expansions. Ranking is the same as
+        with one list per term, but the threshold algorithm gets a single,
+        much tighter bound for the prefix. Cached like the per-term lists.
+        """
+        key = prefix + "*"      # never a term: tokens are [a-z0-9]+
+        cached = self._impacts.get(key)
+        if cached is not None:
+            return cached
+        lists = [impact for impact in map(self._impact, sorted(terms)) if impact is not None]
+        if len(lists) <= 1:
+            return lists[0] if lists else None
+        scores = {}
+        for _, term_scores in lists:
+            for doc_id, score in term_scores.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+        ordered = sorted(((score, doc_id) for doc_id, score in scores.items()), reverse=True)
+        cached = self._impacts[key] = (ordered, scores)
+        return cached
+
+    def _lists(self, tokens, prefix):
+        terms = set(tokens)
+        lists = []
+        if prefix:
+            expansions = {tokens[-1]}
+            expansions.update(self._terms_with_prefix(tokens[-1]))
+            terms -= expansions
+            lists.append(self._prefix_impact(tokens[-1], expansions))
+        lists.extend(map(self._impact, terms))
+        return [impact for impact in lists if impact is not None]
+
+    def _tag_filter(self, tag):
+        if tag is None:
+            return None
+        rows = self._rows
+        return lambda doc_id: (rows[doc_id].get("Tag") or "").lower() == tag
+
+    def _cached(self, key, compute):
+        cached = self._results.get(key)
+        if cached is not None:
+            self._results.move_to_end(key)
+            return cached
+        value = self._results[key] = compute()
+        if len(self._results) > RESULT_CACHE_SIZE:
+            self._results.popitem(last=False)
+        return value
+
+    def search(self, query, limit=50, prefix=True, tag=None):
+        """
+        Return up to `limit` (row, score) pairs ranked by BM25.
+        With `prefix`, the last query token also matches terms it is a prefix of;
+        with `tag`, only rows whose lower-cased Tag equals it are ranked.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self._lock:
+            if not self._rows:
+                return []
+
+            def compute():
+                lists = self._lists(tokens, prefix)
+                top = self._threshold_top_k(lists, limit, self._tag_filter(tag)) if lists else []
+                return [(self._rows[doc_id], score) for score, doc_id in top]
+            return self._cached((" ".join(tokens), limit, prefix, tag), compute)
+
+    def count(self, query, prefix=True, tag=None):
+        """Number of rows search() can return for `query` and `tag` with no limit."""
+        tokens = tokenize(query)
+        if not tokens:
+            return 0
+        with self._lock:
+            def compute():
+                matches = set()
+                for _, scores in self._lists(tokens, prefix):
+                    matches.update(scores)
+                accept = self._tag_filter(tag)
+                return len(matches) if accept is None else sum(1 for doc_id in matches if accept(doc_id))
+            return self._cached(("count", " ".join(tokens), prefix, tag), compute)
+
+    @staticmethod
+    def _threshold_top_k(lists, k, accept=None):
+        """
+        Fagin's threshold algorithm over impact-ordered postings with random
+        access. Documents failing `accept` are skipped, so a filter does not
+        cost result slots.
+
+        Postings are read in blocks (doubling up to MAX_BLOCK_SIZE) and scored
+        with dict lookups mapped over the block. A list whose remaining
+        impacts, added to those of the lists already dropped, fall below the
+        k-th score stops being read (MaxScore). The few documents it shares
+        with the lists still read are then scored at once, which takes its
+        share out of the bound: on flat score distributions the scan would
+        otherwise run to the end of the longest list.
+        """
+        if k <= 0:
+            return []
+        heap = []           # min-heap of (score, -doc_id)
+        seen = set()
+
+        def offer(doc_ids):
+            doc_ids.difference_update(seen)
+            seen.update(doc_ids)
+            if accept is not None:
+                doc_ids = filter(accept, doc_ids)
+            doc_ids = list(doc_ids)
+            totals = map(sum, zip(*[map(scores.get, doc_ids, itertools.repeat(0.0)) for _, scores in lists]))
+            entries = zip(totals, map(operator.neg, doc_ids))
+            if len(heap) >= k:
+                entries = filter(heap[0].__lt__, entries)
+            for entry in entries:
+                if len(heap) < k:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+
+        second = operator.itemgetter(1)
+        current = [0.0] * len(lists)
+        active = list(range(len(lists)))
+        passive = 0.0       # remaining impacts of the lists no longer read
+        dropped = []
+        shared_scored = set()   # (dropped, active) list pairs whose shared documents are all scored
+        covered = True
+        depth = 0
+        block = BLOCK_SIZE
+        while active:
+            fresh = set()
+            for i in active:
+                chunk = lists[i][0][depth:depth + block]
+                current[i] = chunk[-1][0] if chunk else 0.0
+                fresh.update(map(second, chunk))
+            if not fresh:
+                break
+            offer(fresh)
+            depth += block
+            block = min(block * 2, MAX_BLOCK_SIZE)
+            if len(heap) < k:
+                continue
+            # MaxScore: a document found only in lists whose remaining impacts add up to less
+            # than the k-th score cannot enter the top k, so those lists need not be read on
+            kth = heap[0][0]
+            active.sort(key=current.__getitem__)
+            newly_dropped = False
+            while active and passive + current[active[0]] < kth:
+                passive += current[active[0]]
+                dropped.append(active.pop(0))
+                newly_dropped = True
+            if newly_dropped:
+                # Score the unseen documents a dropped list shares with one still read, unless
+                # there are many. Once that is done for every pair, an unseen document gets
+                # nothing from the dropped lists and the bound is the active lists' alone.
+                covered = True
+                for i in dropped:
+                    for j in active:
+                        if (i, j) in shared_scored:
+                            continue
+                        small, large = sorted((lists[i][1], lists[j][1]), key=len)
+                        shared = itertools.filterfalse(seen.__contains__, filter(large.__contains__, small))
+                        shared = set(itertools.islice(shared, MAX_SHARED))
+                        if len(shared) >= MAX_SHARED:
+                            covered = False
+                            continue
+                        offer(shared)
+                        shared_scored.add((i, j))
+            # Strictly above: an unseen document scoring exactly the bound could still win a
+            # tie on doc id, and ties must break the same way at every k for pages to line up
+            if heap[0][0] > sum(current[i] for i in active) + (0.0 if covered else passive):
+                break
+        return [(score, -neg_id) for score, neg_id in sorted(heap, reverse=True)]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(catalog):
+    """Search index for `catalog`, resynced whenever the catalog reloads."""
+    rows = catalog.all()
+    index = _indexes.get(catalog.path)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.setdefault(catalog.path, CourseSearchIndex())
+    if index.catalog_version != catalog.version:
+        index.sync(rows, catalog.version)
+    return index
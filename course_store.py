@@ -0,0 +1,340 @@
+"""
+Compiled course catalog: a memory-mapped, column-oriented copy of courses.csv.
+
+    python course_store.py                                  # COURSES_CSV_PATH -> COURSES_CATALOG_PATH
+    python course_store.py big.csv --output big.catalog
+
+The converter reads the CSV once and writes
+
+    MAGIC | header length (uint64) | JSON header | sections, each 8-byte aligned
+
+Every column is stored either plain (an offsets array of rows + 1 entries
+into a UTF-8 blob) or, when it has few distinct values, dictionary-encoded
+(a per-row codes array into a string table). A tag index (lower-cased Tag ->
+row numbers) is stored as well, so filtering and counting by tag read no
+row data.
+
+CompiledCatalog maps the file read-only. Opening it only parses the header;
+rows are CatalogRow views (`__slots__`, no per-row dict) that decode a field
+when it is read, and every worker mapping the file shares its pages through
+the OS page cache. The header records the source CSV's mtime and size, so
+CourseCatalog can tell a stale build from a current one. Builds are written
+to a temporary file and renamed into place: processes still mapping the old
+file keep reading it safely until they reload.
+"""
+import argparse
+import array
+import csv
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+
+MAGIC = b"AIHCAT1\n"
+FORMAT_VERSION = 1
+ALIGN = 8
+INDEX_COLUMN = "Tag"
+DICT_MAX_VALUES = 65535   # columns with more distinct values are stored plain
+DICT_MAX_RATIO = 0.25     # ... as are columns whose distinct values exceed this share of rows
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _offsets_typecode(total):
+    return 'I' if total < 2 ** 32 else 'Q'
+
+
+def _codes_typecode(count):
+    return 'B' if count <= 0xFF else 'H' if count <= 0xFFFF else 'I'
+
+
+def _source_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class _ColumnBuilder:
+    """Accumulates one column: the UTF-8 blob spills to a temp file, offsets and codes stay in arrays."""
+
+    def __init__(self, name, directory):
+        self.name = name
+        self.blob = tempfile.TemporaryFile(dir=directory)
+        self.offsets = array.array('Q', [0])
+        self.codes = array.array('I')
+        self.values = {}       # distinct value -> code, dropped once the column is clearly not categorical
+
+    def add(self, value):
+        encoded = value.encode('utf-8')
+        self.blob.write(encoded)
+        self.offsets.append(self.offsets[-1] + len(encoded))
+        if self.values is not None:
+            code = self.values.setdefault(value, len(self.values))
+            if len(self.values) > DICT_MAX_VALUES:
+                self.values = None
+                self.codes = None
+            else:
+                self.codes.append(code)
+
+    def dictionary_encoded(self, rows):
+        return self.values is not None and len(self.values) <= max(1, rows * DICT_MAX_RATIO)
+
+
+def build(csv_path, output_path, index_column=INDEX_COLUMN):
+    """Convert `csv_path` into a compiled catalog at `output_path` (atomically replaced). Returns the row count."""
+    directory = os.path.dirname(os.path.abspath(output_path))
+    source = _source_signature(csv_path)
+    with open(csv_path, newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile)
+        names = next(reader, [])
+        columns = [_ColumnBuilder(name, directory) for name in names]
+        tag_position = names.index(index_column) if index_column in names else None
+        tag_rows = {}      # lower-cased tag -> row numbers
+        tags = set()
+        rows = 0
+        for record in reader:
+            if not record:
+                continue   # blank line; csv.DictReader skips these too
+            for position, column in enumerate(columns):
+                column.add(record[position] if position < len(record) else '')
+            if tag_position is not None:
+                tag = record[tag_position] if tag_position < len(record) else ''
+                tag_rows.setdefault(tag.lower(), array.array('I')).append(rows)
+                if tag.strip():
+                    tags.add(tag.strip())
+            rows += 1
+
+    # Lay out the sections (positions relative to the end of the header), then write them in order
+    sections = []          # (position, writer)
+    position = 0
+
+    def place(size, write):
+        nonlocal position
+        start = position
+        sections.append((start, write))
+        position = _align(position + size)
+        return start
+
+    def place_array(values, typecode):
+        packed = array.array(typecode, values)
+        return [place(len(packed) * packed.itemsize, lambda f: packed.tofile(f)), typecode]
+
+    header_columns = []
+    for column in columns:
+        if column.dictionary_encoded(rows):
+            table = sorted(column.values, key=column.values.get)
+            encoded = [value.encode('utf-8') for value in table]
+            lengths = [0]
+            for value in encoded:
+                lengths.append(lengths[-1] + len(value))
+            blob = b"".join(encoded)
+            header_columns.append({
+                "name": column.name, "kind": "dict", "values": len(table),
+                "codes": place_array(column.codes, _codes_typecode(len(table))),
+                "offsets": place_array(lengths, _offsets_typecode(lengths[-1])),
+                "data": [place(len(blob), lambda f, blob=blob: f.write(blob)), len(blob)],
+            })
+            column.blob.close()
+        else:
+            size = column.offsets[-1]
+            column.blob.seek(0)
+            header_columns.append({
+                "name": column.name, "kind": "plain",
+                "offsets": place_array(column.offsets, _offsets_typecode(size)),
+                "data": [place(size, lambda f, blob=column.blob: shutil.copyfileobj(blob, f)), size],
+            })
+
+    tag_index = {}
+    row_ids = array.array('I')
+    for tag in sorted(tag_rows):
+        tag_index[tag] = [len(row_ids), len(tag_rows[tag])]
+        row_ids.extend(tag_rows[tag])
+    header = json.dumps({
+        "version": FORMAT_VERSION, "byteorder": sys.byteorder, "rows": rows, "source": source,
+        "columns": header_columns, "index_column": index_column if tag_position is not None else None,
+        "tags": sorted(tags, key=str.lower), "tag_index": tag_index,
+        "row_ids": place_array(row_ids, 'I'),
+    }).encode('utf-8')
+    base = _align(len(MAGIC) + 8 + len(header))
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".courses-", suffix=".catalog")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC + struct.pack('<Q', len(header)) + header)
+            for start, write in sections:
+                f.write(b"\0" * (base + start - f.tell()))
+                write(f)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    finally:
+        for column in columns:
+            column.blob.close()
+    return rows
+
+
+class CatalogRow:
+    """Read-only view of one catalog row; supports row['Title'], row.get('Tag') and, in templates, row.Title."""
+
+    __slots__ = ('_catalog', 'index')
+
+    def __init__(self, catalog, index):
+        self._catalog = catalog
+        self.index = index
+
+    def __getitem__(self, name):
+        if name == 'index':
+            return self.index
+        return self._catalog.value(name, self.index)
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return self._catalog.columns + ['index']
+
+    def __contains__(self, name):
+        return name == 'index' or name in self._catalog.columns
+
+    def to_dict(self):
+        return {name: self[name] for name in self.keys()}
+
+    def __repr__(self):
+        return f"CatalogRow({self.index}, {self.get('Title')!r})"
+
+
+class RowList:
+    """Lazy sequence of CatalogRows, optionally restricted to an array of row numbers."""
+
+    __slots__ = ('_catalog', '_ids', '_start', '_stop')
+
+    def __init__(self, catalog, ids=None, start=0, stop=None):
+        self._catalog = catalog
+        self._ids = ids
+        self._start = start
+        self._stop = (len(ids) if ids is not None else catalog.rows) if stop is None else stop
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __bool__(self):
+        return self._stop > self._start
+
+    def _row_number(self, position):
+        return self._ids[position] if self._ids is not None else position
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return RowList(self._catalog, self._ids, self._start + start, self._start + max(start, stop))
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError(item)
+        return CatalogRow(self._catalog, self._row_number(self._start + item))
+
+    def __iter__(self):
+        catalog = self._catalog
+        for position in range(self._start, self._stop):
+            yield CatalogRow(catalog, self._row_number(position))
+
+
+class CompiledCatalog:
+    """A compiled catalog file mapped read-only; raises ValueError if the file is not one."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        if bytes(buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a compiled course catalog")
+        (header_length,) = struct.unpack_from('<Q', self._mmap, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(bytes(buffer[start:start + header_length]))
+        if header["version"] != FORMAT_VERSION or header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was built by another format version or on another platform; rebuild it")
+        base = _align(start + header_length)
+
+        def section(position, count, typecode):
+            width = array.array(typecode).itemsize
+            return buffer[base + position:base + position + count * width].cast(typecode)
+
+        self.header = header
+        self.rows = header["rows"]
+        self.source = header["source"]
+        self.columns = [column["name"] for column in header["columns"]]
+        self._readers = {}
+        for column in header["columns"]:
+            data = buffer[base + column["data"][0]:base + column["data"][0] + column["data"][1]]
+            if column["kind"] == "dict":
+                offsets = section(column["offsets"][0], column["values"] + 1, column["offsets"][1])
+                table = [str(data[offsets[i]:offsets[i + 1]], 'utf-8') for i in range(column["values"])]
+                codes = section(column["codes"][0], self.rows, column["codes"][1])
+                self._readers[column["name"]] = lambda i, table=table, codes=codes: table[codes[i]]
+            else:
+                offsets = section(column["offsets"][0], self.rows + 1, column["offsets"][1])
+                self._readers[column["name"]] = (
+                    lambda i, data=data, offsets=offsets: str(data[offsets[i]:offsets[i + 1]], 'utf-8'))
+        self.tags = header["tags"]
+        self._tag_index = header["tag_index"]
+        self._row_ids = section(header["row_ids"][0], sum(count for _, count in self._tag_index.values()),
+                                header["row_ids"][1])
+
+    def matches(self, csv_path):
+        """True if built from the current `csv_path` (or the CSV is not deployed at all)."""
+        signature = _source_signature(csv_path)
+        return signature is None or signature == self.source
+
+    def value(self, name, index):
+        return self._readers[name](index)
+
+    def row(self, index):
+        return CatalogRow(self, index)
+
+    def all_rows(self):
+        return RowList(self)
+
+    def tag_rows(self, tag):
+        """Rows whose lower-cased Tag is `tag`, in file order."""
+        entry = self._tag_index.get(tag)
+        if entry is None:
+            return RowList(self, self._row_ids, 0, 0)
+        return RowList(self, self._row_ids, entry[0], entry[0] + entry[1])
+
+    def tag_counts(self):
+        """Row count per lower-cased Tag, straight from the index."""
+        return {tag: count for tag, (_, count) in self._tag_index.items()}
+
+
+def main(argv=None):
+    from config import Config
+
+    parser = argparse.ArgumentParser(description="Compile the courses CSV into a memory-mapped catalog.")
+    parser.add_argument("csv", nargs="?", default=Config.COURSES_CSV_PATH)
+    parser.add_argument("--output", default=None,
+                        help="catalog file to write (default: COURSES_CATALOG_PATH, or the CSV path with .catalog)")
+    args = parser.parse_args(argv)
+    output = args.output
+    if output is None:
+        output = (Config.COURSES_CATALOG_PATH if args.csv == Config.COURSES_CSV_PATH
+                  else os.path.splitext(args.csv)[0] + ".catalog")
+    rows = build(args.csv, output)
+    print(f"Compiled {rows} courses from {args.csv} into {output} ({os.path.getsize(output)} bytes)")
+
+
+if __name__ == '__main__':
+    main()
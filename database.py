@@ -0,0 +1,65 @@
+"""
+Database engine configuration shared by the app and the benchmarks.
+
+SQLite connections get a relaxed fsync policy, a busy timeout and
+memory-mapped reads on connect. WAL journaling, which lets readers proceed
+while save/submit writes are in flight across gunicorn workers, is a
+persistent property of the database file, so it is switched on once by the
+sqlite_wal_journal migration rather than on every connection. Any other backend
+(e.g. PostgreSQL via DATABASE_URL) gets a sized, pre-pinged pool.
+"""
+from sqlalchemy import event
+
+
+def normalize_database_url(url):
+    """Accept Heroku-style postgres:// URLs, which SQLAlchemy 1.4+ rejects."""
+    if url and url.startswith("postgres://"):
+        return "postgresql://" + url[len("postgres://"):]
+    return url
+
+
+def is_sqlite(uri):
+    return uri.startswith("sqlite")
+
+
+def engine_options(uri, pool_size=5, max_overflow=10, pool_recycle=1800, busy_timeout_ms=5000):
+    """SQLALCHEMY_ENGINE_OPTIONS for `uri`."""
+    options = {"pool_pre_ping": True}
+    if is_sqlite(uri):
+        # sqlite3's own lock wait, in seconds; matches the busy_timeout pragma
+        options["connect_args"] = {"timeout": busy_timeout_ms / 1000}
+        if ":memory:" not in uri and uri not in ("sqlite://", "sqlite:///"):
+            options["pool_size"] = pool_size
+            options["max_overflow"] = max_overflow
+    else:
+        options.update(pool_size=pool_size, max_overflow=max_overflow, pool_recycle=pool_recycle)
+    return options
+
+
+def sqlite_pragmas(synchronous="NORMAL", busy_timeout_ms=5000, mmap_size=268435456):
+    """Per-connection pragmas; none of them changes the database file."""
+    return [
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA busy_timeout={int(busy_timeout_ms)}",
+        f"PRAGMA mmap_size={int(mmap_size)}",
+    ]
+
+
+def configure_engine(engine, pragmas):
+    """Run `pragmas` on every new SQLite connection of `engine`; no-op for other backends."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def enable_wal(conn):
+    """Switch the SQLite database behind `conn` to WAL journaling (persistent); no-op for other backends."""
+    if conn.dialect.name == "sqlite":
+        return conn.exec_driver_sql("PRAGMA journal_mode=WAL").scalar()
+    return None
@@ -0,0 +1,67 @@
+"""
+Objects shared by the blueprints, created once per process and bound to
+the Flask app in create_app(): the database and login manager, plus the
+upstream response cache, prefetched snapshots, the local paper store,
+the chat answer cache, the rendered-page cache, the session user
+cache and the password hashing pool.
+
+Clients with expensive imports (OpenAI, requests, feedparser) are not
+created here; the blueprints build them on first use.
+"""
+from flask_login import LoginManager
+from flask_sqlalchemy import SQLAlchemy
+
+import metrics
+from answer_cache import AnswerCache
+from config import Config
+from page_cache import DatabaseGenerations, create_page_cache
+from paper_store import create_paper_store
+from passwords import create_hash_pool
+from prefetch import create_prefetcher
+from response_cache import create_cache
+from user_cache import UserCache
+
+db = SQLAlchemy()
+login_manager = LoginManager()
+login_manager.login_view = 'auth.login'  # If a non-logged user tries to access a protected route, redirect to /login
+
+response_cache = create_cache(Config)  # Shared cache for GitHub / arXiv / Papers With Code responses
+prefetcher = create_prefetcher(Config)  # Background-refreshed snapshots of the default repo/paper pages
+paper_store = create_paper_store(Config)  # Deduplicated local copy of every fetched paper
+page_cache = create_page_cache(Config, DatabaseGenerations(db))  # Rendered public listing pages, purged in all workers
+user_cache = UserCache(max_entries=Config.USER_CACHE_MAX_ENTRIES, ttl=Config.USER_CACHE_TTL,
+                       enabled=Config.USER_CACHE_ENABLED)  # Logged-in users for the user_loader
+hash_pool = create_hash_pool(Config)  # Bounded workers for password hashing
+answer_cache = AnswerCache(
+    max_entries=Config.CHAT_CACHE_MAX_ENTRIES,
+    ttl=Config.CHAT_CACHE_TTL,
+    similarity=Config.CHAT_CACHE_SIMILARITY,
+    threshold=Config.CHAT_CACHE_THRESHOLD
+)
+
+
+def prefetched(source, fetch, **params):
+    """Prefetched snapshot when `params` is a default query, otherwise a regular (cached) fetch."""
+    value = prefetcher.lookup(source, **params)
+    return value if value is not None else fetch(**params)
+
+
+@metrics.add_collector
+def cache_metrics():
+    responses = response_cache.stats()["sources"]
+    answers = answer_cache.stats()
+    snapshots = prefetcher.stats()
+    pages = page_cache.stats()["groups"]
+    users = user_cache.stats()
+    return (
+        metrics.cache_families("aihub_response_cache", "Upstream response cache",
+                               [({"source": source}, (c["hits"], c["misses"])) for source, c in responses.items()])
+        + metrics.cache_families("aihub_chat_answer_cache", "Chat answer cache",
+                                 [({}, (answers["exact_hits"] + answers["similar_hits"], answers["misses"]))])
+        + metrics.cache_families("aihub_prefetch", "Prefetched snapshot",
+                                 [({}, (snapshots["hits"], snapshots["misses"]))])
+        + metrics.cache_families("aihub_page_cache", "Rendered page cache",
+                                 [({"page": group}, (c["hits"], c["misses"])) for group, c in pages.items()])
+        + metrics.cache_families("aihub_user_cache", "Session user cache",
+                                 [({}, (users["hits"], users["misses"]))])
+    )
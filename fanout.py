@@ -0,0 +1,85 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
+from config import Config
+
+# Shared pool: threads outliving a timed-out call finish in the background
+# instead of blocking the request that gave up on them.
+_executor = ThreadPoolExecutor(max_workers=Config.FANOUT_MAX_WORKERS, thread_name_prefix='fanout')
+
+
+class SourceResult:
+    """Outcome of one upstream call in a fan-out."""
+
+    def __init__(self, name, value=None, elapsed=0.0, error=None):
+        self.name = name
+        self.value = value
+        self.elapsed = elapsed      # seconds
+        self.error = error          # None, 'timed out', or the exception text
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def as_dict(self):
+        return {"source": self.name, "elapsed_ms": round(self.elapsed * 1000, 1), "error": self.error}
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - start
+
+
+def fan_out(calls, deadline):
+    """
+    Run every call concurrently and collect what finishes in time.
+
+    `calls` maps a source name to (fn, timeout); `fn` takes no arguments.
+    Each source gets its own timeout, and no source is waited on past the
+    overall `deadline` (seconds from now). Slow or failing sources come back
+    as SourceResults with `error` set, so callers can render partial results.
+    Results keep the order of `calls`.
+    """
+    start = time.perf_counter()
+    futures = [(name, timeout, _executor.submit(_timed, fn)) for name, (fn, timeout) in calls.items()]
+    results = []
+    for name, timeout, future in futures:
+        remaining = min(timeout, deadline) - (time.perf_counter() - start)
+        try:
+            value, elapsed = future.result(timeout=max(remaining, 0))
+            results.append(SourceResult(name, value, elapsed))
+        except FuturesTimeout:
+            future.cancel()
+            results.append(SourceResult(name, elapsed=time.perf_counter() - start, error='timed out'))
+        except Exception as e:
+            print(f"Error fetching {name}:", e)
+            results.append(SourceResult(name, elapsed=time.perf_counter() - start, error=str(e)))
+    return results
+
+
+async def _timed_async(fn):
+    start = time.perf_counter()
+    value = await fn()
+    return value, time.perf_counter() - start
+
+
+async def fan_out_async(calls, deadline):
+    """
+    fan_out() for coroutine functions: same timeouts, deadline and results,
+    but the calls wait on the event loop instead of on pool threads.
+    """
+    start = time.perf_counter()
+
+    async def run(name, fn, timeout):
+        try:
+            value, elapsed = await asyncio.wait_for(_timed_async(fn), timeout=max(min(timeout, deadline), 0))
+            return SourceResult(name, value, elapsed)
+        except asyncio.TimeoutError:
+            return SourceResult(name, elapsed=time.perf_counter() - start, error='timed out')
+        except Exception as e:
+            print(f"Error fetching {name}:", e)
+            return SourceResult(name, elapsed=time.perf_counter() - start, error=str(e))
+
+    return list(await asyncio.gather(*(run(name, fn, timeout) for name, (fn, timeout) in calls.items())))
@@ -0,0 +1,190 @@
+"""
+Pluggable HTML extraction for the course scrapers.
+
+A site is described declaratively (see SITE_SELECTORS in course_ingest.py):
+
+    {"card": "div.cds-ProductCard-content",
+     "fields": {"title": {"css": "h3.cds-CommonCard-title"},
+                "href": {"css": "a", "attr": "href"}}}
+
+extract(html, spec) returns one dict per card with each field's text or
+attribute value (None when missing). A field without "css" reads the card
+itself. Selectors are deliberately simple: `tag`, `.class`, `#id` and
+combinations like `a.one.two`, plus descendant steps separated by spaces.
+
+Backends:
+  lxml        - lxml.html tree + XPath (default)
+  selectolax  - Lexbor-based parser; optional dependency (pip install selectolax >= 0.3)
+  soup        - BeautifulSoup restricted by a SoupStrainer to the card elements
+  html.parser - full BeautifulSoup tree with the stdlib parser (the old behavior)
+"""
+import re
+import threading
+
+_SIMPLE_RE = re.compile(r"^(?P<tag>[a-zA-Z][\w-]*|\*)?(?P<rest>(?:[.#][\w-]+)*)$")
+
+
+def _parse_step(step):
+    match = _SIMPLE_RE.match(step)
+    if not match:
+        raise ValueError(f"Unsupported selector step: {step!r}")
+    tag = match.group("tag") or "*"
+    classes = re.findall(r"\.([\w-]+)", match.group("rest"))
+    ids = re.findall(r"#([\w-]+)", match.group("rest"))
+    return tag, classes, ids[0] if ids else None
+
+
+def css_to_xpath(selector, relative=False):
+    parts = []
+    for step in selector.split():
+        tag, classes, element_id = _parse_step(step)
+        predicates = "".join(
+            f"[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]" for cls in classes
+        )
+        if element_id:
+            predicates += f"[@id='{element_id}']"
+        parts.append(tag + predicates)
+    return (".//" if relative else "//") + "//".join(parts)
+
+
+class LxmlBackend:
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.html
+        self._fromstring = lxml.html.fromstring
+        self._xpaths = {}
+
+    def _xpath(self, selector, relative):
+        key = (selector, relative)
+        if key not in self._xpaths:
+            from lxml.etree import XPath
+            self._xpaths[key] = XPath(css_to_xpath(selector, relative))
+        return self._xpaths[key]
+
+    def extract(self, html, spec):
+        tree = self._fromstring(html)
+        results = []
+        for card in self._xpath(spec["card"], False)(tree):
+            item = {}
+            for field, rule in spec["fields"].items():
+                node = card
+                if rule.get("css"):
+                    found = self._xpath(rule["css"], True)(card)
+                    node = found[0] if found else None
+                if node is None:
+                    item[field] = None
+                elif rule.get("attr"):
+                    item[field] = node.get(rule["attr"])
+                else:
+                    item[field] = node.text_content()
+            results.append(item)
+        return results
+
+
+class SelectolaxBackend:
+    name = "selectolax"
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+
+    def extract(self, html, spec):
+        tree = self._parser(html)
+        results = []
+        for card in tree.css(spec["card"]):
+            item = {}
+            for field, rule in spec["fields"].items():
+                node = card.css_first(rule["css"]) if rule.get("css") else card
+                if node is None:
+                    item[field] = None
+                elif rule.get("attr"):
+                    item[field] = node.attributes.get(rule["attr"])
+                else:
+                    item[field] = node.text(deep=True)
+            results.append(item)
+        return results
+
+
+class SoupBackend:
+    """
+    BeautifulSoup that only builds the card subtrees: a SoupStrainer keeps
+    elements with the card's tag and first class (or id) and drops the rest
+    of the page while parsing; the full selector is applied afterwards.
+    """
+    name = "soup"
+
+    def __init__(self, parser=None, strain=True):
+        if parser is None:
+            try:
+                import lxml  # noqa: F401
+                parser = "lxml"
+            except ImportError:
+                parser = "html.parser"
+        self.parser = parser
+        self.strain = strain
+
+    @staticmethod
+    def _strainer(selector):
+        from bs4 import SoupStrainer
+        tag, classes, element_id = _parse_step(selector)
+        attrs = {}
+        if classes:
+            # Match one class token; a plain string would have to equal the whole class attribute
+            first = classes[0]
+            attrs["class"] = lambda value: value is not None and first in (
+                value.split() if isinstance(value, str) else value)
+        if element_id:
+            attrs["id"] = element_id
+        return SoupStrainer(None if tag == "*" else tag, attrs)
+
+    def extract(self, html, spec):
+        from bs4 import BeautifulSoup
+        if self.strain and len(spec["card"].split()) == 1:
+            soup = BeautifulSoup(html, self.parser, parse_only=self._strainer(spec["card"]))
+        else:
+            soup = BeautifulSoup(html, self.parser)
+        results = []
+        for card in soup.select(spec["card"]):
+            item = {}
+            for field, rule in spec["fields"].items():
+                node = card.select_one(rule["css"]) if rule.get("css") else card
+                if node is None:
+                    item[field] = None
+                elif rule.get("attr"):
+                    item[field] = node.get(rule["attr"])
+                else:
+                    item[field] = node.get_text()
+            results.append(item)
+        return results
+
+
+BACKENDS = {
+    "lxml": LxmlBackend,
+    "selectolax": SelectolaxBackend,
+    "soup": SoupBackend,
+    "html.parser": lambda: SoupBackend(parser="html.parser", strain=False),
+}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_backend(name="lxml"):
+    """Backend instance by name; an uninstalled optional backend falls back to lxml."""
+    with _instances_lock:
+        backend = _instances.get(name)
+        if backend is None:
+            try:
+                backend = BACKENDS[name]()
+            except ImportError:
+                print(f"HTML backend {name!r} is not installed; using lxml")
+                backend = _instances.get("lxml") or LxmlBackend()
+            _instances[name] = backend
+        return backend
+
+
+def extract(html, spec, backend=None):
+    if backend is None or isinstance(backend, str):
+        backend = get_backend(backend or "lxml")
+    return backend.extract(html, spec)
@@ -0,0 +1,388 @@
+"""
+Request instrumentation and a Prometheus-style /metrics exposition.
+
+Per route: a latency histogram, request counts by status, and the number
+and total time of SQL statements each request ran. Per upstream (GitHub,
+arXiv, Papers With Code, OpenAI): call latency and outcome. Per template:
+render time. Caches report their hit/miss counters through collectors
+registered with add_collector(), read at scrape time.
+
+Everything lives in process memory: under gunicorn each worker keeps its
+own series and /metrics shows the worker that answered the scrape, so
+scrape a single-worker target (or each worker) for exact totals.
+
+The optional SlowRequestProfiler samples the stacks of threads serving a
+request every few milliseconds and, when a request turns out slower than
+its threshold, appends the samples to a file in the collapsed
+"frame;frame;frame count" format that flamegraph.pl and speedscope read.
+"""
+import contextvars
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+from config import Config
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+def _label_text(names, values):
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            lines.append(f"{self.name}{_label_text(self.labels, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram, one series per label combination."""
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}           # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, list(values)) for labels, values in self._series.items())
+        names = self.labels + ("le",)
+        for labels, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_label_text(names, labels + (_number(bound),))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_label_text(names, labels + ('+Inf',))} {values[-1]}")
+            lines.append(f"{self.name}_sum{_label_text(self.labels, labels)} {_number(values[-2])}")
+            lines.append(f"{self.name}_count{_label_text(self.labels, labels)} {values[-1]}")
+        return lines
+
+
+class RequestScope:
+    """What one request has done so far; carried in a context variable."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.render_starts = []
+        self.thread_id = None
+        self.samples = None
+
+
+_scope = contextvars.ContextVar("metrics_request_scope", default=None)
+
+REQUEST_SECONDS = Histogram("aihub_request_duration_seconds", "Request latency by route.", ("route", "method"))
+REQUESTS = Counter("aihub_requests_total", "Requests by route and status.", ("route", "method", "status"))
+REQUEST_SQL_QUERIES = Histogram("aihub_request_sql_queries", "SQL statements per request.", ("route",),
+                                buckets=COUNT_BUCKETS)
+REQUEST_SQL_SECONDS = Histogram("aihub_request_sql_seconds", "Time spent in SQL per request.", ("route",))
+SQL_QUERIES = Counter("aihub_sql_queries_total", "SQL statements run through the app's engine.")
+UPSTREAM_SECONDS = Histogram("aihub_upstream_duration_seconds", "Outbound call latency by upstream.",
+                             ("upstream", "outcome"))
+TEMPLATE_SECONDS = Histogram("aihub_template_render_seconds", "Template render time.", ("template",))
+
+_collectors = []
+
+
+def add_collector(fn):
+    """
+    Register `fn() -> [(name, type, help, [(labels_dict, value), ...]), ...]`,
+    called on every scrape (used for cache counters kept elsewhere).
+    """
+    _collectors.append(fn)
+    return fn
+
+
+def begin_request():
+    """Open a request scope unless one is already open (asgi.py opens it before the Flask hooks run)."""
+    if _scope.get() is not None:
+        return None
+    scope = RequestScope()
+    return scope, _scope.set(scope)
+
+
+def end_request(opened, route, method, status):
+    if opened is None:
+        return None
+    scope, token = opened
+    elapsed = time.perf_counter() - scope.start
+    REQUEST_SECONDS.observe(elapsed, route, method)
+    REQUESTS.inc(route, method, str(status))
+    REQUEST_SQL_QUERIES.observe(scope.sql_count, route)
+    REQUEST_SQL_SECONDS.observe(scope.sql_seconds, route)
+    _scope.reset(token)
+    profiler.finish(scope, f"{method} {route}", elapsed)
+    return elapsed
+
+
+def current_scope():
+    return _scope.get()
+
+
+def record_sql(seconds):
+    SQL_QUERIES.inc()
+    scope = _scope.get()
+    if scope is not None:
+        scope.sql_count += 1
+        scope.sql_seconds += seconds
+
+
+_upstream_names = None
+
+
+def upstream_name(url):
+    """'github' / 'arxiv' / 'pwc' for the configured API hosts, else the host itself."""
+    global _upstream_names
+    if _upstream_names is None:
+        _upstream_names = {urlparse(Config.GITHUB_API_URL).netloc: "github",
+                           urlparse(Config.ARXIV_API_URL).netloc: "arxiv",
+                           urlparse(Config.PWC_API_URL).netloc: "pwc"}
+    host = urlparse(url).netloc
+    return _upstream_names.get(host, host)
+
+
+def status_outcome(status):
+    return "ok" if status < 400 else f"{status // 100}xx"
+
+
+def record_upstream(upstream, seconds, outcome):
+    UPSTREAM_SECONDS.observe(seconds, upstream, outcome)
+
+
+class timed_upstream:
+    """`with timed_upstream('openai'):` records the block's latency and whether it raised."""
+
+    def __init__(self, upstream):
+        self.upstream = upstream
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record_upstream(self.upstream, time.perf_counter() - self.start, "error" if exc_type else "ok")
+        return False
+
+
+def exposition():
+    """Every metric in the Prometheus text format (version 0.0.4)."""
+    lines = []
+    for metric in (REQUEST_SECONDS, REQUESTS, REQUEST_SQL_QUERIES, REQUEST_SQL_SECONDS, SQL_QUERIES,
+                   UPSTREAM_SECONDS, TEMPLATE_SECONDS):
+        lines.extend(metric.expose())
+    for collector in _collectors:
+        try:
+            families = collector()
+        except Exception as e:
+            print("Error collecting metrics:", e)
+            continue
+        for name, kind, help, samples in families:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_label_text(tuple(labels), tuple(labels.values()))} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def cache_families(prefix, help, per_label):
+    """Collector families for a cache: hits, misses and hit ratio from [(labels, (hits, misses)), ...]."""
+    hits, misses, ratios = [], [], []
+    for labels, (hit, miss) in per_label:
+        hits.append((labels, hit))
+        misses.append((labels, miss))
+        ratios.append((labels, round(hit / (hit + miss), 4) if hit + miss else 0.0))
+    return [(f"{prefix}_hits_total", "counter", f"{help} hits.", hits),
+            (f"{prefix}_misses_total", "counter", f"{help} misses.", misses),
+            (f"{prefix}_hit_ratio", "gauge", f"{help} hit ratio since process start.", ratios)]
+
+
+class SlowRequestProfiler:
+    """
+    Opt-in sampling profiler. While enabled, a daemon thread snapshots the
+    stack of every thread currently serving a request each `interval`
+    seconds; requests slower than `threshold` seconds have their samples
+    appended to `path` as collapsed stacks, rooted at "METHOD /route".
+    """
+
+    def __init__(self, path, threshold=1.0, interval=0.005, max_samples=20000):
+        self.path = path
+        self.threshold = threshold
+        self.interval = interval
+        self.max_samples = max_samples
+        self.enabled = False
+        self.dumped = 0
+        self._active = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def enable(self, threshold=None):
+        if threshold is not None:
+            self.threshold = threshold
+        self.enabled = True
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+            self._thread.start()
+
+    def disable(self):
+        self.enabled = False
+
+    def start(self, scope):
+        """Sample the calling thread for `scope` (Flask hooks run on the thread serving the request)."""
+        if not self.enabled:
+            return
+        scope.thread_id = threading.get_ident()
+        scope.samples = {}
+        with self._lock:
+            self._active[scope.thread_id] = scope
+
+    def finish(self, scope, root, elapsed):
+        if scope.samples is None:
+            return
+        with self._lock:
+            self._active.pop(scope.thread_id, None)
+        if elapsed < self.threshold or not scope.samples:
+            return
+        lines = [f"{root};{stack} {count}\n" for stack, count in scope.samples.items()]
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.writelines(lines)
+            self.dumped += 1
+
+    @staticmethod
+    def _collapse(frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def _run(self):
+        while self.enabled:
+            time.sleep(self.interval)
+            with self._lock:
+                active = list(self._active.items())
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for thread_id, scope in active:
+                frame = frames.get(thread_id)
+                if frame is None or len(scope.samples) >= self.max_samples:
+                    continue
+                stack = self._collapse(frame)
+                scope.samples[stack] = scope.samples.get(stack, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            in_flight = len(self._active)
+        return {"enabled": self.enabled, "threshold_seconds": self.threshold,
+                "interval_seconds": self.interval, "path": self.path,
+                "slow_requests_dumped": self.dumped, "requests_sampled_now": in_flight}
+
+
+profiler = SlowRequestProfiler(Config.PROFILE_OUTPUT_PATH, threshold=Config.PROFILE_SLOW_MS / 1000,
+                               interval=Config.PROFILE_INTERVAL_MS / 1000)
+if Config.PROFILE_ENABLED:
+    profiler.enable()
+
+
+def install(app, engine):
+    """Hook request, SQL and template timing into a Flask app and its SQLAlchemy engine."""
+    from flask import before_render_template, request, template_rendered
+    from sqlalchemy import event
+
+    @app.before_request
+    def _metrics_begin():
+        request.environ["aihub.metrics"] = begin_request()
+        scope = _scope.get()
+        if scope is not None and scope.thread_id is None:
+            profiler.start(scope)
+
+    @app.teardown_request
+    def _metrics_end(exc):
+        opened = request.environ.pop("aihub.metrics", None)
+        status = request.environ.pop("aihub.status", 500 if exc else 200)
+        end_request(opened, request_route(), request.method, status)
+
+    @app.after_request
+    def _metrics_status(response):
+        request.environ["aihub.status"] = response.status_code
+        return response
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _sql_start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("aihub_sql_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _sql_end(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("aihub_sql_start")
+        if starts:
+            record_sql(time.perf_counter() - starts.pop())
+
+    def _render_start(sender, template, context, **extra):
+        scope = _scope.get()
+        if scope is not None:
+            scope.render_starts.append(time.perf_counter())
+
+    def _render_end(sender, template, context, **extra):
+        scope = _scope.get()
+        if scope is not None and scope.render_starts:
+            TEMPLATE_SECONDS.observe(time.perf_counter() - scope.render_starts.pop(), template.name or "?")
+
+    before_render_template.connect(_render_start, app, weak=False)
+    template_rendered.connect(_render_end, app, weak=False)
+
+
+def request_route():
+    """The matched URL rule (bounded label set), not the raw path."""
+    from flask import request
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
@@ -0,0 +1,255 @@
+"""
+Ordered schema migrations for databases created before a model change.
+
+db.create_all() only creates missing tables; it never adds columns or
+indexes to tables that already exist (like the shipped app.db). Each
+migration here is a function of (connection, inspector) that must be safe
+on a fresh database too, since create_all() will already have built the
+current schema there. Applied versions are recorded in `schema_version`.
+
+Run with `flask --app app upgrade-db` (or `bootstrap`, which also creates the default admin).
+"""
+import datetime
+
+import sqlalchemy as sa
+
+from database import enable_wal
+
+MIGRATIONS = []
+
+
+def migration(fn):
+    MIGRATIONS.append(fn)
+    return fn
+
+
+def _columns(inspector, table):
+    return {column["name"] for column in inspector.get_columns(table)}
+
+
+def _indexes(inspector, table):
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+
+def _create_index(conn, inspector, table, name, columns, unique=False):
+    if name in _indexes(inspector, table):
+        return
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    conn.execute(sa.text(f"CREATE {kind} {name} ON {table} ({', '.join(columns)})"))
+
+
+@migration
+def saved_items_listing_index(conn, inspector):
+    """Composite index behind the saved_content tab listing."""
+    _create_index(conn, inspector, "saved_items", "ix_saved_items_user_type_date",
+                  ["user_id", "item_type", "date_saved"])
+
+
+def _paper_keys(conn, where="1 = 1"):
+    """
+    (row, key) for each saved paper matching `where`, keyed as save_paper
+    keys it: by the paper store's canonical key for its title and url.
+    """
+    from extensions import paper_store   # the app's store; imported here so this module loads without it
+    rows = conn.execute(sa.text(
+        "SELECT id, user_id, title, url, item_key, date_saved FROM saved_items"
+        " WHERE item_type = 'paper' AND " + where + " ORDER BY id"
+    )).all()
+    return [(row, paper_store.canonical_key(row.title, row.url)) for row in rows]
+
+
+@migration
+def saved_items_item_key(conn, inspector):
+    """
+    Add saved_items.item_key (url for repos, the paper store's canonical key
+    for papers, title for courses), drop
+    duplicate saves that the old check-then-insert let through, and enforce
+    uniqueness so saves can be atomic upserts.
+
+    The oldest row of each duplicate group is kept, but first takes the
+    group's latest date_saved and, if any copy was completed, 'completed'.
+    Rows without a url/title get a per-row key ('id:<id>') so they are
+    never merged with each other.
+    """
+    if "item_key" not in _columns(inspector, "saved_items"):
+        conn.execute(sa.text("ALTER TABLE saved_items ADD COLUMN item_key VARCHAR(300)"))
+    paper_keys = [{"id": row.id, "key": key} for row, key in _paper_keys(conn, "item_key IS NULL") if key]
+    if paper_keys:
+        conn.execute(sa.text("UPDATE saved_items SET item_key = :key WHERE id = :id"), paper_keys)
+    conn.execute(sa.text(
+        "UPDATE saved_items SET item_key = COALESCE(CASE WHEN item_type = 'repo' THEN url ELSE title END,"
+        " 'id:' || CAST(id AS VARCHAR(20))) WHERE item_key IS NULL"
+    ))
+    same_item = ("d.user_id = saved_items.user_id AND d.item_type = saved_items.item_type"
+                 " AND d.item_key = saved_items.item_key")
+    conn.execute(sa.text(
+        "UPDATE saved_items SET"
+        " course_status = CASE WHEN EXISTS (SELECT 1 FROM saved_items d WHERE " + same_item +
+        "  AND d.course_status = 'completed') THEN 'completed' ELSE course_status END,"
+        " date_saved = (SELECT MAX(d.date_saved) FROM saved_items d WHERE " + same_item + ")"
+        " WHERE id IN (SELECT MIN(id) FROM saved_items GROUP BY user_id, item_type, item_key HAVING COUNT(*) > 1)"
+    ))
+    conn.execute(sa.text(
+        "DELETE FROM saved_items WHERE id NOT IN ("
+        " SELECT MIN(id) FROM saved_items GROUP BY user_id, item_type, item_key)"
+    ))
+    _create_index(conn, inspector, "saved_items", "uq_saved_items_user_type_key",
+                  ["user_id", "item_type", "item_key"], unique=True)
+
+
+@migration
+def peer_articles_indexes(conn, inspector):
+    """Status + date listing (peer/admin pages) and per-author listing (my_articles)."""
+    if "peer_articles" not in inspector.get_table_names():
+        return
+    _create_index(conn, inspector, "peer_articles", "ix_peer_articles_status_date", ["status", "date_submitted"])
+    _create_index(conn, inspector, "peer_articles", "ix_peer_articles_user_date", ["user_id", "date_submitted"])
+
+
+@migration
+def peer_articles_fts(conn, inspector):
+    """
+    FTS5 index over peer article title, description and keywords (SQLite
+    only). Triggers keep it in sync as articles are submitted, edited or
+    deleted; searches join back to peer_articles for the status filter, so
+    approving or rejecting needs no reindex.
+    """
+    if conn.dialect.name != "sqlite" or "peer_articles" not in inspector.get_table_names():
+        return
+    conn.execute(sa.text(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS peer_articles_fts USING fts5("
+        " title, description, keywords, content='peer_articles', content_rowid='id', tokenize='porter unicode61')"
+    ))
+    conn.execute(sa.text(
+        "CREATE TRIGGER IF NOT EXISTS peer_articles_ai AFTER INSERT ON peer_articles BEGIN"
+        " INSERT INTO peer_articles_fts (rowid, title, description, keywords)"
+        " VALUES (new.id, new.title, new.description, new.keywords); END"
+    ))
+    conn.execute(sa.text(
+        "CREATE TRIGGER IF NOT EXISTS peer_articles_ad AFTER DELETE ON peer_articles BEGIN"
+        " INSERT INTO peer_articles_fts (peer_articles_fts, rowid, title, description, keywords)"
+        " VALUES ('delete', old.id, old.title, old.description, old.keywords); END"
+    ))
+    conn.execute(sa.text(
+        "CREATE TRIGGER IF NOT EXISTS peer_articles_au AFTER UPDATE OF title, description, keywords"
+        " ON peer_articles BEGIN"
+        " INSERT INTO peer_articles_fts (peer_articles_fts, rowid, title, description, keywords)"
+        " VALUES ('delete', old.id, old.title, old.description, old.keywords);"
+        " INSERT INTO peer_articles_fts (rowid, title, description, keywords)"
+        " VALUES (new.id, new.title, new.description, new.keywords); END"
+    ))
+    conn.execute(sa.text("INSERT INTO peer_articles_fts (peer_articles_fts) VALUES ('rebuild')"))
+
+
+@migration
+def page_cache_generations(conn, inspector):
+    """Per-group generation numbers that let a page cache purge reach every worker (page_cache.py)."""
+    conn.execute(sa.text(
+        "CREATE TABLE IF NOT EXISTS page_cache_generations ("
+        " page_group VARCHAR(50) PRIMARY KEY, generation INTEGER NOT NULL DEFAULT 0)"
+    ))
+
+
+@migration
+def sqlite_wal_journal(conn, inspector):
+    """
+    Put an SQLite database in WAL mode. The mode is stored in the file and
+    adds app.db-wal / app.db-shm beside it; undo with PRAGMA journal_mode=DELETE.
+    """
+    enable_wal(conn)
+
+
+@migration
+def users_password_hash_length(conn, inspector):
+    """
+    Widen users.password_hash to 255 characters for scrypt hashes with
+    longer parameters. SQLite does not enforce VARCHAR lengths, so only
+    other backends need the ALTER.
+    """
+    if conn.dialect.name == "sqlite":
+        return
+    if conn.dialect.name in ("mysql", "mariadb"):
+        conn.execute(sa.text("ALTER TABLE users MODIFY password_hash VARCHAR(255) NOT NULL"))
+    else:
+        conn.execute(sa.text("ALTER TABLE users ALTER COLUMN password_hash TYPE VARCHAR(255)"))
+
+
+def _backfill_not_null(conn, table, column, value):
+    """
+    Fill NULLs in `column` with `value` and make it NOT NULL. SQLite cannot
+    alter a column in place, so there the backfill and the model default
+    (plus NOT NULL on databases created from the models) have to do.
+    """
+    conn.execute(sa.text(f"UPDATE {table} SET {column} = :value WHERE {column} IS NULL"), {"value": value})
+    if conn.dialect.name == "sqlite":
+        return
+    if conn.dialect.name in ("mysql", "mariadb"):
+        conn.execute(sa.text(f"ALTER TABLE {table} MODIFY {column} DATETIME NOT NULL"))
+    else:
+        conn.execute(sa.text(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL"))
+
+
+# Stands in for dates that were never recorded; sorts before every real one
+UNKNOWN_DATE = "1970-01-01 00:00:00"
+
+
+@migration
+def saved_items_date_saved_not_null(conn, inspector):
+    """
+    Give saved items without a date_saved the UNKNOWN_DATE, so the keyset
+    cursor of the saved_content listing always has a date. They stay last
+    in the newest-first listing, where SQLite already sorted NULLs.
+    """
+    _backfill_not_null(conn, "saved_items", "date_saved", UNKNOWN_DATE)
+
+
+@migration
+def peer_articles_date_submitted_not_null(conn, inspector):
+    """Same for peer articles without a date_submitted, behind the article listings' cursor."""
+    if "peer_articles" not in inspector.get_table_names():
+        return
+    _backfill_not_null(conn, "peer_articles", "date_submitted", UNKNOWN_DATE)
+
+
+@migration
+def saved_items_paper_canonical_keys(conn, inspector):
+    """
+    Re-key saved papers that an earlier saved_items_item_key keyed by bare
+    title to the paper store's canonical key, so distinct papers sharing a
+    title stop colliding and save_paper finds them under the key it uses.
+    A user's copies of one paper are merged into the oldest, which takes
+    their latest date_saved.
+    """
+    groups = {}
+    for row, key in _paper_keys(conn):
+        if key:
+            groups.setdefault((row.user_id, key), []).append(row)
+    changed = [(key, rows) for (_, key), rows in groups.items() if len(rows) > 1 or rows[0].item_key != key]
+    if not changed:
+        return
+    conn.execute(sa.text("DELETE FROM saved_items WHERE id = :id"),
+                 [{"id": row.id} for _, rows in changed for row in rows[1:]])
+    # Park the survivors on their per-row key first, so no new key meets an old one mid-update
+    conn.execute(sa.text("UPDATE saved_items SET item_key = :key WHERE id = :id"),
+                 [{"id": rows[0].id, "key": f"id:{rows[0].id}"} for _, rows in changed])
+    conn.execute(sa.text("UPDATE saved_items SET item_key = :key, date_saved = :date WHERE id = :id"),
+                 [{"id": rows[0].id, "key": key, "date": max(row.date_saved for row in rows)} for key, rows in changed])
+
+
+def upgrade(engine):
+    """Apply pending migrations in order; returns the names that ran."""
+    applied = []
+    with engine.begin() as conn:
+        conn.execute(sa.text(
+            "CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY, name VARCHAR(100), applied_at VARCHAR(32))"
+        ))
+        current = conn.execute(sa.text("SELECT COALESCE(MAX(version), 0) FROM schema_version")).scalar()
+    for version, fn in enumerate(MIGRATIONS, start=1):
+        if version <= current:
+            continue
+        with engine.begin() as conn:
+            fn(conn, sa.inspect(conn))
+            conn.execute(sa.text("INSERT INTO schema_version (version, name, applied_at) VALUES (:v, :n, :t)"),
+                         {"v": version, "n": fn.__name__, "t": datetime.datetime.utcnow().isoformat()})
+        applied.append(fn.__name__)
+    return applied
@@ -0,0 +1,147 @@
+import datetime
+
+from flask_login import UserMixin
+from sqlalchemy import event
+
+from extensions import db, login_manager, user_cache, hash_pool
+
+# -------------------------
+# MODELS
+# -------------------------
+class User(UserMixin, db.Model):
+    __tablename__ = 'users'
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(64), unique=True, nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)
+    role = db.Column(db.String(16), default='user')  # can be 'admin' or 'user'
+
+    # Both hash on the bounded pool in passwords.py and may raise HashPoolBusy
+    def set_password(self, password):
+        self.password_hash = hash_pool.hash(password)
+
+    def check_password(self, password):
+        return hash_pool.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """True when the stored hash was made with other parameters than PASSWORD_HASH_METHOD."""
+        return hash_pool.needs_rehash(self.password_hash)
+
+# Any update (e.g. a role change) or delete drops the cached session copy
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def invalidate_cached_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
+
+class SavedItem(db.Model):
+    __tablename__ = 'saved_items'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    item_type = db.Column(db.String(50))  # 'repo', 'paper', or 'course'
+    title = db.Column(db.String(300))
+    url = db.Column(db.String(300))
+    date_saved = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+    published = db.Column(db.String(100))  # used for papers or course description
+    authors = db.Column(db.String(300))    # for papers
+    journal_ref = db.Column(db.String(300))# for papers
+    # New field for course progress; for courses only.
+    course_status = db.Column(db.String(20), nullable=True)  # e.g., 'ongoing', 'completed'
+    # Identity of the item within its type: url for repos, title for courses, the paper
+    # store's canonical key for papers (migrations re-key papers saved before the store existed)
+    item_key = db.Column(db.String(300))
+    user = db.relationship('User', backref='saved_items')
+
+    __table_args__ = (
+        # Serves the per-tab listing in saved_content (filter + keyset order)
+        db.Index('ix_saved_items_user_type_date', 'user_id', 'item_type', 'date_saved'),
+        # One save per item; lets save routes upsert instead of check-then-insert
+        db.Index('uq_saved_items_user_type_key', 'user_id', 'item_type', 'item_key', unique=True),
+    )
+
+    @staticmethod
+    def key_for(item_type, title, url):
+        return url if item_type == 'repo' else title
+
+class PeerArticle(db.Model):
+    __tablename__ = 'peer_articles'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    name = db.Column(db.String(100))
+    contact = db.Column(db.String(100))
+    email = db.Column(db.String(100))
+    title = db.Column(db.String(300))
+    description = db.Column(db.Text)
+    keywords = db.Column(db.String(300))
+    url = db.Column(db.String(300))
+    date_submitted = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+    status = db.Column(db.String(20), default='waiting')  # waiting, approved, rejected
+    admin_note = db.Column(db.Text, nullable=True)
+    # Start of the description, filled in by listing queries that defer the full Text column
+    excerpt = db.query_expression()
+
+    __table_args__ = (
+        db.Index('ix_peer_articles_status_date', 'status', 'date_submitted'),
+        db.Index('ix_peer_articles_user_date', 'user_id', 'date_submitted'),
+    )
+
+User.articles = db.relationship('PeerArticle', backref='author', lazy=True)
+
+SAVED_ITEM_CONFLICT = ['user_id', 'item_type', 'item_key']
+
+def _dialect_insert():
+    # INSERT with ON CONFLICT support for the configured database
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+def upsert_saved_item(update=None, **values):
+    """
+    Insert a SavedItem in one statement, relying on uq_saved_items_user_type_key.
+    On conflict the existing row is left alone, or gets the `update` columns.
+    Without `update`, returns True if a new row was inserted.
+    """
+    insert = _dialect_insert()
+    if not values.get('item_key'):
+        values['item_key'] = SavedItem.key_for(values['item_type'], values.get('title'), values.get('url'))
+    values.setdefault('date_saved', datetime.datetime.utcnow())
+    stmt = insert(SavedItem.__table__).values(**values)
+    if update:
+        db.session.execute(stmt.on_conflict_do_update(index_elements=SAVED_ITEM_CONFLICT, set_=update))
+        db.session.commit()
+        return None
+    result = db.session.execute(stmt.on_conflict_do_nothing(index_elements=SAVED_ITEM_CONFLICT))
+    db.session.commit()
+    return result.rowcount == 1
+
+def insert_saved_items(rows):
+    """
+    Multi-row counterpart of upsert_saved_item for the bulk API: inserts `rows`
+    (dicts with the same keys, item_key and date_saved filled in) in the current
+    transaction, skipping rows already saved. Does not commit; returns the
+    number of rows inserted.
+    """
+    if not rows:
+        return 0
+    stmt = (_dialect_insert()(SavedItem.__table__)
+            .on_conflict_do_nothing(index_elements=SAVED_ITEM_CONFLICT)
+            .returning(SavedItem.__table__.c.id))
+    return len(db.session.execute(stmt, rows).all())
+
+@login_manager.user_loader
+def load_user(user_id):
+    # Served from the per-process cache; the users table is only read on a miss
+    user = user_cache.get(int(user_id))
+    if user is None:
+        row = User.query.get(int(user_id))
+        user = user_cache.put(row) if row is not None else None
+    return user
+
+def create_default_admin():
+    """Create the default admin account if it does not exist yet."""
+    admin_user = User.query.filter_by(username='admin@123').first()
+    if not admin_user:
+        admin_user = User(username='admin@123', role='admin')
+        admin_user.set_password('1234')
+        db.session.add(admin_user)
+        db.session.commit()
@@ -0,0 +1,189 @@
+import collections
+import datetime
+import functools
+import pickle
+import threading
+import time
+from urllib.parse import urlencode
+
+import sqlalchemy as sa
+from flask import current_app, g, make_response, request, session
+from flask_login import current_user
+from werkzeug.http import generate_etag
+
+from response_cache import MemoryBackend, SQLiteBackend
+
+
+class DatabaseGenerations:
+    """
+    Per-group generation numbers in the app database (page_cache_generations,
+    created by the migration of that name), shared by every worker and host.
+    The number is part of each cache key, so bumping it in one process makes
+    every process stop serving the group's old pages at once, whatever the
+    cache backend.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._warned = False
+
+    def get(self, group):
+        try:
+            with self.db.engine.connect() as conn:
+                return conn.execute(sa.text("SELECT generation FROM page_cache_generations WHERE page_group = :group"),
+                                    {"group": group}).scalar() or 0
+        except sa.exc.SQLAlchemyError as e:
+            self._unavailable(e)
+            return 0
+
+    def bump(self, group):
+        try:
+            with self.db.engine.begin() as conn:
+                conn.execute(sa.text(
+                    "INSERT INTO page_cache_generations (page_group, generation) VALUES (:group, 1) "
+                    "ON CONFLICT (page_group) DO UPDATE SET generation = page_cache_generations.generation + 1"
+                ), {"group": group})
+        except sa.exc.SQLAlchemyError as e:
+            self._unavailable(e)
+
+    def _unavailable(self, error):
+        # Without the table (upgrade-db not run yet) purges stay local to this worker
+        if not self._warned:
+            self._warned = True
+            print("Page cache generations unavailable (run `flask --app app upgrade-db`):", error)
+
+
+class PageCache:
+    """
+    Rendered responses of the public listing pages, keyed per page group,
+    path, query args and audience, on the same backends as ResponseCache.
+
+    Only bodies without per-user content are cached: anonymous visitors, or
+    (per_role=True) logged-in users keyed by role, for pages where the role
+    only changes the navbar. Other logged-in requests, requests with flashed
+    messages pending and responses that flash or set cookies are rendered
+    as usual. Cached responses carry an ETag and Last-Modified, so a
+    revalidating browser gets a 304 without a re-render; invalidate() purges
+    a group when its data changes. With `generations` (a DatabaseGenerations)
+    the purge reaches every worker, not just the one that handled the change.
+    """
+
+    def __init__(self, backend, ttls=None, default_ttl=300, enabled=True, generations=None):
+        self.backend = backend
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.enabled = enabled
+        self.generations = generations
+        self._lock = threading.Lock()
+        self._counters = collections.Counter()
+
+    def _count(self, group, event, n=1):
+        with self._lock:
+            self._counters[(group, event)] += n
+
+    def _key(self, group, per_role, vary):
+        """Cache key for the current request, or None when its body may hold per-user content."""
+        if not self.enabled or request.method not in ('GET', 'HEAD') or '_flashes' in session:
+            return None
+        if not current_user.is_authenticated:
+            audience = 'anonymous'
+        elif per_role:
+            audience = current_user.role or 'user'
+        else:
+            return None
+        query = urlencode(sorted(request.args.items(multi=True)))
+        key = f"{group}:{self._generation(group)}:{audience}:{request.path}?{query}"
+        if vary is not None:
+            key += "#" + str(vary())
+        return key
+
+    def _generation(self, group):
+        # Read once per request, so a page rendered after a concurrent purge is stored under the old number
+        if self.generations is None:
+            return 0
+        seen = g.setdefault('_page_cache_generations', {})
+        if group not in seen:
+            seen[group] = self.generations.get(group)
+        return seen[group]
+
+    def _conditional(self, response, etag, last_modified, state):
+        response.set_etag(etag)
+        response.last_modified = datetime.datetime.fromtimestamp(last_modified, datetime.timezone.utc)
+        response.cache_control.no_cache = True  # always revalidate: logging in changes the page
+        response.vary.add('Cookie')
+        response.headers['X-Page-Cache'] = state
+        return response.make_conditional(request)
+
+    def lookup(self, group, per_role=False, vary=None):
+        """The cached response for the current request (304 if the client's copy matches), or None."""
+        key = self._key(group, per_role, vary)
+        if key is None:
+            self._count(group, "bypasses")
+            return None
+        blob = self.backend.get(key)
+        if blob is None:
+            self._count(group, "misses")
+            return None
+        self._count(group, "hits")
+        body, content_type, etag, last_modified = pickle.loads(blob)
+        return self._conditional(current_app.response_class(body, content_type=content_type),
+                                 etag, last_modified, 'hit')
+
+    def store(self, group, rv, per_role=False, vary=None):
+        """Turn view result `rv` into a response, caching it if the request and response allow."""
+        response = make_response(rv)
+        key = self._key(group, per_role, vary)
+        if (key is None or response.status_code != 200 or response.is_streamed
+                or session.modified or 'Set-Cookie' in response.headers):
+            return response
+        body = response.get_data()
+        etag, last_modified = generate_etag(body), time.time()
+        blob = pickle.dumps((body, response.content_type, etag, last_modified), protocol=pickle.HIGHEST_PROTOCOL)
+        evicted = self.backend.set(key, blob, self.ttls.get(group, self.default_ttl))
+        if evicted:
+            self._count(group, "evictions", evicted)
+        return self._conditional(response, etag, last_modified, 'miss')
+
+    def cached(self, group, per_role=False, vary=None):
+        """
+        Decorator for a view rendering page group `group`. `vary` is an optional
+        callable whose result is added to the key (e.g. the data file's version).
+        """
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                response = self.lookup(group, per_role, vary)
+                if response is not None:
+                    return response
+                return self.store(group, fn(*args, **kwargs), per_role, vary)
+            return wrapper
+        return decorator
+
+    def invalidate(self, group):
+        """Purge every cached page of `group` (all paths, query args and audiences) in every worker."""
+        self._count(group, "invalidations")
+        if self.generations is not None:
+            self.generations.bump(group)
+        return self.backend.delete_prefix(group + ":")  # frees this worker's copies right away
+
+    def stats(self):
+        """Hit/miss/bypass/invalidation counters per page group plus the backend's current size."""
+        with self._lock:
+            counters = dict(self._counters)
+        per_group = {}
+        for (group, event), count in counters.items():
+            per_group.setdefault(group, {"hits": 0, "misses": 0, "bypasses": 0, "evictions": 0,
+                                         "invalidations": 0})[event] = count
+        entries, size_bytes = self.backend.size()
+        return {"groups": per_group, "entries": entries, "bytes": size_bytes}
+
+
+def create_page_cache(config, generations=None):
+    """Build the page cache described by the PAGE_CACHE_* settings (backend per CACHE_BACKEND)."""
+    if config.CACHE_BACKEND == 'sqlite':
+        backend = SQLiteBackend(config.PAGE_CACHE_SQLITE_PATH, config.PAGE_CACHE_MAX_ENTRIES,
+                                config.PAGE_CACHE_MAX_BYTES)
+    else:
+        backend = MemoryBackend(config.PAGE_CACHE_MAX_ENTRIES, config.PAGE_CACHE_MAX_BYTES)
+    return PageCache(backend, ttls=config.PAGE_CACHE_TTLS, enabled=config.PAGE_CACHE_ENABLED,
+                     generations=generations)
@@ -0,0 +1,351 @@
+"""
+Local store of every paper fetched from arXiv and Papers With Code.
+
+Each paper gets a canonical key (arXiv ID, else DOI, else URL, else
+normalized title); every identifier seen for it is kept as an alias, so the
+same paper reached through another source merges into one row. Only an
+arXiv ID, DOI or URL match merges papers that have one: distinct papers
+often share a title, so a bare title only merges papers that have no
+identifier at all and come from the same source. Search result pages are recorded with their position, so a repeat
+search is answered from the store until PAPER_STORE_TTL expires and only new
+queries or deeper pages go upstream. An FTS5 index over title, abstract and
+authors serves searches on the store itself (source=local, and as the
+fallback when an upstream is down). Every match is scored and ranked,
+so the cost grows with the number of matching papers
+(benchmarks/bench_paper_store.py): at 200k papers a rare term takes about
+4 ms, a prefix about 60 ms and two common terms about 140 ms; at 1M
+papers about 20 ms, 290 ms and 700 ms. Past a few hundred thousand
+papers, common-term searches need a dedicated search engine.
+
+The store is its own SQLite file, independent of DATABASE_URL.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+ARXIV_NEW_RE = re.compile(r"(?<![\d.])(\d{4}\.\d{4,5})(?:v\d+)?(?!\d)")
+ARXIV_OLD_RE = re.compile(r"\b([a-z\-]+(?:\.[A-Z]{2})?/\d{7})(?:v\d+)?\b")
+DOI_RE = re.compile(r"\b(10\.\d{4,9}/\S+)", re.IGNORECASE)
+WORD_RE = re.compile(r"\w+")
+
+PAPER_FIELDS = ["title", "authors", "summary", "published", "link", "journal_ref"]
+KEY_PRIORITY = ("arxiv", "doi", "url", "title")
+ARXIV_DOI_PREFIX = "10.48550/arxiv."
+
+
+def normalize_title(title):
+    """Accent-, case- and punctuation-insensitive form of a title."""
+    text = unicodedata.normalize("NFKD", title or "").encode("ascii", "ignore").decode()
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def arxiv_id(value):
+    """arXiv identifier without version from an ID or an arxiv.org URL, or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.lower().startswith("arxiv:"):
+        value = value[len("arxiv:"):]
+    elif "://" in value and "arxiv.org" not in value:
+        return None
+    match = ARXIV_NEW_RE.search(value) or ARXIV_OLD_RE.search(value)
+    return match.group(1) if match else None
+
+
+def normalize_doi(value):
+    match = DOI_RE.search(value or "")
+    return match.group(1).rstrip(".").lower() if match else None
+
+
+def normalize_url(value):
+    """Scheme-, www- and trailing-slash-insensitive form of an http(s) URL, or None."""
+    match = re.match(r"https?://(?:www\.)?([^/?#]+)([^#]*)", (value or "").strip(), re.IGNORECASE)
+    if not match:
+        return None
+    return match.group(1).lower() + (match.group(2).rstrip("/") or "")
+
+
+def paper_keys(title, link=None, doi=None, arxiv=None):
+    """Every identity key of a paper, strongest first."""
+    keys = []
+    doi = normalize_doi(doi) or normalize_doi(link)
+    arxiv = arxiv_id(arxiv) or arxiv_id(link)
+    if not arxiv and doi and doi.startswith(ARXIV_DOI_PREFIX):
+        arxiv = arxiv_id(doi[len(ARXIV_DOI_PREFIX):])
+    if arxiv:
+        keys.append("arxiv:" + arxiv)
+    if doi:
+        keys.append("doi:" + doi)
+    url = normalize_url(link)
+    if url:
+        keys.append("url:" + url[:250])
+    title = normalize_title(title)
+    if title:
+        keys.append("title:" + title[:250])
+    return keys
+
+
+def _text(value):
+    """Column value for a paper field; Papers With Code returns authors as a list."""
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(item) for item in value)
+    return value
+
+
+def _strength(key):
+    return KEY_PRIORITY.index(key.split(":", 1)[0])
+
+
+def _keys_of(paper):
+    return paper_keys(paper.get("title"), paper.get("link"), paper.get("doi"), paper.get("arxiv_id"))
+
+
+def fts_query(text):
+    """Every word must match; the last one as a prefix so partial input still finds results."""
+    words = WORD_RE.findall((text or "").lower())
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+class PaperStore:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._created = False   # the file and tables are made on first use, not when the app is imported
+
+    def _create(self, conn):
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS papers (
+                id INTEGER PRIMARY KEY, canonical_key TEXT NOT NULL UNIQUE,
+                title TEXT, authors TEXT, summary TEXT, published TEXT, link TEXT, journal_ref TEXT,
+                sources TEXT NOT NULL DEFAULT '', updated_at REAL);
+            CREATE TABLE IF NOT EXISTS paper_keys (
+                key TEXT PRIMARY KEY, paper_id INTEGER NOT NULL) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS ix_paper_keys_paper ON paper_keys (paper_id);
+            CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                title, summary, authors, content='papers', content_rowid='id', tokenize='porter unicode61');
+            CREATE TRIGGER IF NOT EXISTS papers_ai AFTER INSERT ON papers BEGIN
+                INSERT INTO papers_fts (rowid, title, summary, authors) VALUES (new.id, new.title, new.summary, new.authors);
+            END;
+            CREATE TRIGGER IF NOT EXISTS papers_ad AFTER DELETE ON papers BEGIN
+                INSERT INTO papers_fts (papers_fts, rowid, title, summary, authors)
+                VALUES ('delete', old.id, old.title, old.summary, old.authors);
+            END;
+            CREATE TRIGGER IF NOT EXISTS papers_au AFTER UPDATE OF title, summary, authors ON papers BEGIN
+                INSERT INTO papers_fts (papers_fts, rowid, title, summary, authors)
+                VALUES ('delete', old.id, old.title, old.summary, old.authors);
+                INSERT INTO papers_fts (rowid, title, summary, authors) VALUES (new.id, new.title, new.summary, new.authors);
+            END;
+            CREATE TABLE IF NOT EXISTS search_pages (
+                source TEXT, query TEXT, start INTEGER, size INTEGER, total INTEGER, fetched_at REAL,
+                PRIMARY KEY (source, query, start, size)) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS search_results (
+                source TEXT, query TEXT, start INTEGER, size INTEGER, position INTEGER, paper_id INTEGER,
+                PRIMARY KEY (source, query, start, size, position)) WITHOUT ROWID;
+        """)
+        conn.commit()
+        self._created = True
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory and not self._created:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if not self._created:
+                self._create(conn)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _as_paper(row):
+        paper = {field: row[field] for field in PAPER_FIELDS}
+        paper["key"] = row["canonical_key"]
+        paper["sources"] = row["sources"].split(",") if row["sources"] else []
+        return paper
+
+    def _find(self, conn, keys, source=None):
+        """
+        Row id of the stored paper behind `keys`. A paper with an arXiv ID,
+        DOI or URL is matched on those alone; one with just a title matches
+        a paper already stored from `source` (any paper when `source` is
+        None, for lookups).
+        """
+        strong = [key for key in keys if not key.startswith("title:")]
+        if strong:
+            placeholders = ",".join("?" * len(strong))
+            row = conn.execute(f"SELECT paper_id FROM paper_keys WHERE key IN ({placeholders}) LIMIT 1",
+                               strong).fetchone()
+            return row[0] if row else None
+        titles = [key for key in keys if key.startswith("title:")]
+        if not titles:
+            return None
+        row = conn.execute("SELECT p.id, p.sources FROM paper_keys k JOIN papers p ON p.id = k.paper_id"
+                           " WHERE k.key = ?", titles[:1]).fetchone()
+        if row is None or (source is not None and source not in row["sources"].split(",")):
+            return None
+        return row["id"]
+
+    def _upsert(self, conn, paper, source, now):
+        """Insert `paper` or merge it into the row one of its keys already points at; returns the row id."""
+        keys = _keys_of(paper)
+        if not keys:
+            return None
+        paper_id = self._find(conn, keys, source)
+        if paper_id is None:
+            canonical = keys[0]
+            if conn.execute("SELECT 1 FROM papers WHERE canonical_key = ?", (canonical,)).fetchone():
+                # Same title as a paper from another source, but nothing proves it is the same paper
+                canonical = f"{canonical}@{source}"
+                keys.append(canonical)
+            values = [_text(paper.get(field)) for field in PAPER_FIELDS]
+            paper_id = conn.execute(
+                f"INSERT INTO papers (canonical_key, {', '.join(PAPER_FIELDS)}, sources, updated_at)"
+                f" VALUES (?, {', '.join('?' * len(PAPER_FIELDS))}, ?, ?)",
+                [canonical] + values + [source, now],
+            ).lastrowid
+        else:
+            row = conn.execute("SELECT * FROM papers WHERE id = ?", (paper_id,)).fetchone()
+            merged = {}
+            for field in PAPER_FIELDS:
+                old, new = row[field], _text(paper.get(field))
+                # Keep what we have, fill gaps, and prefer the fuller abstract
+                if new and (not old or old in ("N/A", "No abstract", "No title") or
+                            (field == "summary" and len(new) > len(old))):
+                    merged[field] = new
+            sources = row["sources"].split(",") if row["sources"] else []
+            if source not in sources:
+                merged["sources"] = ",".join(sources + [source])
+            # A stronger identifier (arXiv ID over DOI, URL or title) becomes the canonical key
+            strongest = min(keys + [row["canonical_key"]], key=_strength)
+            if strongest != row["canonical_key"] and conn.execute(
+                    "SELECT 1 FROM papers WHERE canonical_key = ?", (strongest,)).fetchone() is None:
+                merged["canonical_key"] = strongest
+            if merged:
+                merged["updated_at"] = now
+                assignments = ", ".join(f"{column} = ?" for column in merged)
+                conn.execute(f"UPDATE papers SET {assignments} WHERE id = ?", list(merged.values()) + [paper_id])
+        conn.executemany("INSERT OR IGNORE INTO paper_keys (key, paper_id) VALUES (?, ?)",
+                         [(key, paper_id) for key in keys])
+        return paper_id
+
+    def _load(self, conn, ids):
+        if not ids:
+            return {}
+        placeholders = ",".join("?" * len(ids))
+        rows = conn.execute(f"SELECT * FROM papers WHERE id IN ({placeholders})", list(ids)).fetchall()
+        return {row["id"]: self._as_paper(row) for row in rows}
+
+    def add(self, papers, source):
+        """Store `papers` from `source`; returns them as merged store records, in order."""
+        conn = self._conn()
+        with self._write_lock, conn:
+            ids = [self._upsert(conn, paper, source, time.time()) for paper in papers]
+        loaded = self._load(conn, {i for i in ids if i is not None})
+        return [loaded[i] for i in ids if i is not None]
+
+    def record(self, source, query, start, size, papers, total):
+        """Store one upstream result page and remember it for cached_page(); returns (papers, total)."""
+        query = normalize_title(query)
+        conn = self._conn()
+        now = time.time()
+        with self._write_lock, conn:
+            ids = [self._upsert(conn, paper, source, now) for paper in papers]
+            ids = [i for i in ids if i is not None]
+            conn.execute("DELETE FROM search_results WHERE source = ? AND query = ? AND start = ? AND size = ?",
+                         (source, query, start, size))
+            conn.executemany("INSERT INTO search_results VALUES (?, ?, ?, ?, ?, ?)",
+                             [(source, query, start, size, position, i) for position, i in enumerate(ids)])
+            conn.execute("INSERT OR REPLACE INTO search_pages VALUES (?, ?, ?, ?, ?, ?)",
+                         (source, query, start, size, total, now))
+        loaded = self._load(conn, set(ids))
+        return [loaded[i] for i in ids], total
+
+    def cached_page(self, source, query, start, size, max_age):
+        """(papers, total) for a result page recorded less than `max_age` seconds ago, or None."""
+        query = normalize_title(query)
+        conn = self._conn()
+        page = conn.execute(
+            "SELECT total, fetched_at FROM search_pages WHERE source = ? AND query = ? AND start = ? AND size = ?",
+            (source, query, start, size),
+        ).fetchone()
+        if page is None or time.time() - page["fetched_at"] > max_age:
+            return None
+        rows = conn.execute(
+            "SELECT p.* FROM search_results r JOIN papers p ON p.id = r.paper_id"
+            " WHERE r.source = ? AND r.query = ? AND r.start = ? AND r.size = ? ORDER BY r.position",
+            (source, query, start, size),
+        ).fetchall()
+        return [self._as_paper(row) for row in rows], page["total"]
+
+    def search(self, query, limit=10, offset=0, max_count=10000):
+        """
+        Full-text search over stored papers, best BM25 match first (titles
+        weigh 3x abstracts) across every match. The total is capped at
+        `max_count`; the ranking is not, so its cost grows with the number
+        of matches (see the module docstring).
+        """
+        match = fts_query(query)
+        if match is None:
+            return [], 0
+        conn = self._conn()
+        rows = conn.execute(
+            "SELECT p.* FROM (SELECT rowid AS id, bm25(papers_fts, 3.0, 1.0, 1.0) AS score FROM papers_fts"
+            "                 WHERE papers_fts MATCH ? ORDER BY score LIMIT ? OFFSET ?) m"
+            " JOIN papers p ON p.id = m.id ORDER BY m.score",
+            (match, limit, offset),
+        ).fetchall()
+        total = conn.execute(
+            "SELECT COUNT(*) FROM (SELECT rowid FROM papers_fts WHERE papers_fts MATCH ? LIMIT ?)",
+            (match, max_count),
+        ).fetchone()[0]
+        return [self._as_paper(row) for row in rows], total
+
+    def canonical_key(self, title, link=None):
+        """Key of the stored paper with this title/link, or the key it would get."""
+        keys = paper_keys(title, link)
+        conn = self._conn()
+        paper_id = self._find(conn, keys)
+        if paper_id is not None:
+            return conn.execute("SELECT canonical_key FROM papers WHERE id = ?", (paper_id,)).fetchone()[0]
+        return keys[0] if keys else title
+
+    def aliases(self, key):
+        """Every key known for the paper behind `key` (just `key` if it isn't stored)."""
+        rows = self._conn().execute(
+            "SELECT key FROM paper_keys WHERE paper_id = (SELECT paper_id FROM paper_keys WHERE key = ?)", (key,)
+        ).fetchall()
+        return [row[0] for row in rows] or [key]
+
+    def count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+
+def merge_results(*pages):
+    """Concatenate result lists from several sources, keeping the first copy of each stored paper."""
+    seen = set()
+    merged = []
+    for papers in pages:
+        for paper in papers:
+            key = paper.get("key")
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            merged.append(paper)
+    return merged
+
+
+def create_paper_store(config):
+    return PaperStore(config.PAPER_STORE_PATH)
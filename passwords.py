@@ -0,0 +1,75 @@
+"""
+Password hashing with a configurable cost, run on a small bounded pool.
+
+Hashing is deliberately slow (tens of milliseconds of CPU per attempt), so a
+burst of logins on the request threads would starve every other page. Here
+at most PASSWORD_HASH_WORKERS hashes run at once and at most
+PASSWORD_HASH_MAX_PENDING wait for a worker; further attempts fail fast with
+HashPoolBusy, and the login/signup views answer 503 instead of queueing.
+hashlib's scrypt and pbkdf2 release the GIL, so the workers run in parallel
+with the request threads.
+
+Stored hashes keep the parameters they were made with; needs_rehash() tells
+the login view when to upgrade one to PASSWORD_HASH_METHOD.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class HashPoolBusy(Exception):
+    """Raised when the hashing pool is full, or a queued hash did not finish within the timeout."""
+
+
+class HashPool:
+    def __init__(self, method, workers=2, max_pending=32, timeout=10):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._prefix = None
+        self.rejected = 0
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashPoolBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            with self._lock:
+                self.rejected += 1
+            raise HashPoolBusy()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def method_prefix(self):
+        """The configured method with werkzeug's defaults filled in, e.g. 'scrypt' -> 'scrypt:32768:8:1'."""
+        if self._prefix is None:
+            self._prefix = generate_password_hash("", self.method).split("$", 1)[0]
+        return self._prefix
+
+    def needs_rehash(self, password_hash):
+        return password_hash.split("$", 1)[0] != self.method_prefix()
+
+    def stats(self):
+        return {"method": self.method, "workers": self.workers, "rejected": self.rejected}
+
+
+def create_hash_pool(config):
+    return HashPool(config.PASSWORD_HASH_METHOD, workers=config.PASSWORD_HASH_WORKERS,
+                    max_pending=config.PASSWORD_HASH_MAX_PENDING, timeout=config.PASSWORD_HASH_TIMEOUT)
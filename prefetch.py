@@ -0,0 +1,245 @@
+"""
+Background prefetch of the default upstream queries.
+
+The landing views (/github_repos and /research_papers with "AI") are the
+most requested pages. Instead of fetching them inside the request, a
+worker refreshes their first pages on an interval and stores snapshots in
+an SQLite file. Routes serve the snapshot, however stale, and never wait
+on a refresh; only a query with no snapshot yet goes to the upstream.
+
+Prefetching is off unless PREFETCH_MODE says otherwise. The worker runs as a
+daemon thread in each app process, started by its first request
+(PREFETCH_MODE=thread), or on its own (PREFETCH_MODE=process, then
+`flask --app app prefetch-worker`).
+Either way a per-job lease in the snapshot table makes sure only one
+process refreshes a job at a time.
+"""
+import collections
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from response_cache import make_key
+
+
+class SnapshotStore:
+    """Latest value of each prefetch job plus its refresh metadata, shared through an SQLite file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._created = False   # the file and table are made on first use, not when the app is imported
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory and not self._created:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if not self._created:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS prefetch_snapshots ("
+                    " key TEXT PRIMARY KEY, value BLOB, fetched_at REAL, refresh_ms REAL,"
+                    " last_error TEXT, failures INTEGER NOT NULL DEFAULT 0, lease_until REAL NOT NULL DEFAULT 0)"
+                )
+                conn.commit()
+                self._created = True
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """(value, fetched_at) of the last successful refresh, or None."""
+        row = self._conn().execute(
+            "SELECT value, fetched_at FROM prefetch_snapshots WHERE key = ? AND value IS NOT NULL", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return pickle.loads(row[0]), row[1]
+
+    def fetched_at(self, key):
+        row = self._conn().execute("SELECT fetched_at FROM prefetch_snapshots WHERE key = ?", (key,)).fetchone()
+        return row[0] if row and row[0] is not None else None
+
+    def claim(self, key, lease):
+        """Take the refresh lease on `key` for `lease` seconds; False if another worker holds it."""
+        conn = self._conn()
+        now = time.time()
+        with conn:
+            conn.execute("INSERT OR IGNORE INTO prefetch_snapshots (key) VALUES (?)", (key,))
+            claimed = conn.execute(
+                "UPDATE prefetch_snapshots SET lease_until = ? WHERE key = ? AND lease_until <= ?",
+                (now + lease, key, now),
+            ).rowcount
+        return claimed == 1
+
+    def put(self, key, value, refresh_ms):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._conn() as conn:
+            conn.execute(
+                "UPDATE prefetch_snapshots SET value = ?, fetched_at = ?, refresh_ms = ?, last_error = NULL,"
+                " failures = 0, lease_until = 0 WHERE key = ?",
+                (blob, time.time(), refresh_ms, key),
+            )
+
+    def fail(self, key, error, refresh_ms, backoff, max_backoff):
+        """
+        Record a failed refresh; the previous snapshot stays in place. The
+        lease is extended by `backoff` doubled per consecutive failure (up to
+        `max_backoff`) so a rate-limited upstream isn't hammered.
+        """
+        conn = self._conn()
+        with conn:
+            failures = conn.execute("SELECT failures FROM prefetch_snapshots WHERE key = ?", (key,)).fetchone()[0] + 1
+            conn.execute(
+                "UPDATE prefetch_snapshots SET last_error = ?, refresh_ms = ?, failures = ?, lease_until = ?"
+                " WHERE key = ?",
+                (error, refresh_ms, failures, time.time() + min(max_backoff, backoff * 2 ** (failures - 1)), key),
+            )
+
+    def rows(self):
+        return self._conn().execute(
+            "SELECT key, fetched_at, refresh_ms, last_error, failures FROM prefetch_snapshots"
+        ).fetchall()
+
+
+class PrefetchJob:
+    def __init__(self, source, fn, params, accept=None):
+        self.source = source
+        self.fn = fn
+        self.params = params
+        self.accept = accept        # result check; rejected results don't replace the snapshot
+        self.key = make_key(source, params)
+
+
+class Prefetcher:
+    """
+    Refreshes registered jobs every `interval` seconds and serves their
+    snapshots. Snapshots older than `max_stale` are no longer served, so a
+    dead worker degrades to live fetches instead of ever-older pages.
+    """
+
+    def __init__(self, store, interval=600, max_stale=86400, lease=120):
+        self.store = store
+        self.interval = interval
+        self.max_stale = max_stale
+        self.lease = lease
+        self.jobs = {}
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._counters = collections.Counter()
+
+    def add(self, source, fn, accept=None, **params):
+        job = PrefetchJob(source, fn, params, accept)
+        self.jobs[job.key] = job
+        return job
+
+    def _count(self, event):
+        with self._lock:
+            self._counters[event] += 1
+
+    def lookup(self, source, **params):
+        """Snapshot value for a registered job, or None (not prefetched, not yet fetched, or too stale)."""
+        key = make_key(source, params)
+        if key not in self.jobs:
+            return None
+        try:
+            snapshot = self.store.get(key)
+        except sqlite3.Error as e:
+            print("Error reading prefetch snapshot:", e)
+            snapshot = None
+        if snapshot is None or time.time() - snapshot[1] > self.max_stale:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return snapshot[0]
+
+    def refresh(self, job):
+        """Run one job now if nobody else is; returns True when a new snapshot was stored."""
+        if not self.store.claim(job.key, self.lease):
+            return False
+        start = time.perf_counter()
+        try:
+            value = job.fn(**job.params)
+        except Exception as e:
+            self._fail(job, str(e), (time.perf_counter() - start) * 1000)
+            print(f"Prefetch of {job.source} failed:", e)
+            return False
+        refresh_ms = (time.perf_counter() - start) * 1000
+        if job.accept is not None and not job.accept(value):
+            self._fail(job, "empty result", refresh_ms)
+            return False
+        self.store.put(job.key, value, refresh_ms)
+        return True
+
+    def _fail(self, job, error, refresh_ms):
+        self.store.fail(job.key, error, refresh_ms, backoff=self._poll(), max_backoff=self.interval)
+
+    def _poll(self):
+        return max(1, min(30, self.interval / 10))
+
+    def run_once(self):
+        """Refresh every job whose snapshot is older than `interval`; returns how many were refreshed."""
+        refreshed = 0
+        now = time.time()
+        for job in list(self.jobs.values()):
+            fetched_at = self.store.fetched_at(job.key)
+            if fetched_at is None or now - fetched_at >= self.interval:
+                refreshed += self.refresh(job)
+        return refreshed
+
+    def run_forever(self, poll=None):
+        poll = poll or self._poll()
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print("Prefetch worker error:", e)
+            self._stop.wait(poll)
+
+    def start(self):
+        """Start the worker thread once per process."""
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run_forever, name="prefetch", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        """Per-job staleness and last refresh latency, plus this process's serve counters."""
+        with self._lock:
+            counters = dict(self._counters)
+        now = time.time()
+        jobs = {}
+        for key, fetched_at, refresh_ms, last_error, failures in self.store.rows():
+            if key not in self.jobs:
+                continue
+            jobs[key] = {
+                "age_seconds": round(now - fetched_at, 1) if fetched_at else None,
+                "stale": fetched_at is None or now - fetched_at > self.interval,
+                "last_refresh_ms": round(refresh_ms, 1) if refresh_ms is not None else None,
+                "last_error": last_error,
+                "consecutive_failures": failures,
+            }
+        return {
+            "jobs": jobs,
+            "registered": len(self.jobs),
+            "worker_running": self._thread is not None and self._thread.is_alive(),
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+        }
+
+
+def create_prefetcher(config):
+    return Prefetcher(SnapshotStore(config.PREFETCH_DB_PATH), interval=config.PREFETCH_INTERVAL,
+                      max_stale=config.PREFETCH_MAX_STALE, lease=config.PREFETCH_LEASE)
@@ -0,0 +1,284 @@
+import asyncio
+import collections
+import functools
+import inspect
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+
+def make_key(source, params, case_insensitive=()):
+    """
+    Normalized cache key for an upstream call: the string params named in
+    `case_insensitive` (ones the upstream itself treats case-insensitively,
+    like search terms) are stripped and lower-cased, and params are
+    serialized in sorted order, so equivalent requests share an entry.
+    """
+    normalized = {}
+    for name, value in params.items():
+        if name in case_insensitive and isinstance(value, str):
+            value = " ".join(value.split()).lower()
+        normalized[name] = value
+    return source + ":" + json.dumps(normalized, sort_keys=True, default=str)
+
+
+class MemoryBackend:
+    """Per-process LRU store bounded by entry count and total bytes."""
+
+    def __init__(self, max_entries=1000, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._data = collections.OrderedDict()   # key -> (expires_at, blob)
+        self._bytes = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                self._bytes -= len(entry[1])
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, blob, ttl):
+        """Store `blob`; returns the number of entries evicted to make room."""
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+            self._data[key] = (time.time() + ttl, blob)
+            self._bytes += len(blob)
+            evicted = 0
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, dropped) = self._data.popitem(last=False)
+                self._bytes -= len(dropped)
+                evicted += 1
+            return evicted
+
+    def delete_prefix(self, prefix):
+        """Drop every entry whose key starts with `prefix`; returns how many were dropped."""
+        with self._lock:
+            keys = [key for key in self._data if key.startswith(prefix)]
+            for key in keys:
+                self._bytes -= len(self._data.pop(key)[1])
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def size(self):
+        return len(self._data), self._bytes
+
+
+class SQLiteBackend:
+    """
+    LRU store in an SQLite file, so every gunicorn worker on the host shares
+    one cache. Each thread keeps its own connection. A hit refreshes an
+    entry's last_access only when it is over `touch_interval` seconds old,
+    so repeat hits are plain reads instead of a write and commit each.
+    """
+
+    def __init__(self, path, max_entries=5000, max_bytes=128 * 1024 * 1024, touch_interval=60):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self._local = threading.local()
+        self._created = False   # the file and table are made on first use, not when the app is imported
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory and not self._created:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if not self._created:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS response_cache ("
+                    " key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,"
+                    " expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS ix_response_cache_last_access ON response_cache (last_access)")
+                conn.commit()
+                self._created = True
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute("SELECT value, expires_at, last_access FROM response_cache WHERE key = ?",
+                           (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] <= now:
+            with conn:
+                conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            return None
+        if now - row[2] > self.touch_interval:
+            with conn:
+                conn.execute("UPDATE response_cache SET last_access = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def set(self, key, blob, ttl):
+        conn = self._conn()
+        now = time.time()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, size, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now + ttl, now),
+            )
+            conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM response_cache").fetchone()
+            if count <= self.max_entries and total <= self.max_bytes:
+                return 0
+            # One statement drops the least recently used entries (never the new one) until both
+            # bounds hold: the oldest `count - max_entries`, plus as many as it takes to free the excess bytes
+            return conn.execute(
+                "DELETE FROM response_cache WHERE key IN ("
+                " SELECT key FROM (SELECT key, ROW_NUMBER() OVER w AS position, SUM(size) OVER w - size AS freed"
+                "                  FROM response_cache WHERE key != ? WINDOW w AS (ORDER BY last_access, key))"
+                " WHERE position <= ? OR freed < ?)",
+                (key, count - self.max_entries, total - self.max_bytes),
+            ).rowcount
+
+    def delete_prefix(self, prefix):
+        conn = self._conn()
+        with conn:
+            # substr() rather than LIKE, so '_' and '%' in keys are not wildcards
+            return conn.execute("DELETE FROM response_cache WHERE substr(key, 1, ?) = ?",
+                                (len(prefix), prefix)).rowcount
+
+    def clear(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM response_cache")
+
+    def size(self):
+        return self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM response_cache").fetchone()
+
+
+class ResponseCache:
+    """
+    TTL + LRU cache for upstream fetchers, with a pluggable backend.
+    Values are pickled, so callers always get a private copy they may mutate.
+    """
+
+    def __init__(self, backend, ttls=None, default_ttl=300):
+        self.backend = backend
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._counters = collections.Counter()
+        self._case_insensitive = {}   # source -> param names folded into the key
+
+    def _count(self, source, event, n=1):
+        with self._lock:
+            self._counters[(source, event)] += n
+
+    def _key(self, source, params):
+        return make_key(source, params, self._case_insensitive.get(source, ()))
+
+    def get(self, source, params):
+        blob = self.backend.get(self._key(source, params))
+        if blob is None:
+            self._count(source, "misses")
+            return None
+        self._count(source, "hits")
+        return pickle.loads(blob)
+
+    def set(self, source, params, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        ttl = self.ttls.get(source, self.default_ttl)
+        evicted = self.backend.set(self._key(source, params), blob, ttl)
+        if evicted:
+            self._count(source, "evictions", evicted)
+
+    def cached(self, source, cache_if=None, case_insensitive=()):
+        """
+        Decorator caching `fn` under `source`, keyed on all of its bound
+        arguments (defaults included; those named in `case_insensitive` are
+        matched ignoring case). Results failing `cache_if` are returned but
+        not stored, so upstream errors are retried on the next call.
+        """
+        self._case_insensitive[source] = tuple(case_insensitive)
+
+        def decorator(fn):
+            signature = inspect.signature(fn)
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                params = dict(bound.arguments)
+                value = self.get(source, params)
+                if value is not None:
+                    return value
+                value = fn(*args, **kwargs)
+                if cache_if is None or cache_if(value):
+                    self.set(source, params, value)
+                return value
+
+            wrapper.uncached = fn
+            return wrapper
+        return decorator
+
+    def cached_async(self, source, cache_if=None, case_insensitive=()):
+        """
+        cached() for coroutine functions; entries are shared with sync fetchers of
+        the same signature. Backend reads and writes run in a worker thread, since
+        the SQLite backend would otherwise block the event loop.
+        """
+        self._case_insensitive[source] = tuple(case_insensitive)
+
+        def decorator(fn):
+            signature = inspect.signature(fn)
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                params = dict(bound.arguments)
+                value = await asyncio.to_thread(self.get, source, params)
+                if value is not None:
+                    return value
+                value = await fn(*args, **kwargs)
+                if cache_if is None or cache_if(value):
+                    await asyncio.to_thread(self.set, source, params, value)
+                return value
+
+            wrapper.uncached = fn
+            return wrapper
+        return decorator
+
+    def stats(self):
+        """Hit/miss/eviction counters per source plus the backend's current size."""
+        with self._lock:
+            counters = dict(self._counters)
+        per_source = {}
+        for (source, event), count in counters.items():
+            per_source.setdefault(source, {"hits": 0, "misses": 0, "evictions": 0})[event] = count
+        entries, size_bytes = self.backend.size()
+        return {"sources": per_source, "entries": entries, "bytes": size_bytes}
+
+
+def create_cache(config):
+    """Build the cache described by the CACHE_* settings on `config`."""
+    if config.CACHE_BACKEND == 'sqlite':
+        backend = SQLiteBackend(config.CACHE_SQLITE_PATH, config.CACHE_MAX_ENTRIES, config.CACHE_MAX_BYTES)
+    else:
+        backend = MemoryBackend(config.CACHE_MAX_ENTRIES, config.CACHE_MAX_BYTES)
+    return ResponseCache(backend, ttls=config.CACHE_TTLS, default_ttl=config.CACHE_DEFAULT_TTL)
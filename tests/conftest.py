@@ -0,0 +1,59 @@
+"""
+Shared fixtures. The app is imported against throwaway files, so the tests
+never touch the bundled app.db or anything under instance/.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_tmp = tempfile.mkdtemp(prefix="aihub-tests-")
+os.environ.update({
+    "DATABASE_URL": "sqlite:///" + os.path.join(_tmp, "app.db"),
+    "PAPER_STORE_PATH": os.path.join(_tmp, "papers.db"),
+    "PREFETCH_DB_PATH": os.path.join(_tmp, "prefetch.db"),
+    "CACHE_BACKEND": "memory",
+    "PREFETCH_MODE": "off",
+    "OPENAI_API_KEY": "test-dummy-key",
+})
+
+
+@pytest.fixture(scope="session")
+def app():
+    import migrations
+    from app import app as flask_app
+    from extensions import db
+
+    with flask_app.app_context():
+        db.create_all()
+        migrations.upgrade(db.engine)
+    return flask_app
+
+
+@pytest.fixture
+def db_session(app):
+    """The app's session inside an app context; saved items are wiped afterwards."""
+    from extensions import db
+    from models import SavedItem, User
+
+    with app.app_context():
+        yield db.session
+        db.session.rollback()
+        db.session.execute(db.delete(SavedItem))
+        db.session.execute(db.delete(User))
+        db.session.commit()
+
+
+@pytest.fixture
+def user(db_session):
+    from models import User
+
+    account = User(username="reader", role="user")
+    account.password_hash = "unused"
+    db_session.add(account)
+    db_session.commit()
+    return account
@@ -0,0 +1,38 @@
+import pytest
+
+from answer_cache import AnswerCache, normalize_prompt
+
+
+def test_exact_key_ignores_case_and_whitespace():
+    cache = AnswerCache()
+    cache.set("What is   C++", "a language")
+    assert cache.get("what is c++") == "a language"
+    assert normalize_prompt("  What\tis C++ ") == "what is c++"
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("what is C++", "what is C#"),
+    ("what is 1+2", "what is 1-2"),
+    ("what is 1+2", "what is 1 2"),
+    ("is it true?", "is it true!"),
+])
+def test_prompts_differing_only_by_punctuation_miss(cached, asked):
+    cache = AnswerCache()
+    cache.set(cached, "answer")
+    assert cache.get(asked) is None
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("what is C++", "what is C#"),
+    ("what is 1+2", "what is 1-2"),
+])
+def test_similarity_tier_keeps_symbols_apart(cached, asked):
+    cache = AnswerCache(similarity=True)
+    cache.set(cached, "answer")
+    assert cache.get(asked) is None
+
+
+def test_similarity_tier_ignores_sentence_punctuation():
+    cache = AnswerCache(similarity=True)
+    cache.set("Explain attention in transformers.", "answer")
+    assert cache.get("explain attention in transformers?") == "answer"
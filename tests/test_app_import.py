@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+
+
+def test_importing_the_app_creates_no_sqlite_files(tmp_path):
+    state = tmp_path / "instance"
+    env = dict(os.environ, CACHE_BACKEND="sqlite", PREFETCH_MODE="thread",
+               DATABASE_URL="sqlite:///" + str(tmp_path / "app.db"),
+               CACHE_SQLITE_PATH=str(state / "response_cache.db"),
+               PAGE_CACHE_SQLITE_PATH=str(state / "page_cache.db"),
+               PREFETCH_DB_PATH=str(state / "prefetch.db"),
+               PAPER_STORE_PATH=str(state / "papers.db"))
+    subprocess.run([sys.executable, "-c", "import app"], cwd=ROOT, env=env, check=True)
+    assert not state.exists()
+
+
+def test_stores_create_their_file_on_first_use(tmp_path):
+    from paper_store import PaperStore
+    from prefetch import SnapshotStore
+    from response_cache import SQLiteBackend
+
+    stores = [PaperStore(str(tmp_path / "a" / "papers.db")), SnapshotStore(str(tmp_path / "b" / "prefetch.db")),
+              SQLiteBackend(str(tmp_path / "c" / "cache.db"))]
+    assert list(tmp_path.iterdir()) == []
+    stores[0].count()
+    stores[1].get("key")
+    stores[2].get("key")
+    assert all(os.path.exists(store.path) for store in stores)
@@ -0,0 +1,39 @@
+import asyncio
+import json
+
+import pytest
+
+
+def call(app, method, path, body=b""):
+    """Status and body of one request through the ASGI app."""
+    import asgi
+
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "query_string": b"",
+             "headers": [(b"content-type", b"application/json")]}
+    asyncio.run(asgi.app(scope, receive, send))
+    return sent[0]["status"], b"".join(m.get("body", b"") for m in sent[1:])
+
+
+@pytest.mark.parametrize("body", [b"{not json", b"[1, 2]", b'"hello"', b'{"message": 42}', b""])
+def test_chat_api_rejects_bodies_without_a_message_object(app, body):
+    status, content = call(app, "POST", "/chat/api", body)
+    assert status == 400
+    assert "error" in json.loads(content)
+
+
+def test_chat_api_answers_from_the_cache_without_upstream(app):
+    from blueprints import chat
+
+    chat.remember_answer("what is a tensor?", "A multi-dimensional array.")
+    status, content = call(app, "POST", "/chat/api", json.dumps({"message": "What is a tensor?"}).encode())
+    assert status == 200
+    assert json.loads(content) == {"reply": "A multi-dimensional array."}
@@ -0,0 +1,29 @@
+import os
+
+from course_catalog import CourseCatalog
+
+
+def test_missing_file_is_not_reread_until_it_appears(tmp_path):
+    path = tmp_path / "courses.csv"
+    catalog = CourseCatalog(str(path))
+    assert catalog.all() == []
+    catalog.all()
+    assert catalog.version == 1
+
+    path.write_text("Title,Tag\nIntro to ML,Coursera\n", encoding="utf-8")
+    assert [row["Title"] for row in catalog.all()] == ["Intro to ML"]
+    assert catalog.version == 2
+
+
+def test_unreadable_file_is_cached_for_its_mtime_and_size(tmp_path):
+    path = tmp_path / "courses.csv"
+    path.write_bytes(b"Title,Tag\n\xff\xfe,Coursera\n")
+    catalog = CourseCatalog(str(path))
+    assert catalog.all() == []
+    catalog.all()
+    assert catalog.version == 1
+
+    path.write_text("Title,Tag\nNLP,Udacity\n", encoding="utf-8")
+    os.utime(path, ns=(1, 1))
+    assert [row["Title"] for row in catalog.by_tag("udacity")] == ["NLP"]
+    assert catalog.version == 2
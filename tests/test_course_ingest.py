@@ -0,0 +1,40 @@
+import course_ingest
+from course_ingest import IngestPipeline, merge_catalog
+
+
+def row(url, tag="Coursera", title="Course"):
+    return {"Title": title, "Description": "", "URL": url, "Tag": tag}
+
+
+def test_merge_keeps_existing_order_and_appends_new_rows():
+    existing = [row("https://a.org/1"), row("https://a.org/2"), row("https://a.org/3")]
+    scraped = [row("https://a.org/4"), row("https://a.org/3", title="Renamed"), row("https://a.org/1")]
+    merged = merge_catalog(scraped, existing, replaced_tags={"Coursera"})
+    assert [r["URL"] for r in merged] == ["https://a.org/1", "https://a.org/3", "https://a.org/4"]
+    assert merged[1]["Title"] == "Renamed"
+
+
+def test_merge_keeps_rows_of_sources_not_replaced():
+    existing = [row("https://u.com/1", tag="Udacity"), row("https://a.org/1"), row("https://a.org/2")]
+    merged = merge_catalog([row("https://a.org/2")], existing, replaced_tags={"Coursera"})
+    assert [r["URL"] for r in merged] == ["https://u.com/1", "https://a.org/2"]
+
+
+class StubFetcher:
+    def __init__(self, pages):
+        self.pages = pages
+
+    def fetch(self, source, page, url, previous):
+        if page not in self.pages:
+            return 503, None, None, None
+        return 200, self.pages[page], None, None
+
+
+def test_failed_page_without_earlier_rows_marks_source_incomplete(monkeypatch):
+    source = course_ingest.SOURCES["coursera"]
+    monkeypatch.setattr(source, "parse", lambda html: [source.row(html, "", f"https://a.org/{html}")])
+    pipeline = IngestPipeline([source], pages=2, workers=2, state_path=None, fetcher=StubFetcher({1: "x"}))
+    rows = pipeline.run()
+    assert [r["URL"] for r in rows] == ["https://a.org/x"]
+    assert pipeline.incomplete_sources == {"coursera"}
+    assert pipeline.stats["failed"] == 1
@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from course_search import CourseSearchIndex
+
+
+def brute_force(lists, k, accept=None):
+    scores = {}
+    for _, doc_scores in lists:
+        for doc_id, score in doc_scores.items():
+            scores[doc_id] = scores.get(doc_id, 0.0) + score
+    ranked = sorted(((score, -doc_id) for doc_id, score in scores.items()
+                     if accept is None or accept(doc_id)), reverse=True)
+    return [(score, -neg_id) for score, neg_id in ranked[:k]]
+
+
+def impact_list(scores):
+    return sorted(((score, doc_id) for doc_id, score in scores.items()), reverse=True), scores
+
+
+LISTS = [
+    impact_list({0: 3.0, 1: 1.0, 2: 2.0, 5: 1.0}),
+    impact_list({1: 2.5, 3: 2.0, 4: 0.5, 5: 1.0}),
+    impact_list({2: 1.0, 4: 2.5, 6: 2.0}),
+]
+
+
+@pytest.mark.parametrize("k", [0, -1])
+def test_threshold_top_k_empty_for_non_positive_k(k):
+    assert CourseSearchIndex._threshold_top_k(LISTS, k) == []
+
+
+@pytest.mark.parametrize("k", [1, 2, 3, 5, 10])
+def test_threshold_top_k_matches_brute_force(k):
+    assert CourseSearchIndex._threshold_top_k(LISTS, k) == brute_force(LISTS, k)
+
+
+def test_threshold_top_k_breaks_ties_by_doc_id_at_every_k():
+    tied = [impact_list({doc_id: 1.0 for doc_id in range(10)})]
+    full = CourseSearchIndex._threshold_top_k(tied, 10)
+    for k in range(1, 10):
+        assert CourseSearchIndex._threshold_top_k(tied, k) == full[:k]
+
+
+def test_threshold_top_k_skips_rejected_documents():
+    even = lambda doc_id: doc_id % 2 == 0  # noqa: E731
+    assert CourseSearchIndex._threshold_top_k(LISTS, 3, even) == brute_force(LISTS, 3, even)
+
+
+def test_search_filters_by_tag_and_counts_all_matches():
+    index = CourseSearchIndex()
+    rows = [{"index": i, "Title": f"Python course {i}", "Description": "learn python",
+             "Tag": "Coursera" if i % 3 else "Udacity"} for i in range(30)]
+    index.sync(rows, version=1)
+
+    udacity = index.search("python", limit=100, tag="udacity")
+    assert [row["index"] for row, _ in udacity] == [i for i in range(30) if i % 3 == 0]
+    assert index.count("python", tag="udacity") == 10
+    assert index.count("python") == 30
+    assert index.count("nothing") == 0
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_threshold_top_k_matches_brute_force_on_random_lists(seed):
+    # Long, flat lists with little overlap make lists drop out of the scan early
+    rng = random.Random(seed)
+    lists = [impact_list({rng.randrange(2000): rng.uniform(1.0, 1.0 + spread) for _ in range(size)})
+             for size, spread in ((800, 0.2), (300, 3.0), (1500, 0.5))[:rng.randint(2, 3)]]
+    for k in (1, 20, 100):
+        assert CourseSearchIndex._threshold_top_k(lists, k) == brute_force(lists, k)
+
+
+def test_prefix_search_sums_every_expansion():
+    index = CourseSearchIndex()
+    rows = [{"index": i, "Title": title, "Description": "", "Tag": "Coursera"}
+            for i, title in enumerate(["prompt engineering", "prompt engineer", "engine design",
+                                       "prompt engineer engineering", "cooking"])]
+    index.sync(rows, version=1)
+    lists = [index._impact(term) for term in ("prompt", "engine", "engineer", "engineering")]
+    want = [(index._rows[doc_id]["index"], score) for score, doc_id in brute_force(lists, 10)]
+    got = [(row["index"], score) for row, score in index.search("prompt engin", limit=10)]
+    assert [i for i, _ in got] == [i for i, _ in want]
+    assert [score for _, score in got] == pytest.approx([score for _, score in want])
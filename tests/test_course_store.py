@@ -0,0 +1,17 @@
+import course_store
+from course_catalog import CourseCatalog
+
+CSV = "Title,Description,URL,Tag\nIntro to ML,Basics,https://a.org/1,Coursera\n\nNLP,,https://a.org/2,Udacity\n\n"
+
+
+def test_compiled_catalog_matches_csv_with_blank_lines(tmp_path):
+    csv_path = tmp_path / "courses.csv"
+    csv_path.write_text(CSV, encoding="utf-8")
+    compiled_path = tmp_path / "courses.catalog"
+    assert course_store.build(str(csv_path), str(compiled_path)) == 2
+
+    from_csv = CourseCatalog(str(csv_path))
+    compiled = CourseCatalog(str(csv_path), str(compiled_path))
+    assert [row.to_dict() for row in compiled.all()] == from_csv.all()
+    assert compiled.compiled is not None
+    assert [row["Title"] for row in compiled.by_tag("udacity")] == ["NLP"]
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from fanout import fan_out, fan_out_async
+
+
+@pytest.fixture
+def release():
+    """Set at teardown, so sources parked on it do not hold pool threads after the test."""
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def by_name(results):
+    return {result.name: result for result in results}
+
+
+def test_fan_out_runs_sources_concurrently_and_keeps_order():
+    def slow(value):
+        def call():
+            time.sleep(0.2)
+            return value
+        return call
+
+    start = time.perf_counter()
+    results = fan_out({"b": (slow(2), 5), "a": (slow(1), 5), "c": (slow(3), 5)}, deadline=5)
+    assert time.perf_counter() - start < 0.45
+    assert [(r.name, r.value, r.ok) for r in results] == [("b", 2, True), ("a", 1, True), ("c", 3, True)]
+
+
+def test_fan_out_reports_a_failing_source_and_keeps_the_rest():
+    def broken():
+        raise RuntimeError("upstream returned 500")
+
+    results = by_name(fan_out({"arxiv": (lambda: ["paper"], 5), "pwc": (broken, 5)}, deadline=5))
+    assert results["arxiv"].ok and results["arxiv"].value == ["paper"]
+    assert not results["pwc"].ok and results["pwc"].error == "upstream returned 500"
+
+
+def test_fan_out_drops_a_source_past_its_own_timeout(release):
+    start = time.perf_counter()
+    results = by_name(fan_out({"hangs": (lambda: release.wait(5), 0.1),
+                               "fast": (lambda: "ok", 5)}, deadline=5))
+    assert time.perf_counter() - start < 0.4
+    assert results["hangs"].error == "timed out"
+    assert results["fast"].value == "ok"
+
+
+def test_fan_out_never_waits_past_the_deadline(release):
+    def slow():
+        release.wait(0.3)
+        return "late"
+
+    start = time.perf_counter()
+    results = by_name(fan_out({"a": (lambda: release.wait(5), 5), "b": (slow, 5), "c": (lambda: "ok", 5)},
+                              deadline=0.15))
+    assert time.perf_counter() - start < 0.4
+    assert results["a"].error == results["b"].error == "timed out"
+    assert results["c"].value == "ok"
+
+
+def run_async(calls, deadline):
+    return asyncio.run(fan_out_async(calls, deadline))
+
+
+def test_fan_out_async_runs_sources_concurrently_and_keeps_order():
+    def slow(value):
+        async def call():
+            await asyncio.sleep(0.2)
+            return value
+        return call
+
+    start = time.perf_counter()
+    results = run_async({"b": (slow(2), 5), "a": (slow(1), 5)}, deadline=5)
+    assert time.perf_counter() - start < 0.35
+    assert [(r.name, r.value) for r in results] == [("b", 2), ("a", 1)]
+
+
+def test_fan_out_async_returns_partial_results_within_the_limits():
+    async def hangs():
+        await asyncio.sleep(5)
+
+    async def broken():
+        raise ValueError("bad feed")
+
+    async def fast():
+        return "ok"
+
+    start = time.perf_counter()
+    results = by_name(run_async({"timeout": (hangs, 0.1), "deadline": (hangs, 5),
+                                 "broken": (broken, 5), "fast": (fast, 5)}, deadline=0.2))
+    assert time.perf_counter() - start < 0.4
+    assert results["timeout"].error == "timed out" and results["timeout"].elapsed < 0.18
+    assert results["deadline"].error == "timed out"
+    assert results["broken"].error == "bad feed"
+    assert results["fast"].value == "ok"
@@ -0,0 +1,79 @@
+import datetime
+
+import pytest
+
+from blueprints.library import normalize_item, save_items
+
+
+def test_normalize_item_fills_defaults():
+    row, error = normalize_item({"item_type": "course", "title": "  Deep Learning  "})
+    assert error is None
+    assert row["title"] == "Deep Learning"
+    assert row["course_status"] == "ongoing"
+    assert row["item_key"] == "Deep Learning"
+    assert row["date_saved"] is None
+
+
+def test_normalize_item_parses_date_saved():
+    row, error = normalize_item({"item_type": "repo", "title": "r", "url": "https://github.com/a/b",
+                                 "date_saved": "2024-05-01T10:00:00"})
+    assert error is None
+    assert row["date_saved"] == datetime.datetime(2024, 5, 1, 10)
+    assert row["item_key"] == "https://github.com/a/b"
+
+
+def test_normalize_item_keys_papers_by_arxiv_id():
+    row, error = normalize_item({"item_type": "paper", "title": "Attention",
+                                 "url": "http://arxiv.org/abs/1706.03762v5"})
+    assert error is None
+    assert row["item_key"] == "arxiv:1706.03762"
+
+
+@pytest.mark.parametrize("record, message", [
+    ("not an object", "item must be an object"),
+    ({"item_type": "video", "title": "x"}, "item_type"),
+    ({"item_type": "course", "title": "   "}, "title is required"),
+    ({"item_type": "repo", "title": "r"}, "url is required"),
+    ({"item_type": "course", "title": "c", "course_status": "paused"}, "course_status"),
+    ({"item_type": "course", "title": "c", "date_saved": "yesterday"}, "date_saved"),
+])
+def test_normalize_item_rejects_invalid_items(record, message):
+    row, error = normalize_item(record)
+    assert row is None
+    assert message in error
+
+
+def normalized(*records):
+    rows = []
+    for record in records:
+        row, error = normalize_item(record)
+        assert error is None
+        rows.append(row)
+    return rows
+
+
+def test_save_items_skips_repeats_and_saved_items(db_session, user):
+    from extensions import db
+    from models import SavedItem
+
+    course = {"item_type": "course", "title": "Deep Learning"}
+    repo = {"item_type": "repo", "title": "r", "url": "https://github.com/a/b"}
+    assert save_items(user.id, normalized(course, course, repo)) == 2
+    db_session.commit()
+
+    assert save_items(user.id, normalized(course, {"item_type": "course", "title": "NLP"})) == 1
+    db_session.commit()
+    titles = db_session.scalars(db.select(SavedItem.title).where(SavedItem.user_id == user.id)
+                                .order_by(SavedItem.id)).all()
+    assert titles == ["Deep Learning", "r", "NLP"]
+
+
+def test_save_items_finds_papers_saved_under_their_title(db_session, user):
+    from models import SavedItem
+
+    # Saved before the paper store existed: keyed by the bare title
+    db_session.add(SavedItem(user_id=user.id, item_type="paper", title="Attention", item_key="Attention",
+                             date_saved=datetime.datetime(2024, 1, 1)))
+    db_session.commit()
+    paper = {"item_type": "paper", "title": "Attention", "url": "http://arxiv.org/abs/1706.03762"}
+    assert save_items(user.id, normalized(paper)) == 0
@@ -0,0 +1,159 @@
+import sqlite3
+
+import sqlalchemy as sa
+
+import migrations
+
+OLD_SCHEMA = """
+CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR(64) NOT NULL UNIQUE,
+                    password_hash VARCHAR(128) NOT NULL, role VARCHAR(16));
+CREATE TABLE saved_items (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, item_type VARCHAR(50),
+                          title VARCHAR(300), url VARCHAR(300), published VARCHAR(50), authors VARCHAR(300),
+                          journal_ref VARCHAR(300), date_saved DATETIME, course_status VARCHAR(20));
+CREATE TABLE peer_articles (id INTEGER PRIMARY KEY, title VARCHAR(200), description TEXT, keywords VARCHAR(200),
+                            file_path VARCHAR(300), status VARCHAR(20), date_submitted DATETIME, user_id INTEGER);
+"""
+
+SEED = [
+    # A course saved three times; the middle copy was completed
+    (1, 1, 'course', 'ML', None, '2024-01-01', 'ongoing'),
+    (2, 1, 'course', 'ML', None, '2024-03-01', 'completed'),
+    (3, 1, 'course', 'ML', None, '2024-02-01', 'ongoing'),
+    # The same course for another user stays separate
+    (4, 2, 'course', 'ML', None, '2024-01-01', 'ongoing'),
+    # Repos saved twice by url
+    (5, 1, 'repo', 'repo', 'https://github.com/a/b', '2024-01-01', None),
+    (6, 1, 'repo', 'repo (again)', 'https://github.com/a/b', '2024-01-05', None),
+    # Rows with nothing to key on must not collapse into each other
+    (7, 1, 'repo', None, None, '2024-01-01', None),
+    (8, 1, 'repo', None, None, '2024-01-02', None),
+]
+
+
+def seeded_engine(tmp_path):
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(OLD_SCHEMA)
+    conn.executemany("INSERT INTO saved_items (id, user_id, item_type, title, url, date_saved, course_status)"
+                     " VALUES (?, ?, ?, ?, ?, ?, ?)", SEED)
+    conn.execute("INSERT INTO peer_articles (id, title, description, keywords, status)"
+                 " VALUES (1, 'Graph networks', 'A survey', 'gnn', 'approved')")
+    conn.commit()
+    conn.close()
+    return sa.create_engine(f"sqlite:///{path}")
+
+
+def saved_rows(engine):
+    with engine.connect() as conn:
+        return conn.execute(sa.text(
+            "SELECT id, user_id, item_type, item_key, date_saved, course_status FROM saved_items ORDER BY id"
+        )).all()
+
+
+def test_upgrade_applies_every_migration_once(tmp_path):
+    engine = seeded_engine(tmp_path)
+    assert migrations.upgrade(engine) == [fn.__name__ for fn in migrations.MIGRATIONS]
+    assert migrations.upgrade(engine) == []
+
+
+def test_item_key_dedupe_keeps_completed_status_and_latest_date(tmp_path):
+    engine = seeded_engine(tmp_path)
+    migrations.upgrade(engine)
+    rows = saved_rows(engine)
+    assert [tuple(row) for row in rows] == [
+        (1, 1, 'course', 'ML', '2024-03-01', 'completed'),
+        (4, 2, 'course', 'ML', '2024-01-01', 'ongoing'),
+        (5, 1, 'repo', 'https://github.com/a/b', '2024-01-05', None),
+        (7, 1, 'repo', 'id:7', '2024-01-01', None),
+        (8, 1, 'repo', 'id:8', '2024-01-02', None),
+    ]
+
+
+def test_item_key_is_unique_after_upgrade(tmp_path):
+    engine = seeded_engine(tmp_path)
+    migrations.upgrade(engine)
+    indexes = {index["name"]: index for index in sa.inspect(engine).get_indexes("saved_items")}
+    assert indexes["uq_saved_items_user_type_key"]["unique"]
+
+
+def test_sqlite_database_is_switched_to_wal(tmp_path):
+    engine = seeded_engine(tmp_path)
+    migrations.upgrade(engine)
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+
+
+def test_existing_articles_are_searchable_after_upgrade(tmp_path):
+    engine = seeded_engine(tmp_path)
+    migrations.upgrade(engine)
+    with engine.connect() as conn:
+        found = conn.execute(sa.text("SELECT rowid FROM peer_articles_fts WHERE peer_articles_fts MATCH 'graph'")).all()
+    assert [row[0] for row in found] == [1]
+
+
+def test_missing_save_dates_are_backfilled(tmp_path):
+    engine = seeded_engine(tmp_path)
+    with engine.begin() as conn:
+        conn.execute(sa.text("INSERT INTO saved_items (id, user_id, item_type, title, date_saved)"
+                             " VALUES (9, 1, 'paper', 'Undated', NULL)"))
+    migrations.upgrade(engine)
+    dates = {row.id: row.date_saved for row in saved_rows(engine)}
+    assert dates[9] == migrations.UNKNOWN_DATE
+    assert dates[1] == '2024-03-01'
+
+
+def test_missing_article_dates_are_backfilled(tmp_path):
+    # The seeded article has no date_submitted
+    engine = seeded_engine(tmp_path)
+    migrations.upgrade(engine)
+    with engine.connect() as conn:
+        date = conn.execute(sa.text("SELECT date_submitted FROM peer_articles WHERE id = 1")).scalar()
+    assert date == migrations.UNKNOWN_DATE
+
+
+PAPERS = [
+    # One arXiv paper saved from its abstract and its PDF page, under different titles
+    (20, 1, 'paper', 'Attention Is All You Need', 'http://arxiv.org/abs/1706.03762v5', '2024-01-01', None),
+    (21, 1, 'paper', 'Attention is all you need.', 'https://arxiv.org/pdf/1706.03762', '2024-02-01', None),
+    # Distinct papers that share a title
+    (22, 1, 'paper', 'A Survey', 'https://arxiv.org/abs/2101.00001', '2024-01-01', None),
+    (23, 1, 'paper', 'A Survey', 'https://arxiv.org/abs/2202.00002', '2024-01-01', None),
+]
+
+
+def seed_papers(engine):
+    with engine.begin() as conn:
+        conn.execute(sa.text("INSERT INTO saved_items (id, user_id, item_type, title, url, date_saved, course_status)"
+                             " VALUES (:id, :user_id, :item_type, :title, :url, :date_saved, :course_status)"),
+                     [dict(zip(["id", "user_id", "item_type", "title", "url", "date_saved", "course_status"], row))
+                      for row in PAPERS])
+
+
+def paper_rows(engine):
+    return [tuple(row)[:5] for row in saved_rows(engine) if row.item_type == 'paper']
+
+
+def test_paper_keys_are_the_paper_stores_canonical_keys(tmp_path):
+    engine = seeded_engine(tmp_path)
+    seed_papers(engine)
+    migrations.upgrade(engine)
+    assert paper_rows(engine) == [
+        (20, 1, 'paper', 'arxiv:1706.03762', '2024-02-01'),
+        (22, 1, 'paper', 'arxiv:2101.00001', '2024-01-01'),
+        (23, 1, 'paper', 'arxiv:2202.00002', '2024-01-01'),
+    ]
+
+
+def test_papers_keyed_by_title_are_rekeyed(tmp_path):
+    # A database that ran saved_items_item_key while it still keyed papers by title
+    engine = seeded_engine(tmp_path)
+    migrations.upgrade(engine)
+    seed_papers(engine)
+    with engine.begin() as conn:
+        conn.execute(sa.text("DELETE FROM saved_items WHERE id = 23"))
+        conn.execute(sa.text("UPDATE saved_items SET item_key = title WHERE item_type = 'paper'"))
+        migrations.saved_items_paper_canonical_keys(conn, sa.inspect(conn))
+    assert paper_rows(engine) == [
+        (20, 1, 'paper', 'arxiv:1706.03762', '2024-02-01'),
+        (22, 1, 'paper', 'arxiv:2101.00001', '2024-01-01'),
+    ]
@@ -0,0 +1,14 @@
+from paper_store import PaperStore
+
+
+def test_search_ranks_every_match_not_just_the_newest(tmp_path):
+    store = PaperStore(str(tmp_path / "papers.db"))
+    store.add([{"title": "Diffusion diffusion diffusion", "summary": "diffusion models",
+                "link": "https://arxiv.org/abs/2001.00001"}], "arxiv")
+    store.add([{"title": f"Paper {i}", "summary": f"a note on diffusion and topic {i}",
+                "link": f"https://arxiv.org/abs/2101.{i:05d}"} for i in range(2500)], "arxiv")
+    papers, total = store.search("diffusion", limit=3)
+    assert total == 2501
+    assert papers[0]["title"] == "Diffusion diffusion diffusion"
+    page, _ = store.search("diffusion", limit=2, offset=1)
+    assert len(page) == 2 and papers[0]["key"] not in [paper["key"] for paper in page]
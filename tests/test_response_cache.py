@@ -0,0 +1,46 @@
+from response_cache import ResponseCache, MemoryBackend, SQLiteBackend, make_key
+
+
+def test_make_key_ignores_param_order():
+    assert make_key("github", {"a": 1, "b": "x"}) == make_key("github", {"b": "x", "a": 1})
+
+
+def test_make_key_folds_only_case_insensitive_params():
+    key = make_key("arxiv", {"query": "  Deep   Learning ", "order": "DESC"}, ("query",))
+    assert key == make_key("arxiv", {"query": "deep learning", "order": "DESC"}, ("query",))
+    assert key != make_key("arxiv", {"query": "deep learning", "order": "desc"}, ("query",))
+
+
+def test_make_key_keeps_case_by_default():
+    assert make_key("arxiv", {"query": "AI"}) != make_key("arxiv", {"query": "ai"})
+
+
+def test_cached_shares_entries_across_case_of_declared_params():
+    cache = ResponseCache(MemoryBackend())
+    calls = []
+
+    @cache.cached("pwc", case_insensitive=("query",))
+    def fetch(query, mode="A"):
+        calls.append((query, mode))
+        return [query]
+
+    fetch("AI")
+    fetch("ai")
+    fetch("ai", mode="a")
+    assert calls == [("AI", "A"), ("ai", "a")]
+
+
+def test_sqlite_backend_evicts_least_recently_used(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.db"), max_entries=3, max_bytes=100)
+    conn = backend._conn()
+    for i in range(3):
+        backend.set(f"k{i}", b"x" * 10, 60)
+        conn.execute("UPDATE response_cache SET last_access = ? WHERE key = ?", (i, f"k{i}"))
+    conn.commit()
+
+    assert backend.set("k3", b"x" * 10, 60) == 1
+    assert backend.get("k0") is None
+    # Both bounds at once: one over the entry count, and 15 bytes over the byte budget
+    assert backend.set("big", b"y" * 85, 60) == 2
+    assert backend.size() == (2, 95)
+    assert backend.get("big") is not None
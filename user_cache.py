@@ -0,0 +1,76 @@
+import collections
+import threading
+import time
+
+from flask_login import UserMixin
+
+
+class SessionUser(UserMixin):
+    """
+    What current_user needs on every request (id, username, role), detached
+    from the database session so it can be shared between requests.
+    """
+
+    def __init__(self, id, username, role):
+        self.id = id
+        self.username = username
+        self.role = role
+
+
+class UserCache:
+    """
+    Per-process LRU of SessionUsers for the login manager's user_loader, so
+    authenticated page views skip the users lookup. Entries expire after
+    `ttl` seconds; models.py invalidates a user whenever its row is updated
+    or deleted in this process (e.g. a role change), and the short TTL
+    bounds how long other workers can serve the old role.
+    """
+
+    def __init__(self, max_entries=10000, ttl=60, enabled=True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()   # user id -> (expires_at, SessionUser)
+        self._counters = collections.Counter()
+
+    def get(self, user_id):
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[user_id]
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self._counters["hits"] += 1
+            return entry[1]
+
+    def put(self, user):
+        """Cache a snapshot of `user` (a User row) and return it."""
+        snapshot = SessionUser(user.id, user.username, user.role)
+        if self.enabled:
+            with self._lock:
+                self._entries[user.id] = (time.monotonic() + self.ttl, snapshot)
+                self._entries.move_to_end(user.id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._counters["evictions"] += 1
+        return snapshot
+
+    def invalidate(self, user_id):
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self._counters["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self._counters["hits"],
+                    "misses": self._counters["misses"], "evictions": self._counters["evictions"],
+                    "invalidations": self._counters["invalidations"]}